@@ -0,0 +1,33 @@
+"""
+Bulk notification creation.
+
+bulk_create skips the per-notification post_save signal that queues one email
+task each; create_notifications() queues a single send_notification_emails
+task for the whole batch instead, once the surrounding transaction commits.
+"""
+import logging
+
+from django.db import transaction
+
+from .models import Notification
+from .tasks import send_notification_emails
+
+logger = logging.getLogger(__name__)
+
+
+def create_notifications(notifications, batch_size=500):
+    """Insert unsaved Notification objects and email them in one batch"""
+    created = Notification.objects.bulk_create(notifications, batch_size=batch_size)
+    notification_ids = [notification.id for notification in created]
+    if not notification_ids:
+        return created
+
+    def _enqueue():
+        try:
+            send_notification_emails.delay(notification_ids)
+        except Exception as e:
+            # Celery/Redis not available - same as the per-notification signal
+            logger.debug(f"Could not queue notification emails (Celery not available): {e}")
+
+    transaction.on_commit(_enqueue)
+    return created
@@ -1,6 +1,7 @@
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
 from django.conf import settings
+from django.utils import timezone
 from .models import Notification
 
 @shared_task
@@ -19,7 +20,37 @@ def send_notification_email(notification_id):
     notif.email_sent_at = notif.created_at
     notif.save()
 
+@shared_task
+def send_notification_emails(notification_ids):
+    """
+    Email a batch of notifications over one SMTP connection.
+
+    Queued once for notifications created with bulk_create, which skips the
+    per-notification post_save signal (e.g. bulk serviceman approval).
+    """
+    notifications = list(
+        Notification.objects.filter(id__in=notification_ids, sent_to_email=False)
+        .select_related('user')
+        .only('id', 'title', 'message', 'user__email')
+    )
+    messages = [
+        (notif.title, notif.message, settings.DEFAULT_FROM_EMAIL, [notif.user.email])
+        for notif in notifications if notif.user.email
+    ]
+    if messages:
+        send_mass_mail(messages, fail_silently=False)
+    Notification.objects.filter(id__in=[notif.id for notif in notifications]).update(
+        sent_to_email=True, email_sent_at=timezone.now()
+    )
+    return len(messages)
+
 @shared_task
 def check_overdue_inspections():
-    # Implement logic to notify admin if inspection overdue
-    pass
\ No newline at end of file
+    """
+    Periodic SLA scan (Celery beat, see CELERY_BEAT_SCHEDULE).
+
+    Covers overdue inspections (PENDING_ESTIMATION) and every other open
+    status; see apps.services.sla for deadlines and alert recipients.
+    """
+    from apps.services.sla import scan_sla_breaches
+    return scan_sla_breaches()
@@ -17,4 +17,9 @@ def test_notification_list(client_user):
     url = reverse("notification-list")
     response = client.get(url)
     assert response.status_code == 200
-    assert response.json()[0]['title'] == "Test"
\ No newline at end of file
+    assert response.json()[0]['title'] == "Test"
+
+@pytest.mark.django_db
+def test_notification_list_query_budget(platform, assert_query_budget):
+    response = assert_query_budget(platform.client, reverse("notification-list"), 3, platform)
+    assert response.data
@@ -23,4 +23,36 @@ def test_initialize_payment(client_user):
     }
     # This would normally call the paystack API, so you may want to patch it in real tests
     # response = client.post(url, data)
-    # assert response.status_code == 201
\ No newline at end of file
+    # assert response.status_code == 201
+
+@pytest.mark.django_db
+def test_payment_verification_confirms_payment_once(client_user, monkeypatch, django_capture_on_commit_callbacks):
+    from apps.notifications.models import Notification
+    from apps.services.models import ServiceRequestStatusHistory
+    from .models import Payment
+
+    cat = Category.objects.create(name="Verify", description="Test")
+    req = ServiceRequest.objects.create(
+        client=client_user, category=cat, booking_date="2025-10-03",
+        initial_booking_fee=2000, status="AWAITING_CLIENT_APPROVAL",
+        client_address="Somewhere", service_description="Do work"
+    )
+    Payment.objects.create(
+        service_request=req, payment_type="SERVICE_PAYMENT", amount=15000,
+        paystack_reference="ref-verify", paystack_access_code="code", status="PENDING",
+    )
+    monkeypatch.setattr("apps.payments.views.verify_payment", lambda reference: {"status": "success"})
+
+    client = APIClient()
+    for _ in range(2):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(reverse("payment-verify"), {"reference": "ref-verify"}, format="json")
+        assert response.data == {"status": "SUCCESSFUL"}
+
+    req.refresh_from_db()
+    assert req.status == "PAYMENT_COMPLETED"
+    assert ServiceRequestStatusHistory.objects.filter(
+        service_request=req, previous_status="AWAITING_CLIENT_APPROVAL", new_status="PAYMENT_COMPLETED"
+    ).count() == 1
+    # A replayed verification does not notify the client again
+    assert Notification.objects.filter(user=client_user, notification_type="PAYMENT_CONFIRMED").count() == 1
@@ -324,10 +324,20 @@ class PaymentVerifyView(APIView):
                     logger = logging.getLogger(__name__)
                     User = get_user_model()
                     
-                    # Update service request status
+                    from apps.services.state_machine import TransitionError, apply_transition
+                    
+                    # Update service request status (conditional UPDATE: a replayed
+                    # verification does not move the request or notify again)
                     service_request = payment.service_request
-                    service_request.status = 'PAYMENT_COMPLETED'
-                    service_request.save()
+                    try:
+                        apply_transition(
+                            service_request, 'confirm_payment',
+                            changed_by=request.user if request.user.is_authenticated else None,
+                            notes=f'Payment {payment.paystack_reference} verified',
+                        )
+                    except TransitionError as e:
+                        logger.warning(f"Payment {reference} verified without a status change: {e}")
+                        return Response({"status": payment.status})
                     
                     # Notify all admins
                     admins = User.objects.filter(user_type='ADMIN')
@@ -0,0 +1,47 @@
+# Generated manually for per-serviceman rating listings
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_rating_serviceman(apps, schema_editor):
+    """Copy serviceman_id from the rated service request onto existing ratings"""
+    Rating = apps.get_model('ratings', 'Rating')
+    ServiceRequest = apps.get_model('services', 'ServiceRequest')
+    Rating.objects.filter(serviceman__isnull=True).update(
+        serviceman_id=Subquery(
+            ServiceRequest.objects.filter(pk=OuterRef('service_request_id')).values('serviceman_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0004_add_preferred_serviceman'),
+        ('ratings', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rating',
+            name='serviceman',
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                help_text='Serviceman who was rated',
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='ratings_received',
+                to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['serviceman', '-created_at'], name='ratings_serviceman_recent_idx'),
+        ),
+        migrations.RunPython(backfill_rating_serviceman, migrations.RunPython.noop),
+    ]
@@ -4,9 +4,25 @@ from apps.users.models import User
 
 class Rating(models.Model):
     service_request = models.OneToOneField(ServiceRequest, on_delete=models.CASCADE)
+    # Denormalized from service_request.serviceman so per-serviceman listings
+    # are a single range scan on (serviceman, -created_at) instead of a join
+    serviceman = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='ratings_received',
+        help_text="Serviceman who was rated"
+    )
     rating = models.IntegerField()
     review = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['serviceman', '-created_at'], name='ratings_serviceman_recent_idx'),
+        ]
+
     def __str__(self):
-        return f"Rating {self.rating} for SR {self.service_request.id}"
\ No newline at end of file
+        return f"Rating {self.rating} for SR {self.service_request.id}"
@@ -1,8 +1,14 @@
 from rest_framework import serializers
 from .models import Rating
+from .utils import MIN_RATING, MAX_RATING
 
 class RatingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Rating
-        fields = ["id", "service_request", "rating", "review", "created_at"]
-        read_only_fields = ["id", "created_at"]
\ No newline at end of file
+        fields = ["id", "service_request", "serviceman", "rating", "review", "created_at"]
+        read_only_fields = ["id", "serviceman", "created_at"]
+
+    def validate_rating(self, value):
+        if not MIN_RATING <= value <= MAX_RATING:
+            raise serializers.ValidationError(f"Rating must be between {MIN_RATING} and {MAX_RATING}.")
+        return value
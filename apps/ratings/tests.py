@@ -30,4 +30,125 @@ def test_rating_creation_and_analytics(client_user, serviceman_user):
     client.force_authenticate(user=User.objects.create(username="admin", user_type="ADMIN", is_superuser=True))
     url = reverse("analytics-servicemen")
     response = client.get(url)
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+def test_rating_aggregate_updates_incrementally(serviceman_user):
+    from decimal import Decimal
+    from apps.users.models import ServicemanProfile
+    from .utils import record_rating
+
+    profile, _ = ServicemanProfile.objects.get_or_create(user=serviceman_user)
+    record_rating(serviceman_user.id, 5)
+    record_rating(serviceman_user.id, 4)
+    record_rating(serviceman_user.id, 4)
+
+    profile.refresh_from_db()
+    assert profile.rating_count == 3
+    assert profile.rating_sum == 13
+    assert profile.rating == Decimal("4.33")
+    assert profile.rating_histogram == {1: 0, 2: 0, 3: 0, 4: 2, 5: 1}
+
+
+@pytest.mark.django_db
+def test_recompute_rating_aggregates_from_ratings_table(client_user, serviceman_user):
+    from decimal import Decimal
+    from apps.users.models import ServicemanProfile
+    from .utils import recompute_rating_aggregates
+
+    profile, _ = ServicemanProfile.objects.get_or_create(user=serviceman_user)
+    ServicemanProfile.objects.filter(pk=profile.pk).update(rating=Decimal("1.00"), rating_count=99)
+    cat = Category.objects.create(name="Recompute", description="desc")
+    for stars in (3, 5):
+        req = ServiceRequest.objects.create(
+            client=client_user, category=cat, booking_date="2025-10-11",
+            initial_booking_fee=2000, status="CLIENT_REVIEWED",
+            client_address="Addr", service_description="Desc",
+            serviceman=serviceman_user
+        )
+        Rating.objects.create(service_request=req, serviceman=serviceman_user, rating=stars, review="")
+
+    # Average from before ratings were recorded per request: no Rating rows to rebuild it from
+    legacy = User.objects.create_user(username="legacy_sm", email="legacy@x.com", password="x", user_type="SERVICEMAN")
+    legacy_profile, _ = ServicemanProfile.objects.get_or_create(user=legacy)
+    ServicemanProfile.objects.filter(pk=legacy_profile.pk).update(rating=Decimal("4.50"))
+
+    recompute_rating_aggregates()
+
+    legacy_profile.refresh_from_db()
+    assert legacy_profile.rating == Decimal("4.50")
+    profile.refresh_from_db()
+    assert profile.rating_count == 2
+    assert profile.rating_sum == 8
+    assert profile.rating == Decimal("4.00")
+    assert profile.rating_histogram == {1: 0, 2: 0, 3: 1, 4: 0, 5: 1}
+
+
+@pytest.mark.django_db
+def test_rating_aggregate_migration_backfills_existing_ratings(client_user, serviceman_user):
+    import importlib
+    from decimal import Decimal
+    from django.apps import apps
+    from apps.users.models import ServicemanProfile
+    from .utils import record_rating
+
+    profile, _ = ServicemanProfile.objects.get_or_create(user=serviceman_user)
+    cat = Category.objects.create(name="Backfill", description="desc")
+    for stars in (2, 5, 5):
+        req = ServiceRequest.objects.create(
+            client=client_user, category=cat, booking_date="2025-10-11",
+            initial_booking_fee=2000, status="CLIENT_REVIEWED",
+            client_address="Addr", service_description="Desc",
+            serviceman=serviceman_user
+        )
+        Rating.objects.create(service_request=req, serviceman=serviceman_user, rating=stars, review="")
+    # State right after 0006: legacy average, zeroed aggregate columns
+    ServicemanProfile.objects.filter(pk=profile.pk).update(
+        rating=Decimal("4.00"), rating_sum=0, rating_count=0,
+        rating_1_count=0, rating_2_count=0, rating_3_count=0, rating_4_count=0, rating_5_count=0,
+    )
+
+    migration = importlib.import_module("apps.users.migrations.0010_backfill_rating_aggregates")
+    migration.backfill_rating_aggregates(apps, None)
+    record_rating(serviceman_user.id, 4)
+
+    profile.refresh_from_db()
+    assert profile.rating_count == 4
+    assert profile.rating_sum == 16
+    assert profile.rating == Decimal("4.00")
+    assert profile.rating_histogram == {1: 0, 2: 1, 3: 0, 4: 1, 5: 2}
+
+
+@pytest.mark.django_db
+def test_serviceman_ratings_listing_with_histogram(client_user, serviceman_user):
+    from apps.users.models import ServicemanProfile
+    from .utils import record_rating
+
+    ServicemanProfile.objects.get_or_create(user=serviceman_user)
+    cat = Category.objects.create(name="Listing", description="desc")
+    for stars in (5, 4, 5):
+        req = ServiceRequest.objects.create(
+            client=client_user, category=cat, booking_date="2025-10-11",
+            initial_booking_fee=2000, status="CLIENT_REVIEWED",
+            client_address="Addr", service_description="Desc",
+            serviceman=serviceman_user
+        )
+        Rating.objects.create(service_request=req, serviceman=serviceman_user, rating=stars, review="ok")
+        record_rating(serviceman_user.id, stars)
+
+    url = reverse("users:serviceman-ratings", kwargs={"serviceman_id": serviceman_user.id})
+    response = APIClient().get(url, {"page_size": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["results"]) == 2
+    assert body["next"] is not None
+    assert body["summary"]["rating_count"] == 3
+    assert body["summary"]["histogram"] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 2}
+
+
+@pytest.mark.django_db
+def test_analytics_query_budgets(platform, assert_query_budget):
+    response = assert_query_budget(platform.admin, reverse("analytics-servicemen"), 2, platform)
+    assert len(response.data) == 10 and "rating" in response.data[0]
+    assert_query_budget(platform.admin, reverse("analytics-categories"), 2, platform)
+    assert_query_budget(platform.admin, reverse("analytics-revenue"), 3, platform)
@@ -0,0 +1,114 @@
+"""
+Rating aggregate helpers.
+
+ServicemanProfile keeps a running rating_sum / rating_count pair plus a 1-5 star
+histogram. record_rating() folds a new rating in with a single UPDATE built from
+F-expressions, so concurrent reviews never lose an increment and reading the
+average (ServicemanProfile.rating) stays O(1).
+"""
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Round
+
+from apps.users.models import ServicemanProfile
+from apps.users.versions import invalidate_servicemen
+from .models import Rating
+
+MIN_RATING = 1
+MAX_RATING = 5
+
+
+def _average_expression(rating_sum, rating_count):
+    """SQL expression for round(rating_sum / rating_count, 2)"""
+    average = ExpressionWrapper(rating_sum * Value(1.0) / rating_count, output_field=FloatField())
+    return Round(Cast(average, DecimalField(max_digits=12, decimal_places=6)), 2)
+
+
+def record_rating(serviceman_id, stars):
+    """
+    Add one star rating to a serviceman's aggregate.
+
+    All SET expressions of an UPDATE see the pre-update row, so the new average
+    is computed from the same (sum, count) snapshot that gets incremented.
+
+    Returns the number of profiles updated (0 if the serviceman has no profile).
+    """
+    stars = int(stars)
+    if not MIN_RATING <= stars <= MAX_RATING:
+        raise ValueError(f"Rating must be between {MIN_RATING} and {MAX_RATING}")
+
+    histogram_field = f'rating_{stars}_count'
+    new_sum = F('rating_sum') + stars
+    new_count = F('rating_count') + 1
+    updated = ServicemanProfile.objects.filter(user_id=serviceman_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=_average_expression(new_sum, new_count),
+        **{histogram_field: F(histogram_field) + 1},
+    )
+    if updated:
+        # Queryset UPDATEs skip post_save; the public profile/list ETags must still change
+        invalidate_servicemen([serviceman_id])
+    return updated
+
+
+def get_rating_summary(profile):
+    """Average, count and star histogram read straight from the precomputed aggregate"""
+    return {
+        "average_rating": float(profile.rating),
+        "rating_count": profile.rating_count,
+        "histogram": {str(stars): count for stars, count in profile.rating_histogram.items()},
+    }
+
+
+def recompute_rating_aggregates(serviceman_ids=None, batch_size=500):
+    """
+    Rebuild rating aggregates from the Rating table.
+
+    Used to backfill the aggregate columns and to repair drift. Profiles
+    without any Rating rows are left as they are, as in the users 0010
+    backfill: their average may predate Rating rows (reviews submitted before
+    ratings were recorded per request) and cannot be rebuilt from them. Such a
+    legacy average has rating_count=0, so the first record_rating() replaces
+    it with the new review. Returns the number of profiles written.
+    """
+    histogram = {
+        f'rating_{stars}_count': Count('id', filter=Q(rating=stars))
+        for stars in range(MIN_RATING, MAX_RATING + 1)
+    }
+    ratings = Rating.objects.filter(serviceman__isnull=False)
+    if serviceman_ids is not None:
+        ratings = ratings.filter(serviceman_id__in=serviceman_ids)
+    aggregates = {
+        row.pop('serviceman_id'): row
+        for row in ratings.values('serviceman_id').annotate(
+            rating_sum=Sum('rating'),
+            rating_count=Count('id'),
+            **histogram,
+        ).order_by()
+    }
+
+    fields = ['rating', 'rating_sum', 'rating_count', *histogram]
+    profiles = ServicemanProfile.objects.filter(user_id__in=list(aggregates)).only(
+        'id', 'user_id', *fields
+    ).order_by('pk')
+
+    updated = 0
+    batch = []
+    for profile in profiles.iterator(chunk_size=batch_size):
+        row = aggregates[profile.user_id]
+        for field in fields[1:]:
+            setattr(profile, field, row[field] or 0)
+        profile.rating = round(Decimal(profile.rating_sum) / profile.rating_count, 2)
+        batch.append(profile)
+        if len(batch) >= batch_size:
+            ServicemanProfile.objects.bulk_update(batch, fields)
+            invalidate_servicemen([p.user_id for p in batch])
+            updated += len(batch)
+            batch = []
+    if batch:
+        ServicemanProfile.objects.bulk_update(batch, fields)
+        invalidate_servicemen([p.user_id for p in batch])
+        updated += len(batch)
+    return updated
@@ -1,12 +1,17 @@
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Avg, Count
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.db.models import Avg, Count, Q
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from .models import Rating
 from .serializers import RatingSerializer
+from .utils import record_rating, get_rating_summary
 from apps.services.models import ServiceRequest, Category
-from apps.users.models import User
+from apps.users.models import User, ServicemanProfile
 
 class RatingCreateView(generics.CreateAPIView):
     serializer_class = RatingSerializer
@@ -18,17 +23,12 @@ class RatingCreateView(generics.CreateAPIView):
         # Only allow client who owns the service request to create
         if service_request.client != user:
             raise permissions.PermissionDenied("You may only rate your own requests.")
-        rating = serializer.validated_data["rating"]
-        # Update serviceman profile stats
-        serviceman_profile = service_request.serviceman.serviceman_profile
-        # Update running average
-        prev_total = serviceman_profile.total_jobs_completed
-        prev_rating = serviceman_profile.rating
-        new_avg = ((prev_rating * prev_total) + rating) / (prev_total + 1)
-        serviceman_profile.rating = round(new_avg, 2)
-        serviceman_profile.total_jobs_completed += 1
-        serviceman_profile.save()
-        serializer.save()
+        if service_request.serviceman_id is None:
+            raise ValidationError({"service_request": "This request has no assigned serviceman to rate."})
+        # Save the rating and fold it into the serviceman's aggregate atomically
+        with transaction.atomic():
+            serializer.save(serviceman_id=service_request.serviceman_id)
+            record_rating(service_request.serviceman_id, serializer.validated_data["rating"])
 
 class RatingListView(generics.ListAPIView):
     serializer_class = RatingSerializer
@@ -36,12 +36,54 @@ class RatingListView(generics.ListAPIView):
     queryset = Rating.objects.all()
     
     def get_queryset(self):
-        queryset = Rating.objects.all()
+        queryset = Rating.objects.order_by('-created_at')
         serviceman_id = self.request.query_params.get('serviceman_id')
         if serviceman_id:
-            queryset = queryset.filter(service_request__serviceman_id=serviceman_id)
+            queryset = queryset.filter(serviceman_id=serviceman_id)
         return queryset
 
+
+class ServicemanRatingCursorPagination(CursorPagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = '-created_at'
+
+
+class ServicemanRatingListView(generics.ListAPIView):
+    """
+    Ratings received by a serviceman, newest first (Public).
+    
+    Each page is a single range scan on the (serviceman, -created_at) index,
+    paginated with an opaque cursor. The response also carries the rating
+    summary (average, count and 1-5 star histogram) from the serviceman's
+    precomputed aggregate, so no per-request aggregation is needed.
+    
+    Query Parameters:
+    - cursor: Opaque cursor from the previous page's next/previous link
+    - page_size: Number of results (default: 20, max: 100)
+    
+    Tags: Ratings
+    """
+    serializer_class = RatingSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = ServicemanRatingCursorPagination
+    
+    def get_queryset(self):
+        return Rating.objects.filter(serviceman_id=self.kwargs['serviceman_id'])
+    
+    def list(self, request, *args, **kwargs):
+        profile = get_object_or_404(
+            ServicemanProfile.objects.only(
+                'id', 'user_id', 'rating', 'rating_count', 'rating_1_count', 'rating_2_count',
+                'rating_3_count', 'rating_4_count', 'rating_5_count'
+            ),
+            user_id=self.kwargs['serviceman_id']
+        )
+        response = super().list(request, *args, **kwargs)
+        response.data['summary'] = get_rating_summary(profile)
+        return response
+
 # --- Analytics Endpoints ---
 
 class RevenueAnalyticsView(APIView):
@@ -67,7 +109,10 @@ class TopServicemenAnalyticsView(APIView):
         responses={200: OpenApiResponse(description="Top servicemen")}
     )
     def get(self, request):
-        servicemen = User.objects.filter(user_type="SERVICEMAN").order_by("-serviceman_profile__rating", "-serviceman_profile__total_jobs_completed")[:10]
+        # ✅ OPTIMIZATION: Profiles come with the same query instead of one query per serviceman
+        servicemen = User.objects.filter(user_type="SERVICEMAN").select_related("serviceman_profile").order_by(
+            "-serviceman_profile__rating", "-serviceman_profile__total_jobs_completed"
+        )[:10]
         data = [
             {
                 "id": s.id,
@@ -86,7 +131,10 @@ class TopCategoriesAnalyticsView(APIView):
         responses={200: OpenApiResponse(description="Top categories")}
     )
     def get(self, request):
-        qs = Category.objects.annotate(request_count=Count("servicerequest")).order_by("-request_count")[:10]
+        # Joins bypass the live manager, so exclude soft-deleted requests explicitly
+        qs = Category.objects.annotate(
+            request_count=Count("servicerequest", filter=Q(servicerequest__is_deleted=False))
+        ).order_by("-request_count")[:10]
         data = [
             {"id": cat.id, "name": cat.name, "request_count": cat.request_count}
             for cat in qs
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, ServiceRequest
+from .models import ArchivedServiceRequest, Category, ServiceRequest, ServiceRequestStatusHistory
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -9,23 +9,47 @@ class CategoryAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at", "updated_at")
 
 def soft_delete(modeladmin, request, queryset):
-    queryset.update(is_deleted=True)
+    queryset.soft_delete()
 soft_delete.short_description = "Soft delete selected requests"
 
+def restore(modeladmin, request, queryset):
+    queryset.update(is_deleted=False, deleted_at=None)
+restore.short_description = "Restore selected soft-deleted requests"
+
 @admin.register(ServiceRequest)
 class ServiceRequestAdmin(admin.ModelAdmin):
     list_display = (
         "id", "client", "serviceman", "backup_serviceman", "category", "status", "booking_date",
         "is_emergency", "initial_booking_fee", "final_cost", "created_at"
     )
-    list_filter = ("status", "category", "is_emergency", "booking_date", "created_at")
+    list_filter = ("status", "category", "is_emergency", "is_deleted", "booking_date", "created_at")
     search_fields = ("id", "client__username", "serviceman__username", "category__name")
     readonly_fields = ("created_at", "updated_at", "inspection_completed_at", "work_completed_at")
-    actions = [soft_delete]
+    actions = [soft_delete, restore]
     fieldsets = (
         ("Core Info", {"fields": ("client", "serviceman", "backup_serviceman", "category", "status")}),
         ("Booking/Service", {"fields": ("booking_date", "is_emergency", "auto_flagged_emergency", "client_address", "service_description")}),
         ("Financials", {"fields": ("initial_booking_fee", "serviceman_estimated_cost", "admin_markup_percentage", "final_cost")}),
         ("Timestamps", {"fields": ("created_at", "updated_at", "inspection_completed_at", "work_completed_at")}),
         ("Soft Delete", {"fields": ("is_deleted", "deleted_at")}),
-    )
\ No newline at end of file
+    )
+
+    def get_queryset(self, request):
+        # Admins see soft-deleted requests too (filter with "is_deleted")
+        return ServiceRequest.all_objects.all()
+
+@admin.register(ServiceRequestStatusHistory)
+class ServiceRequestStatusHistoryAdmin(admin.ModelAdmin):
+    list_display = ("id", "service_request", "previous_status", "new_status", "changed_by", "changed_at", "duration_in_previous")
+    list_filter = ("new_status", "is_automated", "changed_at")
+    search_fields = ("service_request__id", "changed_by__username")
+    list_select_related = ("changed_by", "service_request__client", "service_request__category")
+    readonly_fields = [f.name for f in ServiceRequestStatusHistory._meta.fields]
+
+
+@admin.register(ArchivedServiceRequest)
+class ArchivedServiceRequestAdmin(admin.ModelAdmin):
+    list_display = ("original_id", "client_id", "status", "created_at", "deleted_at", "archived_at")
+    list_filter = ("status", "archived_at")
+    search_fields = ("original_id", "client_id")
+    readonly_fields = [f.name for f in ArchivedServiceRequest._meta.fields]
@@ -0,0 +1,101 @@
+"""
+Archival of soft-deleted service requests.
+
+Soft-deleted requests are hidden by the default manager but still sit in the
+hot table. archive_deleted_requests() moves those deleted before a cutoff into
+ArchivedServiceRequest in primary-key batches. Each batch is one transaction:
+bulk INSERT into the archive, then DELETE from the hot table.
+
+- Status history and notes are copied into the archive payload. They are then
+  removed with the request, together with its notifications and negotiations.
+- Payments are financial records. They are detached (service_request=NULL)
+  rather than deleted, and their ids are kept in the payload.
+- Requests with a rating are skipped. Deleting the rating would drift the
+  serviceman's rating aggregates away from the Rating table.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .models import ArchivedServiceRequest, ServiceRequest, ServiceRequestNote, ServiceRequestStatusHistory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def archivable_requests(cutoff):
+    """Soft-deleted requests deleted before cutoff that can be moved to cold storage"""
+    from apps.ratings.models import Rating
+
+    return ServiceRequest.all_objects.deleted().filter(
+        # Rows soft-deleted before deleted_at was recorded fall back to updated_at
+        Q(deleted_at__lt=cutoff) | Q(deleted_at__isnull=True, updated_at__lt=cutoff)
+    ).exclude(
+        Exists(Rating.objects.filter(service_request=OuterRef('pk')))
+    )
+
+
+def _group_by_request(queryset, ids):
+    grouped = defaultdict(list)
+    for row in queryset.filter(service_request_id__in=ids).order_by('pk').values():
+        grouped[row['service_request_id']].append(row)
+    return grouped
+
+
+def _archive_batch(rows):
+    from apps.payments.models import Payment
+
+    ids = [row['id'] for row in rows]
+    history = _group_by_request(ServiceRequestStatusHistory.objects, ids)
+    notes = _group_by_request(ServiceRequestNote.objects, ids)
+    payments = defaultdict(list)
+    for payment_id, request_id in Payment.objects.filter(service_request_id__in=ids).values_list('id', 'service_request_id'):
+        payments[request_id].append(payment_id)
+
+    archived = [
+        ArchivedServiceRequest(
+            original_id=row['id'],
+            client_id=row['client_id'],
+            status=row['status'],
+            created_at=row['created_at'],
+            deleted_at=row['deleted_at'],
+            payload={
+                'request': row,
+                'status_history': history[row['id']],
+                'notes': notes[row['id']],
+                'payment_ids': payments[row['id']],
+            },
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        ArchivedServiceRequest.objects.bulk_create(archived, ignore_conflicts=True)
+        Payment.objects.filter(service_request_id__in=ids).update(service_request=None)
+        ServiceRequest.all_objects.filter(pk__in=ids, is_deleted=True).delete()
+
+
+def archive_deleted_requests(cutoff, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Move requests soft-deleted before cutoff to ArchivedServiceRequest.
+
+    Returns the number of requests archived (or that would be, with dry_run).
+    """
+    queryset = archivable_requests(cutoff).order_by('pk')
+    if dry_run:
+        return queryset.count()
+
+    archived = 0
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values()[:batch_size])
+        if not rows:
+            break
+        _archive_batch(rows)
+        archived += len(rows)
+        last_pk = rows[-1]['id']
+        logger.info(f"Archived {archived} deleted service request(s) so far")
+    return archived
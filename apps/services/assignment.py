@@ -0,0 +1,235 @@
+"""
+Serviceman assignment of service requests, one at a time or in batches.
+
+assign_requests() applies a morning-dispatch batch in one transaction:
+
+- the requests are locked and loaded with one query, and every serviceman id
+  in the batch is validated (and locked, for the capacity check) with one IN
+  query instead of two lookups per request;
+- capacity calendar counts (capacity.py) come from one grouped query and are
+  then tracked in memory, so the batch cannot overbook a serviceman either;
+- the requests are written with one bulk_update, their status history with
+  one bulk INSERT, and every notification with one bulk_create followed by a
+  single batched email task.
+
+bulk_update does not fire the ServiceRequest signals, so their effects
+(status_entered_at, history, availability, serviceman cache versions) are
+applied here. Each item gets its own outcome; invalid items do not stop the
+others.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.users.models import ServicemanProfile, User
+from .capacity import booked_counts
+from .history import build_history_entry, record_status_changes
+from .models import ServiceRequest
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 100
+
+ASSIGNED = 'assigned'
+NOT_FOUND = 'not_found'
+INVALID = 'invalid'
+FULLY_BOOKED = 'fully_booked'
+
+UPDATE_FIELDS = [
+    'serviceman', 'backup_serviceman', 'status', 'status_entered_at', 'claimed_by', 'claimed_until', 'updated_at'
+]
+
+
+def assignment_notifications(service_request, serviceman, backup_serviceman, old_serviceman_id, old_backup_id, notes=''):
+    """Unsaved notifications for an assignment (new primary, new backup and the client)"""
+    from apps.notifications.models import Notification
+
+    notifications = []
+    if serviceman and serviceman.pk != old_serviceman_id:
+        client_phone = getattr(service_request.client, 'phone_number', 'Not provided')
+        notifications.append(Notification(
+            user=serviceman,
+            notification_type='JOB_ASSIGNED',
+            title=f'New Job Assignment - Request #{service_request.id}',
+            message=f'You have been assigned to a new service request.\n\n'
+                    f'📋 Job Details:\n'
+                    f'• Category: {service_request.category.name}\n'
+                    f'• Booking Date: {service_request.booking_date}\n'
+                    f'• Address: {service_request.client_address}\n'
+                    f'• Description: {service_request.service_description}\n\n'
+                    f'👤 Client Contact:\n'
+                    f'• Name: {service_request.client.get_full_name()}\n'
+                    f'• Phone: {client_phone}\n\n'
+                    f'📝 Next Step: Please contact the client to schedule a site visit and provide a cost estimate.{f"\n\nAdmin Notes: {notes}" if notes else ""}',
+            is_read=False
+        ))
+    if backup_serviceman and backup_serviceman.pk != old_backup_id:
+        notifications.append(Notification(
+            user=backup_serviceman,
+            notification_type='SERVICE_ASSIGNED',
+            title='Service Request Backup Assignment',
+            message=f'You have been assigned as backup serviceman for request #{service_request.id}. '
+                    f'Category: {service_request.category.name}. '
+                    f'Date: {service_request.booking_date}.',
+            is_read=False
+        ))
+    notifications.append(Notification(
+        user=service_request.client,
+        notification_type='STATUS_UPDATE',
+        title=f'Serviceman Assigned - Request #{service_request.id}',
+        message=f'Good news! A serviceman has been assigned to your service request.\n\n'
+                f'The serviceman will contact you shortly to schedule a site visit and discuss your requirements.\n\n'
+                f'Please ensure you are available at the provided address.',
+        is_read=False
+    ))
+    return notifications
+
+
+def _servicemen(user_ids):
+    """Lock and load servicemen with their approval flag and capacity: one query, in id order"""
+    return {
+        user.pk: user
+        for user in User.objects.select_for_update(of=('self',)).filter(
+            pk__in=user_ids, user_type='SERVICEMAN'
+        ).select_related('serviceman_profile').order_by('pk')
+    }
+
+
+def _daily_capacity(user):
+    profile = getattr(user, 'serviceman_profile', None)
+    if profile is None:
+        return ServicemanProfile._meta.get_field('daily_capacity').default
+    return profile.daily_capacity
+
+
+def _serviceman_error(servicemen, user_id, role):
+    user = servicemen.get(user_id)
+    if user is None:
+        return f"{role} with ID {user_id} not found"
+    profile = getattr(user, 'serviceman_profile', None)
+    if profile is not None and not profile.is_approved:
+        return f"{role} {user.username} is not approved yet"
+    return None
+
+
+def assign_requests(items, actor):
+    """
+    Assign servicemen to many requests. items are dicts with service_request_id
+    and serviceman_id and/or backup_serviceman_id (optional notes).
+
+    Returns one {"service_request_id", "result", ...} outcome per item, in order.
+    """
+    from apps.notifications.bulk import create_notifications
+    from apps.users.versions import invalidate_servicemen
+    from .signals import sync_serviceman_availability
+
+    request_ids = [item['service_request_id'] for item in items]
+    with transaction.atomic():
+        requests = {
+            service_request.pk: service_request
+            for service_request in ServiceRequest.objects.select_for_update(of=('self',)).filter(
+                pk__in=request_ids
+            ).select_related('client', 'category').order_by('pk')
+        }
+        serviceman_ids = {item.get('serviceman_id') for item in items} | {item.get('backup_serviceman_id') for item in items}
+        serviceman_ids.discard(None)
+        previous_ids = {service_request.serviceman_id for service_request in requests.values()} - {None}
+        servicemen = _servicemen(serviceman_ids | previous_ids)
+
+        booked = booked_counts(
+            serviceman_ids | previous_ids, {service_request.booking_date for service_request in requests.values()}
+        )
+
+        now = timezone.now()
+        outcomes, changed, history, notifications, moved = [], [], [], [], []
+        seen = set()
+        for item in items:
+            request_id = item['service_request_id']
+            outcome = {"service_request_id": request_id}
+            outcomes.append(outcome)
+            service_request = requests.get(request_id)
+            serviceman_id, backup_id = item.get('serviceman_id'), item.get('backup_serviceman_id')
+
+            if service_request is None:
+                outcome.update(result=NOT_FOUND, detail=f"Service request with ID {request_id} not found")
+                continue
+            error = None
+            if request_id in seen:
+                error = "Service request appears more than once in the batch"
+            elif not serviceman_id and not backup_id:
+                error = "serviceman_id or backup_serviceman_id is required"
+            elif serviceman_id and serviceman_id == backup_id:
+                error = "Primary and backup servicemen cannot be the same person"
+            else:
+                error = (serviceman_id and _serviceman_error(servicemen, serviceman_id, 'Serviceman')) or (
+                    backup_id and _serviceman_error(servicemen, backup_id, 'Backup serviceman')
+                )
+            if error:
+                outcome.update(result=INVALID, detail=error)
+                continue
+            seen.add(request_id)
+
+            old_serviceman_id, old_backup_id = service_request.serviceman_id, service_request.backup_serviceman_id
+            date = service_request.booking_date
+            if serviceman_id and serviceman_id != old_serviceman_id:
+                taken, capacity = booked.get((serviceman_id, date), 0), _daily_capacity(servicemen[serviceman_id])
+                if taken >= capacity:
+                    outcome.update(
+                        result=FULLY_BOOKED, booked=taken, capacity=capacity,
+                        detail=f"Serviceman {servicemen[serviceman_id].username} is fully booked on {date} "
+                               f"({taken}/{capacity} jobs)",
+                    )
+                    continue
+                if service_request.status != 'CANCELLED':
+                    booked[(serviceman_id, date)] = taken + 1
+                    if old_serviceman_id:
+                        booked[(old_serviceman_id, date)] = booked.get((old_serviceman_id, date), 1) - 1
+
+            previous_status, previous_entered_at = service_request.status, service_request.status_entered_at
+            if serviceman_id:
+                service_request.serviceman = servicemen[serviceman_id]
+                service_request.claimed_by = None
+                service_request.claimed_until = None
+            if backup_id:
+                service_request.backup_serviceman = servicemen[backup_id]
+            # STEP 2: Update status when admin assigns serviceman
+            if serviceman_id and service_request.status == 'PENDING_ADMIN_ASSIGNMENT':
+                service_request.status = 'PENDING_ESTIMATION'
+                service_request.status_entered_at = now
+                history.append(build_history_entry(
+                    service_request, previous_status, previous_entered_at, now, changed_by=actor,
+                ))
+            service_request.updated_at = now
+            changed.append(service_request)
+
+            notifications += assignment_notifications(
+                service_request, service_request.serviceman if serviceman_id else None,
+                service_request.backup_serviceman if backup_id else None,
+                old_serviceman_id, old_backup_id, item.get('notes', ''),
+            )
+            if old_serviceman_id and old_serviceman_id != service_request.serviceman_id:
+                moved.append((service_request, previous_status, old_serviceman_id))
+            outcome.update(
+                result=ASSIGNED, status=service_request.status,
+                serviceman_id=service_request.serviceman_id, backup_serviceman_id=service_request.backup_serviceman_id,
+            )
+
+        if changed:
+            ServiceRequest.objects.bulk_update(changed, UPDATE_FIELDS, batch_size=MAX_BATCH_SIZE)
+            record_status_changes(history)
+            create_notifications(notifications)
+        # What the post_save signals do for reassignments made through save()
+        for service_request, previous_status, old_serviceman_id in moved:
+            sync_serviceman_availability(service_request, previous_status, servicemen.get(old_serviceman_id))
+        if moved:
+            invalidate_servicemen({
+                user_id for service_request, _, old_serviceman_id in moved
+                for user_id in (service_request.serviceman_id, service_request.backup_serviceman_id, old_serviceman_id)
+            } - {None})
+
+    logger.info(
+        f"Admin {actor.username} bulk-assigned {len(changed)} of {len(items)} requests "
+        f"{[service_request.id for service_request in changed]}"
+    )
+    return outcomes
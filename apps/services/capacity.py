@@ -0,0 +1,121 @@
+"""
+Serviceman capacity calendar.
+
+Each approved serviceman has ServicemanProfile.daily_capacity job slots per
+day. A slot is taken by every live (not deleted, not cancelled) request the
+serviceman is the primary on for that booking_date; backups do not take a
+slot. Bookings are counted from ServiceRequest itself through the partial
+(serviceman, booking_date) index, so there is no separate slot table that
+cancellations, deletions or reassignments could leave out of sync.
+
+- free_servicemen(category_id, date): servicemen of a category with a free slot
+  on date - one query, a correlated COUNT per profile on the index.
+- calendar(serviceman_id, start, days): booked/free slots per day - one
+  grouped query over the index range.
+- reserve_slot(serviceman_id, date): the assignment-time check. It locks the
+  serviceman's user row (SELECT ... FOR UPDATE) before counting, so concurrent
+  assignments of the same serviceman are serialized and cannot both take the
+  last slot. Call it inside the transaction that saves the assignment.
+  Batch assignment (assignment.py) locks all its servicemen at once and uses
+  daily_capacities()/booked_counts() directly.
+"""
+import datetime
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.users.models import ServicemanProfile, User
+from .models import ServiceRequest
+
+MAX_CALENDAR_DAYS = 62
+
+
+class SlotUnavailable(Exception):
+    """The serviceman has no free slot left on the booking date"""
+
+    def __init__(self, serviceman, booking_date, booked, capacity):
+        self.serviceman = serviceman
+        self.booking_date = booking_date
+        self.booked = booked
+        self.capacity = capacity
+        super().__init__(
+            f"Serviceman {serviceman.username} is fully booked on {booking_date} "
+            f"({booked}/{capacity} jobs)"
+        )
+
+
+def bookings():
+    """Requests that take a slot"""
+    return ServiceRequest.objects.filter(is_deleted=False, serviceman__isnull=False).exclude(status='CANCELLED')
+
+
+def _booked_on(booking_date):
+    return Coalesce(
+        Subquery(
+            bookings().filter(serviceman_id=OuterRef('user_id'), booking_date=booking_date)
+            .order_by().values('serviceman_id').annotate(booked=Count('pk')).values('booked')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def free_servicemen(category_id, booking_date):
+    """Approved servicemen of the category with a free slot on booking_date, annotated with `booked`"""
+    return ServicemanProfile.objects.filter(
+        category_id=category_id, is_approved=True
+    ).annotate(booked=_booked_on(booking_date)).filter(booked__lt=F('daily_capacity'))
+
+
+def calendar(serviceman_id, start, days, capacity):
+    """[{date, booked, capacity, free}] for days days from start"""
+    end = start + datetime.timedelta(days=days - 1)
+    booked = dict(
+        bookings().filter(serviceman_id=serviceman_id, booking_date__range=(start, end))
+        .order_by().values('booking_date').annotate(booked=Count('pk')).values_list('booking_date', 'booked')
+    )
+    return [
+        {
+            "date": day,
+            "booked": booked.get(day, 0),
+            "capacity": capacity,
+            "free": max(capacity - booked.get(day, 0), 0),
+        }
+        for day in (start + datetime.timedelta(days=n) for n in range(days))
+    ]
+
+
+def daily_capacities(serviceman_ids):
+    """{serviceman_id: daily_capacity}; servicemen without a profile get the default"""
+    default = ServicemanProfile._meta.get_field('daily_capacity').default
+    capacities = dict(
+        ServicemanProfile.objects.filter(user_id__in=serviceman_ids).values_list('user_id', 'daily_capacity')
+    )
+    return {serviceman_id: capacities.get(serviceman_id, default) for serviceman_id in serviceman_ids}
+
+
+def booked_counts(serviceman_ids, booking_dates, exclude_request_ids=()):
+    """{(serviceman_id, booking_date): bookings} in one grouped query"""
+    taken = bookings().filter(serviceman_id__in=serviceman_ids, booking_date__in=booking_dates)
+    if exclude_request_ids:
+        taken = taken.exclude(pk__in=exclude_request_ids)
+    return {
+        (serviceman_id, booking_date): booked
+        for serviceman_id, booking_date, booked in taken.order_by().values('serviceman_id', 'booking_date')
+        .annotate(booked=Count('pk')).values_list('serviceman_id', 'booking_date', 'booked')
+    }
+
+
+def reserve_slot(serviceman_id, booking_date, exclude_request_id=None):
+    """
+    Check the serviceman has a free slot on booking_date, holding a lock on
+    the serviceman until the surrounding transaction ends. Raises SlotUnavailable.
+    """
+    serviceman = User.objects.select_for_update().only('id', 'username').get(pk=serviceman_id)
+    capacity = daily_capacities([serviceman_id])[serviceman_id]
+    booked = booked_counts(
+        [serviceman_id], [booking_date], [exclude_request_id] if exclude_request_id is not None else ()
+    ).get((serviceman_id, booking_date), 0)
+    if booked >= capacity:
+        raise SlotUnavailable(serviceman, booking_date, booked, capacity)
+    return booked + 1, capacity
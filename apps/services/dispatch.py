@@ -0,0 +1,114 @@
+"""
+Priority dispatch queue for admin assignment.
+
+Requests waiting for a serviceman (PENDING_ADMIN_ASSIGNMENT) are worked in
+priority order: emergencies first, then the earliest booking date, then the
+oldest request. A partial index on exactly that order, restricted to live
+requests in that status, keeps both the listing and the claim query an index
+range scan however many requests have ever been made.
+
+Several admins work the queue at once by claiming requests. claim_next()
+selects the first unclaimed rows with SELECT ... FOR UPDATE SKIP LOCKED, so
+concurrent claims skip the rows another transaction is claiming instead of
+waiting on them or taking the same ones, and marks them claimed_by the admin
+for CLAIM_TTL. Expired claims return to the queue; assigning a serviceman
+takes the request out of the queue for good.
+"""
+import base64
+import datetime
+import json
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import ServiceRequest
+
+QUEUE_STATUS = 'PENDING_ADMIN_ASSIGNMENT'
+QUEUE_ORDER = ('-is_emergency', 'booking_date', 'created_at', 'pk')
+CLAIM_TTL = datetime.timedelta(minutes=10)
+MAX_CLAIM = 20
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def queue():
+    return ServiceRequest.objects.filter(status=QUEUE_STATUS)
+
+
+def unclaimed(now=None):
+    now = now or timezone.now()
+    return queue().filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now))
+
+
+def encode_cursor(service_request):
+    raw = json.dumps([
+        service_request.is_emergency, service_request.booking_date.isoformat(),
+        service_request.created_at.isoformat(), service_request.pk,
+    ])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(is_emergency, booking_date, created_at, pk); raises ValueError for anything malformed"""
+    try:
+        is_emergency, booking_date, created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        booking_date, created_at = parse_date(booking_date), parse_datetime(created_at)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(is_emergency, bool) or booking_date is None or created_at is None or not isinstance(pk, int):
+        raise ValueError('Invalid cursor')
+    return is_emergency, booking_date, created_at, pk
+
+
+def _after(cursor):
+    """Rows after the cursor in QUEUE_ORDER"""
+    is_emergency, booking_date, created_at, pk = decode_cursor(cursor)
+    return (
+        Q(is_emergency__lt=is_emergency)
+        | Q(is_emergency=is_emergency, booking_date__gt=booking_date)
+        | Q(is_emergency=is_emergency, booking_date=booking_date, created_at__gt=created_at)
+        | Q(is_emergency=is_emergency, booking_date=booking_date, created_at=created_at, pk__gt=pk)
+    )
+
+
+def _with_related(queryset):
+    return queryset.select_related('client', 'category', 'claimed_by')
+
+
+def queue_page(cursor=None, limit=DEFAULT_PAGE_SIZE, unclaimed_only=False):
+    """One page of the queue after cursor: (requests, next_cursor or None)"""
+    queryset = unclaimed() if unclaimed_only else queue()
+    if cursor:
+        queryset = queryset.filter(_after(cursor))
+
+    # One extra row tells whether there is a next page without a count
+    rows = list(_with_related(queryset).order_by(*QUEUE_ORDER)[:limit + 1])
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
+
+
+def claim_next(admin, count=1):
+    """Claim up to count of the highest-priority unclaimed requests for admin"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            unclaimed(now).select_for_update(skip_locked=True).order_by(*QUEUE_ORDER).values_list('pk', flat=True)[:count]
+        )
+        if ids:
+            ServiceRequest.objects.filter(pk__in=ids).update(
+                claimed_by=admin, claimed_until=now + CLAIM_TTL, updated_at=now
+            )
+    claimed = {service_request.pk: service_request for service_request in _with_related(ServiceRequest.objects.filter(pk__in=ids))}
+    return [claimed[pk] for pk in ids if pk in claimed]
+
+
+def release(service_request_id, admin):
+    """Give back admin's claim on a request; False if admin does not hold it"""
+    return bool(
+        ServiceRequest.objects.filter(pk=service_request_id, claimed_by=admin, status=QUEUE_STATUS).update(
+            claimed_by=None, claimed_until=None, updated_at=timezone.now()
+        )
+    )
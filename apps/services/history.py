@@ -0,0 +1,32 @@
+"""
+Status history recording helpers.
+
+History rows are built in memory and written with one bulk INSERT inside the
+same transaction as the status change, so recording never costs a separate
+round trip per transition and never leaves a status change without its row.
+"""
+from .models import ServiceRequestStatusHistory
+
+
+def build_history_entry(service_request, previous_status, previous_entered_at, changed_at,
+                        changed_by=None, notes='', is_automated=False):
+    """Unsaved history row for service_request's move from previous_status to its current status"""
+    duration = None
+    if previous_status and previous_entered_at:
+        duration = changed_at - previous_entered_at
+    return ServiceRequestStatusHistory(
+        service_request_id=service_request.pk,
+        previous_status=previous_status,
+        new_status=service_request.status,
+        changed_at=changed_at,
+        entered_at=previous_entered_at if previous_status else None,
+        duration_in_previous=duration,
+        changed_by=changed_by,
+        notes=notes,
+        is_automated=is_automated,
+    )
+
+
+def record_status_changes(entries, batch_size=500):
+    """Write history rows built by build_history_entry in as few INSERTs as possible"""
+    return ServiceRequestStatusHistory.objects.bulk_create(entries, batch_size=batch_size)
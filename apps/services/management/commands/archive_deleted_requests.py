@@ -0,0 +1,46 @@
+"""
+Management command to move old soft-deleted service requests to cold storage.
+
+Run with: python manage.py archive_deleted_requests [--days 90] [--batch-size 500] [--dry-run]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.services.archive import DEFAULT_BATCH_SIZE, archive_deleted_requests
+
+
+class Command(BaseCommand):
+    help = 'Move service requests soft-deleted more than --days ago to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Archive requests deleted more than this many days ago (default: 90)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Requests moved per transaction (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the requests that would be archived'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        count = archive_deleted_requests(
+            cutoff,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{count} deleted service request(s) would be archived'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ Archived {count} deleted service request(s)'))
@@ -0,0 +1,94 @@
+# Generated manually for service request status history tracking
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+import django.db.models.deletion
+import django.utils.timezone
+
+
+STATUS_CHOICES = [
+    ('PENDING_ADMIN_ASSIGNMENT', 'Pending Admin Assignment'),
+    ('PENDING_ESTIMATION', 'Pending Estimation'),
+    ('ESTIMATION_SUBMITTED', 'Estimation Submitted'),
+    ('AWAITING_CLIENT_APPROVAL', 'Awaiting Client Approval'),
+    ('PAYMENT_COMPLETED', 'Payment Completed'),
+    ('IN_PROGRESS', 'In Progress'),
+    ('COMPLETED', 'Completed'),
+    ('CLIENT_REVIEWED', 'Client Reviewed'),
+    ('CANCELLED', 'Cancelled'),
+    ('ASSIGNED_TO_SERVICEMAN', 'Assigned to Serviceman'),
+    ('SERVICEMAN_INSPECTED', 'Serviceman Inspected'),
+    ('NEGOTIATING', 'Negotiating'),
+    ('AWAITING_PAYMENT', 'Awaiting Payment'),
+    ('PAYMENT_CONFIRMED', 'Payment Confirmed'),
+]
+
+
+def backfill_status_entered_at(apps, schema_editor):
+    """
+    Best available estimate for existing rows: requests still in their initial
+    status entered it at creation; for the rest the last update is used.
+    """
+    ServiceRequest = apps.get_model('services', 'ServiceRequest')
+    ServiceRequest.objects.filter(status='PENDING_ADMIN_ASSIGNMENT').update(status_entered_at=F('created_at'))
+    ServiceRequest.objects.filter(status_entered_at__isnull=True).update(status_entered_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0004_add_preferred_serviceman'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerequest',
+            name='status_entered_at',
+            field=models.DateTimeField(blank=True, help_text='When the current status was entered', null=True),
+        ),
+        migrations.RunPython(backfill_status_entered_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ServiceRequestStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('previous_status', models.CharField(blank=True, choices=STATUS_CHOICES, help_text='Previous status (null for initial creation)', max_length=32, null=True)),
+                ('new_status', models.CharField(choices=STATUS_CHOICES, help_text='New status', max_length=32)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='When the status was changed')),
+                ('entered_at', models.DateTimeField(blank=True, help_text='When the request entered previous_status (null for initial creation)', null=True)),
+                ('duration_in_previous', models.DurationField(blank=True, help_text='Time spent in previous_status (changed_at - entered_at)', null=True)),
+                ('notes', models.TextField(blank=True, help_text='Optional notes explaining why the status was changed')),
+                ('is_automated', models.BooleanField(default=False, help_text='Whether this change was automated (e.g., payment confirmation)')),
+                ('changed_by', models.ForeignKey(help_text='User who made the change', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_changes_made', to=settings.AUTH_USER_MODEL)),
+                ('service_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='services.servicerequest')),
+            ],
+            options={
+                'verbose_name': 'Service Request Status History',
+                'verbose_name_plural': 'Service Request Status Histories',
+                'ordering': ['-changed_at'],
+                'indexes': [
+                    models.Index(fields=['service_request', '-changed_at'], name='services_se_service_ddb2b5_idx'),
+                    models.Index(fields=['changed_by', '-changed_at'], name='services_se_changed_59b49e_idx'),
+                    models.Index(fields=['previous_status', 'changed_at'], name='services_sr_history_prev_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='ServiceRequestNote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_type', models.CharField(choices=[('CLIENT', 'Client Note'), ('SERVICEMAN', 'Serviceman Note'), ('ADMIN', 'Admin Note'), ('SYSTEM', 'System Note')], default='SYSTEM', max_length=20)),
+                ('content', models.TextField()),
+                ('is_visible_to_client', models.BooleanField(default=True, help_text='Whether this note is visible to the client')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='service_request_notes', to=settings.AUTH_USER_MODEL)),
+                ('service_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notes', to='services.servicerequest')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['service_request', '-created_at'], name='services_se_service_bb26c2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated manually for the SLA scanner
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_status_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerequest',
+            name='sla_alerted_at',
+            field=models.DateTimeField(blank=True, help_text='Last SLA breach alert (one alert per status)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(
+                condition=models.Q(
+                    ('is_deleted', False),
+                    ('status__in', [
+                        'PENDING_ADMIN_ASSIGNMENT',
+                        'PENDING_ESTIMATION',
+                        'ESTIMATION_SUBMITTED',
+                        'AWAITING_CLIENT_APPROVAL',
+                        'PAYMENT_COMPLETED',
+                        'IN_PROGRESS',
+                        'COMPLETED',
+                    ]),
+                ),
+                fields=['status', 'status_entered_at'],
+                name='services_sr_sla_open_idx',
+            ),
+        ),
+    ]
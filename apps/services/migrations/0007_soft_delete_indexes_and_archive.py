@@ -0,0 +1,42 @@
+# Generated manually for the live (non-deleted) manager and request archival
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0006_sla_tracking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['status'], name='services_sr_live_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['client', '-created_at'], name='services_sr_live_client_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['serviceman', '-created_at'], name='services_sr_live_sm_idx'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedServiceRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('client_id', models.BigIntegerField(db_index=True)),
+                ('status', models.CharField(max_length=32)),
+                ('created_at', models.DateTimeField()),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'ordering': ['-archived_at'],
+            },
+        ),
+    ]
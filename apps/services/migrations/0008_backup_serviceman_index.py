@@ -0,0 +1,17 @@
+# Generated manually for the serviceman request listing (UNION of primary/backup scans)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0007_soft_delete_indexes_and_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['backup_serviceman', '-created_at'], name='services_sr_live_backup_idx'),
+        ),
+    ]
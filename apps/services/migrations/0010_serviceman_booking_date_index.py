@@ -0,0 +1,21 @@
+# Generated manually for the serviceman capacity calendar
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0009_service_request_location'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(
+                condition=models.Q(('is_deleted', False)),
+                fields=['serviceman', 'booking_date'],
+                name='services_sr_sm_date_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated manually for the admin dispatch queue
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0010_serviceman_booking_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicerequest',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, help_text='Admin working this request in the dispatch queue', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_requests', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='servicerequest',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text='When the dispatch claim expires', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(
+                condition=models.Q(('is_deleted', False), ('status', 'PENDING_ADMIN_ASSIGNMENT')),
+                fields=['-is_emergency', 'booking_date', 'created_at'],
+                name='services_sr_dispatch_idx',
+            ),
+        ),
+    ]
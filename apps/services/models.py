@@ -1,4 +1,7 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 from apps.users.models import User
 
 class Category(models.Model):
@@ -12,6 +15,51 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+# Open workflow statuses that carry an SLA deadline (see apps/services/sla.py)
+SLA_TRACKED_STATUSES = [
+    'PENDING_ADMIN_ASSIGNMENT',
+    'PENDING_ESTIMATION',
+    'ESTIMATION_SUBMITTED',
+    'AWAITING_CLIENT_APPROVAL',
+    'PAYMENT_COMPLETED',
+    'IN_PROGRESS',
+    'COMPLETED',
+]
+
+
+class ServiceRequestQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(is_deleted=False)
+
+    def deleted(self):
+        return self.filter(is_deleted=True)
+
+    def for_serviceman(self, user):
+        """
+        Requests where user is the primary or backup serviceman.
+
+        An OR across the two FK columns cannot be served by either index on its
+        own, so the ids come from a UNION of two index range scans
+        (services_sr_live_sm_idx and services_sr_live_backup_idx).
+        """
+        live = self.model.objects
+        ids = live.filter(serviceman=user).values('pk').union(
+            live.filter(backup_serviceman=user).values('pk')
+        )
+        return self.filter(pk__in=ids)
+
+    def soft_delete(self):
+        now = timezone.now()
+        return self.update(is_deleted=True, deleted_at=now, updated_at=now)
+
+
+class LiveServiceRequestManager(models.Manager.from_queryset(ServiceRequestQuerySet)):
+    """Default manager: hides soft-deleted requests (ServiceRequest.all_objects sees them)"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class ServiceRequest(models.Model):
     STATUS_CHOICES = [
         # Initial State
@@ -51,11 +99,19 @@ class ServiceRequest(models.Model):
     is_emergency = models.BooleanField(default=False)
     auto_flagged_emergency = models.BooleanField(default=False)
     status = models.CharField(max_length=32, choices=STATUS_CHOICES)
+    status_entered_at = models.DateTimeField(null=True, blank=True, help_text="When the current status was entered")
+    sla_alerted_at = models.DateTimeField(null=True, blank=True, help_text="Last SLA breach alert (one alert per status)")
+    # Dispatch queue claim (see dispatch.py)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_requests', help_text="Admin working this request in the dispatch queue")
+    claimed_until = models.DateTimeField(null=True, blank=True, help_text="When the dispatch claim expires")
     initial_booking_fee = models.DecimalField(max_digits=10, decimal_places=2)
     serviceman_estimated_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     admin_markup_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=10.00)
     final_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     client_address = models.TextField()
+    # Service location, defaulting to the client's saved location (see apps/users/geo.py)
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
     service_description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -64,12 +120,65 @@ class ServiceRequest(models.Model):
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    objects = LiveServiceRequestManager()
+    all_objects = ServiceRequestQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['client']),
             models.Index(fields=['serviceman']),
             models.Index(fields=['booking_date']),
+            # Hot paths of the default (live) manager; deleted rows are left out of the index
+            models.Index(fields=['status'], name='services_sr_live_status_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['client', '-created_at'], name='services_sr_live_client_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['serviceman', '-created_at'], name='services_sr_live_sm_idx', condition=models.Q(is_deleted=False)),
+            models.Index(fields=['backup_serviceman', '-created_at'], name='services_sr_live_backup_idx', condition=models.Q(is_deleted=False)),
+            # Capacity calendar: a serviceman's bookings on a date (apps/services/capacity.py)
+            models.Index(
+                fields=['serviceman', 'booking_date'],
+                name='services_sr_sm_date_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+            # Dispatch queue: requests awaiting assignment in priority order (dispatch.py)
+            models.Index(
+                fields=['-is_emergency', 'booking_date', 'created_at'],
+                name='services_sr_dispatch_idx',
+                condition=models.Q(status='PENDING_ADMIN_ASSIGNMENT', is_deleted=False),
+            ),
+            # SLA scanner: range scan over open requests by time in status
+            models.Index(
+                fields=['status', 'status_entered_at'],
+                name='services_sr_sla_open_idx',
+                condition=models.Q(status__in=SLA_TRACKED_STATUSES, is_deleted=False),
+            ),
         ]
     def __str__(self):
-        return f"{self.client} - {self.category} - {self.status}"
\ No newline at end of file
+        return f"{self.client} - {self.category} - {self.status}"
+
+
+class ArchivedServiceRequest(models.Model):
+    """
+    Cold storage for soft-deleted service requests.
+
+    Filled by the archive_deleted_requests command. The payload keeps the
+    request columns plus its status history and notes as JSON, so the hot
+    table and its indexes only carry live data.
+    """
+    original_id = models.BigIntegerField(unique=True)
+    client_id = models.BigIntegerField(db_index=True)
+    status = models.CharField(max_length=32)
+    created_at = models.DateTimeField()
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ['-archived_at']
+
+    def __str__(self):
+        return f"Archived request #{self.original_id} ({self.status})"
+
+
+# Registered here so the history/notes models are part of the services app
+from .status_history_models import ServiceRequestStatusHistory, ServiceRequestNote  # noqa: E402,F401
@@ -0,0 +1,196 @@
+"""
+Assignment recommender.
+
+Ranks servicemen for a service request so admins can pick a primary and
+backups in one call instead of browsing CategoryServicemenListView.
+
+Per-category candidate pools (approved servicemen with their skills, rating and
+availability) are cached with config.versioned_cache.read_through under a
+per-category version counter, bumped on commit by the signals in signals.py
+and by invalidate_servicemen() whenever a profile, its skills or its
+availability changes. A pool built from a pre-commit snapshot is stored under
+the old version, which no reader asks for once the bump lands. Active-job load is always read
+live with a single grouped query, so a pool hit costs one query per request.
+
+Score components (higher is better):
+- category:     servicemen in the request's category
+- skills:       per active skill whose name appears in the service description
+- availability: denormalized ServicemanProfile.is_available
+- load:         penalty per open job already assigned as primary serviceman
+- rating:       Bayesian-smoothed average, so 1 review of 5 stars does not
+                outrank 40 reviews averaging 4.8
+- preferred:    the client's preferred_serviceman
+- distance:     when the request and serviceman both have a location, falls
+                linearly from DISTANCE_WEIGHT at the request's location to 0 at
+                the edge of the serviceman's service radius (apps/users/geo.py)
+"""
+import logging
+
+from django.db.models import Count, Prefetch
+
+from apps.users.geo import haversine_km
+from apps.users.models import ServicemanProfile, Skill
+from config.versioned_cache import bump, read_through
+from .models import ServiceRequest
+
+logger = logging.getLogger(__name__)
+
+POOL_CACHE_KEY = 'assignment:pool:{}'
+POOL_VERSION = 'assignment_pool:{}'
+POOL_CACHE_TIMEOUT = 60 * 15
+
+CATEGORY_WEIGHT = 30
+SKILL_WEIGHT = 10
+MAX_SKILL_SCORE = 20
+AVAILABILITY_WEIGHT = 20
+LOAD_PENALTY = 5
+MAX_LOAD_PENALTY = 20
+RATING_WEIGHT = 20
+PREFERRED_WEIGHT = 25
+DISTANCE_WEIGHT = 20
+
+# Bayesian prior: every serviceman starts with PRIOR_WEIGHT virtual ratings of PRIOR_MEAN
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 5
+
+# Statuses in which an assigned job still occupies the serviceman
+OPEN_JOB_STATUSES = [
+    'PENDING_ESTIMATION',
+    'ESTIMATION_SUBMITTED',
+    'AWAITING_CLIENT_APPROVAL',
+    'PAYMENT_COMPLETED',
+    'IN_PROGRESS',
+]
+
+
+def _build_candidates(profiles):
+    profiles = profiles.filter(is_approved=True).select_related('user').prefetch_related(
+        Prefetch('skills', queryset=Skill.objects.filter(is_active=True))
+    )
+    return [
+        {
+            "id": profile.user_id,
+            "username": profile.user.username,
+            "full_name": profile.user.get_full_name() or profile.user.username,
+            "category_id": profile.category_id,
+            "rating": float(profile.rating),
+            "rating_sum": profile.rating_sum,
+            "rating_count": profile.rating_count,
+            "is_available": profile.is_available,
+            "skills": [skill.name for skill in profile.skills.all()],
+            "latitude": profile.latitude,
+            "longitude": profile.longitude,
+            "service_radius_km": profile.service_radius_km,
+        }
+        for profile in profiles
+    ]
+
+
+def get_candidate_pool(category_id):
+    """Approved servicemen of a category, cached until a profile in it changes"""
+    return read_through(
+        POOL_CACHE_KEY.format(category_id),
+        [POOL_VERSION.format(category_id)],
+        lambda: _build_candidates(ServicemanProfile.objects.filter(category_id=category_id)),
+        timeout=POOL_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_candidate_pools(category_ids):
+    """Move these categories' pools to a new version once the transaction commits"""
+    names = [POOL_VERSION.format(category_id) for category_id in set(category_ids) if category_id]
+    if names:
+        bump(names)
+
+
+def _active_job_counts(serviceman_ids):
+    rows = ServiceRequest.objects.filter(
+        serviceman_id__in=serviceman_ids,
+        status__in=OPEN_JOB_STATUSES,
+        is_deleted=False,
+    ).values('serviceman_id').annotate(jobs=Count('id')).order_by()
+    return {row['serviceman_id']: row['jobs'] for row in rows}
+
+
+def _distance_km(candidate, service_request):
+    if service_request.latitude is None or service_request.longitude is None:
+        return None
+    if candidate.get('latitude') is None or candidate.get('longitude') is None:
+        return None
+    return round(haversine_km(
+        service_request.latitude, service_request.longitude, candidate['latitude'], candidate['longitude']
+    ), 2)
+
+
+def _score(candidate, service_request, description, active_jobs, distance_km):
+    matched_skills = [name for name in candidate['skills'] if name.lower() in description]
+    smoothed_rating = (
+        (candidate['rating_sum'] + PRIOR_MEAN * PRIOR_WEIGHT)
+        / (candidate['rating_count'] + PRIOR_WEIGHT)
+    )
+    breakdown = {
+        "category": CATEGORY_WEIGHT if candidate['category_id'] == service_request.category_id else 0,
+        "skills": min(len(matched_skills) * SKILL_WEIGHT, MAX_SKILL_SCORE),
+        "availability": AVAILABILITY_WEIGHT if candidate['is_available'] else 0,
+        "load": -min(active_jobs * LOAD_PENALTY, MAX_LOAD_PENALTY),
+        "rating": round(smoothed_rating / 5 * RATING_WEIGHT, 2),
+        "preferred": PREFERRED_WEIGHT if candidate['id'] == service_request.preferred_serviceman_id else 0,
+        "distance": round(
+            DISTANCE_WEIGHT * max(0.0, 1 - distance_km / max(candidate['service_radius_km'], 1)), 2
+        ) if distance_km is not None else 0,
+    }
+    return {
+        "id": candidate['id'],
+        "username": candidate['username'],
+        "full_name": candidate['full_name'],
+        "rating": candidate['rating'],
+        "rating_count": candidate['rating_count'],
+        "is_available": candidate['is_available'],
+        "active_jobs_count": active_jobs,
+        "is_preferred": bool(breakdown['preferred']),
+        "matched_skills": matched_skills,
+        "distance_km": distance_km,
+        "score": round(sum(breakdown.values()), 2),
+        "score_breakdown": breakdown,
+    }
+
+
+def recommend_servicemen(service_request, backups=2, radius_km=None):
+    """
+    Rank candidates for a service request.
+
+    Returns {"primary": candidate or None, "backups": [...], "candidates_considered": n}.
+    The client's preferred serviceman is considered even if outside the category.
+    With radius_km (and a request location), only servicemen located within
+    radius_km of the request are considered.
+    """
+    candidates = list(get_candidate_pool(service_request.category_id))
+    preferred_id = service_request.preferred_serviceman_id
+    if preferred_id and not any(c['id'] == preferred_id for c in candidates):
+        candidates.extend(_build_candidates(ServicemanProfile.objects.filter(user_id=preferred_id)))
+
+    # The pool is small and cached: distances are computed on it directly
+    distances = {c['id']: _distance_km(c, service_request) for c in candidates}
+    if radius_km is not None and service_request.latitude is not None:
+        candidates = [
+            c for c in candidates
+            if distances[c['id']] is not None and distances[c['id']] <= radius_km
+        ]
+
+    if not candidates:
+        return {"primary": None, "backups": [], "candidates_considered": 0}
+
+    active_jobs = _active_job_counts([c['id'] for c in candidates])
+    description = (service_request.service_description or '').lower()
+    ranked = sorted(
+        (
+            _score(c, service_request, description, active_jobs.get(c['id'], 0), distances[c['id']])
+            for c in candidates
+        ),
+        key=lambda c: (-c['score'], c['active_jobs_count'], c['id']),
+    )
+    return {
+        "primary": ranked[0],
+        "backups": ranked[1:1 + backups],
+        "candidates_considered": len(ranked),
+    }
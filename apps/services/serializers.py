@@ -1,7 +1,8 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Category, ServiceRequest
+from .models import Category, ServiceRequest, ServiceRequestStatusHistory
 from apps.users.serializers import UserSerializer, ServicemanProfileSerializer
-from apps.users.models import User
+from apps.users.models import ServicemanProfile, User
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -36,7 +37,7 @@ class ServiceRequestSerializer(serializers.ModelSerializer):
             'serviceman', 'backup_serviceman', 'category', 'category_id',
             'booking_date', 'is_emergency', 'auto_flagged_emergency', 'status',
             'initial_booking_fee', 'serviceman_estimated_cost', 'admin_markup_percentage',
-            'final_cost', 'client_address', 'service_description',
+            'final_cost', 'client_address', 'latitude', 'longitude', 'service_description',
             'created_at', 'updated_at', 'inspection_completed_at', 'work_completed_at'
         ]
         read_only_fields = ['client', 'serviceman', 'backup_serviceman', 'status', 'created_at', 'updated_at']
@@ -74,4 +75,211 @@ class ServiceRequestSerializer(serializers.ModelSerializer):
         validated_data['is_emergency'] = is_emergency
         validated_data['initial_booking_fee'] = 5000 if is_emergency else 2000
         validated_data['status'] = 'PENDING_ADMIN_ASSIGNMENT'  # Initial state after booking fee payment
-        return super().create(validated_data)
\ No newline at end of file
+        # Default the service location to the client's saved location
+        if validated_data.get('latitude') is None or validated_data.get('longitude') is None:
+            profile = getattr(user, 'client_profile', None)
+            if profile is not None and profile.latitude is not None and profile.longitude is not None:
+                validated_data['latitude'], validated_data['longitude'] = profile.latitude, profile.longitude
+        return super().create(validated_data)
+
+
+def _display_name(user):
+    return (user.get_full_name() or user.username) if user else None
+
+
+class ServiceRequestListSerializer(serializers.ModelSerializer):
+    """
+    Compact service request row for list pages (ids, names and status).
+
+    Supports sparse fieldsets:
+    - ?fields=id,status,serviceman_name  returns only these fields
+    - ?expand=serviceman,category        embeds the full nested objects that
+                                         ServiceRequestSerializer returns
+
+    Use prepare_queryset() so only the columns and relations needed for the
+    requested fields are loaded.
+    """
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    client_name = serializers.SerializerMethodField()
+    serviceman_name = serializers.SerializerMethodField()
+    backup_serviceman_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ServiceRequest
+        fields = [
+            'id', 'status', 'status_display', 'booking_date', 'is_emergency',
+            'category_id', 'category_name', 'client_id', 'client_name',
+            'serviceman_id', 'serviceman_name', 'backup_serviceman_id', 'backup_serviceman_name',
+            'preferred_serviceman_id', 'initial_booking_fee', 'final_cost',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+    # field -> (columns for only(), relations for select_related())
+    FIELD_SOURCES = {
+        'status_display': (['status'], []),
+        'category_name': (['category', 'category__name'], ['category']),
+        'client_name': (['client', 'client__username', 'client__first_name', 'client__last_name'], ['client']),
+        'serviceman_name': (['serviceman', 'serviceman__username', 'serviceman__first_name', 'serviceman__last_name'], ['serviceman']),
+        'backup_serviceman_name': (
+            ['backup_serviceman', 'backup_serviceman__username', 'backup_serviceman__first_name', 'backup_serviceman__last_name'],
+            ['backup_serviceman'],
+        ),
+    }
+
+    # expansion -> (select_related(), prefetch_related())
+    EXPANSIONS = {
+        'client': (['client'], ['client__client_profile']),
+        'category': (['category'], []),
+        'serviceman': (['serviceman'], ['serviceman__client_profile']),
+        'backup_serviceman': (['backup_serviceman'], ['backup_serviceman__client_profile']),
+        'preferred_serviceman': (['preferred_serviceman'], ['preferred_serviceman__client_profile']),
+    }
+    # Expansions rendered with ServicemanProfileSerializer; see _profile_prefetch()
+    PROFILE_EXPANSIONS = {'serviceman', 'backup_serviceman', 'preferred_serviceman'}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in expand:
+            if name == 'client':
+                self.fields[name] = UserSerializer(read_only=True)
+            elif name == 'category':
+                self.fields[name] = CategorySerializer(read_only=True)
+            else:
+                self.fields[name] = serializers.SerializerMethodField()
+
+    @classmethod
+    def parse_params(cls, query_params):
+        """Validate ?fields= and ?expand=; returns (fields or None, expand)"""
+        def split(value):
+            return [part.strip() for part in value.split(',') if part.strip()]
+
+        fields = split(query_params['fields']) if 'fields' in query_params else None
+        expand = split(query_params.get('expand', ''))
+        errors = {}
+        unknown = sorted(set(fields or ()) - set(cls.Meta.fields))
+        if unknown:
+            errors['fields'] = [f"Unknown field(s): {', '.join(unknown)}"]
+        unknown = sorted(set(expand) - set(cls.EXPANSIONS))
+        if unknown:
+            errors['expand'] = [f"Cannot expand: {', '.join(unknown)}"]
+        if errors:
+            raise serializers.ValidationError(errors)
+        if fields is not None and 'id' not in fields:
+            fields.insert(0, 'id')
+        return fields, expand
+
+    @staticmethod
+    def _profile_prefetch(name):
+        """
+        Serviceman profiles with their skills and active job count loaded for
+        the whole page, so a nested profile costs no queries per row.
+        """
+        return Prefetch(
+            f'{name}__serviceman_profile',
+            queryset=ServicemanProfileSerializer.prepare_queryset(ServicemanProfile.objects.all()),
+        )
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields=None, expand=()):
+        """Restrict queryset to the columns and relations the requested fields need"""
+        columns, select, prefetch = {'id'}, set(), []
+        for name in (cls.Meta.fields if fields is None else fields):
+            # Foreign key ids are read from the local column, e.g. serviceman_id -> only('serviceman')
+            default = name[:-len('_id')] if name.endswith('_id') else name
+            sources, relations = cls.FIELD_SOURCES.get(name, ([default], []))
+            columns.update(sources)
+            select.update(relations)
+        for name in expand:
+            relations, prefetches = cls.EXPANSIONS[name]
+            # Expanded relations are loaded in full
+            columns = {column for column in columns if not column.startswith(f'{name}__')}
+            columns.add(name)
+            select.update(relations)
+            prefetch.extend(prefetches)
+            if name in cls.PROFILE_EXPANSIONS:
+                prefetch.append(cls._profile_prefetch(name))
+        queryset = queryset.only(*columns)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def get_client_name(self, obj):
+        return _display_name(obj.client)
+
+    def get_serviceman_name(self, obj):
+        return _display_name(obj.serviceman)
+
+    def get_backup_serviceman_name(self, obj):
+        return _display_name(obj.backup_serviceman)
+
+    def _profile(self, user):
+        if user and hasattr(user, 'serviceman_profile'):
+            return ServicemanProfileSerializer(user.serviceman_profile).data
+        return None
+
+    def get_serviceman(self, obj):
+        return self._profile(obj.serviceman)
+
+    def get_backup_serviceman(self, obj):
+        return self._profile(obj.backup_serviceman)
+
+    def get_preferred_serviceman(self, obj):
+        return self._profile(obj.preferred_serviceman)
+
+class ServiceRequestStatusHistorySerializer(serializers.ModelSerializer):
+    """One timeline entry; expects changed_by to be select_related"""
+    changed_by = serializers.SerializerMethodField()
+    duration_in_previous_seconds = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ServiceRequestStatusHistory
+        fields = [
+            'id', 'previous_status', 'new_status', 'changed_at', 'entered_at',
+            'duration_in_previous_seconds', 'changed_by', 'notes', 'is_automated'
+        ]
+        read_only_fields = fields
+
+    def get_changed_by(self, obj):
+        if obj.changed_by is None:
+            return None
+        return {
+            'id': obj.changed_by.id,
+            'username': obj.changed_by.username,
+            'user_type': obj.changed_by.user_type,
+        }
+
+    def get_duration_in_previous_seconds(self, obj):
+        if obj.duration_in_previous is None:
+            return None
+        return int(obj.duration_in_previous.total_seconds())
+
+
+class DispatchQueueSerializer(serializers.ModelSerializer):
+    """Flat row for the admin dispatch queue (see dispatch.py); expects client, category and claimed_by select_related"""
+    client_name = serializers.SerializerMethodField()
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    claimed_by = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ServiceRequest
+        fields = [
+            'id', 'is_emergency', 'auto_flagged_emergency', 'booking_date', 'created_at',
+            'client_id', 'client_name', 'category_id', 'category_name', 'client_address',
+            'service_description', 'claimed_by', 'claimed_until'
+        ]
+        read_only_fields = fields
+
+    def get_client_name(self, obj):
+        return obj.client.get_full_name() or obj.client.username
+
+    def get_claimed_by(self, obj):
+        if obj.claimed_by is None:
+            return None
+        return {'id': obj.claimed_by.id, 'username': obj.claimed_by.username}
@@ -5,9 +5,11 @@ Automatically manages serviceman availability based on job status:
 - Sets to BUSY when job is IN_PROGRESS
 - Sets to AVAILABLE when job is COMPLETED or CANCELLED
 """
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.db.models import Q
+from django.utils import timezone
+from apps.users.models import ServicemanProfile
 from .models import ServiceRequest
 
 
@@ -16,15 +18,44 @@ def store_previous_status(sender, instance, **kwargs):
     """Store the previous status before saving"""
     if instance.pk:
         try:
-            old_instance = ServiceRequest.objects.get(pk=instance.pk)
+            old_instance = ServiceRequest.all_objects.get(pk=instance.pk)
             instance._previous_status = old_instance.status
             instance._previous_serviceman = old_instance.serviceman
+            instance._previous_status_entered_at = old_instance.status_entered_at
         except ServiceRequest.DoesNotExist:
             instance._previous_status = None
             instance._previous_serviceman = None
+            instance._previous_status_entered_at = None
     else:
         instance._previous_status = None
         instance._previous_serviceman = None
+        instance._previous_status_entered_at = None
+    
+    # Start the clock for a new (or initial) status
+    if instance.pk is None or instance._previous_status != instance.status:
+        instance.status_entered_at = timezone.now()
+
+
+@receiver(post_save, sender=ServiceRequest)
+def record_status_history(sender, instance, created, **kwargs):
+    """
+    Record a history row for status changes made through save().
+    
+    Transitions made by apps.services.state_machine write their own row and
+    don't fire this signal. Views may set instance._status_changed_by.
+    """
+    from .history import build_history_entry, record_status_changes
+    
+    previous_status = getattr(instance, '_previous_status', None)
+    if not created and previous_status == instance.status:
+        return
+    record_status_changes([build_history_entry(
+        instance,
+        previous_status,
+        getattr(instance, '_previous_status_entered_at', None),
+        instance.status_entered_at or timezone.now(),
+        changed_by=getattr(instance, '_status_changed_by', None),
+    )])
 
 
 @receiver(post_save, sender=ServiceRequest)
@@ -38,9 +69,20 @@ def update_serviceman_availability(sender, instance, created, **kwargs):
     - If no active jobs: Set serviceman to AVAILABLE
     - If has active jobs: Keep serviceman as BUSY
     """
-    # Get previous status
-    previous_status = getattr(instance, '_previous_status', None)
-    previous_serviceman = getattr(instance, '_previous_serviceman', None)
+    sync_serviceman_availability(
+        instance,
+        getattr(instance, '_previous_status', None),
+        getattr(instance, '_previous_serviceman', None),
+    )
+
+
+def sync_serviceman_availability(instance, previous_status, previous_serviceman=None):
+    """
+    Apply the availability rules above for a status change.
+    
+    Shared by the post_save signal and the state machine hooks (queryset
+    updates made by apps.services.state_machine do not fire post_save).
+    """
     current_serviceman = instance.serviceman
     
     # Skip if no serviceman assigned
@@ -145,3 +187,57 @@ def log_manual_availability_change(sender, instance, **kwargs):
         except sender.DoesNotExist:
             pass
 
+
+
+# --- Assignment recommender candidate pools (see recommendations.py) ---
+
+@receiver(pre_save, sender='users.ServicemanProfile')
+def remember_previous_category(sender, instance, update_fields=None, **kwargs):
+    """Remember the old category so a move invalidates both pools"""
+    instance._previous_category_id = None
+    if instance.pk and (update_fields is None or 'category' in update_fields):
+        instance._previous_category_id = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('category_id', flat=True).first()
+
+
+@receiver(post_save, sender='users.ServicemanProfile')
+@receiver(post_delete, sender='users.ServicemanProfile')
+def invalidate_candidate_pool(sender, instance, **kwargs):
+    from .recommendations import invalidate_candidate_pools
+    invalidate_candidate_pools([
+        instance.category_id,
+        getattr(instance, '_previous_category_id', None),
+    ])
+
+
+@receiver(m2m_changed, sender=ServicemanProfile.skills.through)
+def invalidate_candidate_pool_for_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    from .recommendations import invalidate_candidate_pools
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_candidate_pools([instance.category_id])
+    elif pk_set:
+        invalidate_candidate_pools(
+            ServicemanProfile.objects.filter(pk__in=pk_set).values_list('category_id', flat=True)
+        )
+
+
+# --- HTTP validators for public serviceman endpoints (see apps/users/versions.py) ---
+
+@receiver(post_save, sender=ServiceRequest)
+def bump_serviceman_versions_for_request(sender, instance, created, **kwargs):
+    """Active job counts (IN_PROGRESS) are part of the public serviceman payloads"""
+    from apps.users.versions import invalidate_servicemen
+    
+    previous_status = getattr(instance, '_previous_status', None)
+    previous_serviceman = getattr(instance, '_previous_serviceman', None)
+    status_moved = previous_status != instance.status and 'IN_PROGRESS' in (previous_status, instance.status)
+    serviceman_moved = previous_serviceman is not None and previous_serviceman.pk != instance.serviceman_id
+    if status_moved or serviceman_moved:
+        invalidate_servicemen([
+            instance.serviceman_id,
+            instance.backup_serviceman_id,
+            previous_serviceman.pk if previous_serviceman else None,
+        ])
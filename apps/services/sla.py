@@ -0,0 +1,157 @@
+"""
+Service request SLA engine.
+
+Every open status has a deadline measured from status_entered_at, with a
+tighter threshold for emergency requests. scan_sla_breaches() finds requests
+past their deadline and alerts the people who can unblock them, once per status
+interval (sla_alerted_at >= status_entered_at means already alerted).
+
+The scan walks the partial index services_sr_sla_open_idx on
+(status, status_entered_at) with keyset pagination, so each chunk is a bounded
+index range scan and memory stays flat regardless of how many requests are
+open. Alerts for a chunk are written with one bulk INSERT plus one UPDATE.
+
+Run periodically by notifications.tasks.check_overdue_inspections (Celery beat).
+Deadlines can be overridden with settings.SERVICE_REQUEST_SLA_HOURS, e.g.
+{'PENDING_ESTIMATION': (24, 4)}.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.notifications.models import Notification
+from apps.users.models import User
+from .models import SLA_TRACKED_STATUSES, ServiceRequest
+
+logger = logging.getLogger(__name__)
+
+# status: (normal hours, emergency hours)
+DEFAULT_SLA_HOURS = {
+    'PENDING_ADMIN_ASSIGNMENT': (4, 1),
+    'PENDING_ESTIMATION': (48, 6),  # site inspection + estimate
+    'ESTIMATION_SUBMITTED': (24, 2),
+    'AWAITING_CLIENT_APPROVAL': (72, 12),
+    'PAYMENT_COMPLETED': (24, 2),
+    'IN_PROGRESS': (168, 24),
+    'COMPLETED': (48, 12),
+}
+
+# Who gets alerted, besides admins, when a request is stuck in a status
+STATUS_OWNERS = {
+    'PENDING_ESTIMATION': 'serviceman',
+    'AWAITING_CLIENT_APPROVAL': 'client',
+    'IN_PROGRESS': 'serviceman',
+}
+
+ALERT_NOTIFICATION_TYPE = 'ADMIN_ALERT'
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def get_sla_hours():
+    hours = dict(DEFAULT_SLA_HOURS)
+    hours.update(getattr(settings, 'SERVICE_REQUEST_SLA_HOURS', {}))
+    unknown = set(hours) - set(SLA_TRACKED_STATUSES)
+    if unknown:
+        # Statuses outside the partial index would fall back to a full scan
+        raise ValueError(f"SLA configured for untracked statuses: {sorted(unknown)}")
+    return hours
+
+
+def _format_age(delta):
+    hours = int(delta.total_seconds() // 3600)
+    if hours >= 48:
+        return f"{hours // 24} days"
+    return f"{hours} hours"
+
+
+def _build_alerts(row, status_label, now, admin_ids):
+    age = _format_age(now - row['status_entered_at'])
+    prefix = "🚨 EMERGENCY " if row['is_emergency'] else ""
+    title = f"{prefix}SLA Breach - Request #{row['id']}"
+    message = (
+        f"Service request #{row['id']} has been in '{status_label}' for {age}, "
+        f"which is past its deadline. Please follow up."
+    )
+    recipients = set(admin_ids)
+    owner = STATUS_OWNERS.get(row['status'])
+    if owner == 'serviceman' and row['serviceman_id']:
+        recipients.add(row['serviceman_id'])
+    elif owner == 'client':
+        recipients.add(row['client_id'])
+    return [
+        Notification(
+            user_id=user_id,
+            notification_type=ALERT_NOTIFICATION_TYPE,
+            title=title,
+            message=message,
+            service_request_id=row['id'],
+        )
+        for user_id in recipients
+    ]
+
+
+def _overdue_chunks(status, normal_hours, emergency_hours, now, chunk_size):
+    """Yield lists of overdue rows for one status, in index order, chunk_size at a time"""
+    normal_cutoff = now - timedelta(hours=normal_hours)
+    emergency_cutoff = now - timedelta(hours=emergency_hours)
+    queryset = ServiceRequest.objects.filter(
+        # Implies the partial index predicate; the range is on its second column
+        status=status,
+        is_deleted=False,
+        status_entered_at__lt=max(normal_cutoff, emergency_cutoff),
+    ).filter(
+        Q(is_emergency=True, status_entered_at__lt=emergency_cutoff) |
+        Q(is_emergency=False, status_entered_at__lt=normal_cutoff)
+    ).filter(
+        Q(sla_alerted_at__isnull=True) | Q(sla_alerted_at__lt=F('status_entered_at'))
+    ).order_by('status_entered_at', 'id').values(
+        'id', 'status', 'status_entered_at', 'is_emergency', 'client_id', 'serviceman_id'
+    )
+
+    last = None
+    while True:
+        page = queryset
+        if last is not None:
+            page = page.filter(
+                Q(status_entered_at__gt=last['status_entered_at']) |
+                Q(status_entered_at=last['status_entered_at'], id__gt=last['id'])
+            )
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+
+def scan_sla_breaches(now=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Alert on every open request past its SLA deadline.
+
+    Returns {status: number of requests alerted}.
+    """
+    now = now or timezone.now()
+    admin_ids = list(User.objects.filter(user_type=User.ADMIN, is_active=True).values_list('id', flat=True))
+    labels = dict(ServiceRequest.STATUS_CHOICES)
+    summary = {}
+
+    for status, (normal_hours, emergency_hours) in get_sla_hours().items():
+        alerted = 0
+        for rows in _overdue_chunks(status, normal_hours, emergency_hours, now, chunk_size):
+            notifications = []
+            for row in rows:
+                notifications.extend(_build_alerts(row, labels[status], now, admin_ids))
+            with transaction.atomic():
+                Notification.objects.bulk_create(notifications, batch_size=500)
+                ServiceRequest.objects.filter(pk__in=[row['id'] for row in rows]).update(sla_alerted_at=now)
+            alerted += len(rows)
+        if alerted:
+            summary[status] = alerted
+            logger.warning(f"SLA breach: {alerted} request(s) overdue in {status}")
+
+    return summary
@@ -0,0 +1,189 @@
+"""
+ServiceRequest state machine.
+
+The workflow status changes after assignment - estimate, final price, payment
+confirmation (payments PaymentVerifyView), work authorization, completion and
+review - go through apply_transition(), driven by the TRANSITIONS table below.
+Serviceman assignment (PENDING_ADMIN_ASSIGNMENT -> PENDING_ESTIMATION) is not a
+transition here: it locks the request and the serviceman's capacity slot itself
+(services/views.py, assignment.py). Each transition is one conditional UPDATE:
+
+    UPDATE services_servicerequest SET status=..., <changed fields>, updated_at=...
+    WHERE id=%s AND status=%s AND status_entered_at=%s
+
+so two concurrent calls cannot both move the same request, and only the fields
+the transition changes are written. If no row matches, TransitionError carries
+the status actually found in the database.
+
+The status history row is inserted in the same transaction (see history.py).
+Other side effects (notifications, counters, availability) are registered as
+hooks with @on_transition and run via transaction.on_commit, i.e. only once the
+status change is durable. Hook failures are logged, never raised.
+
+Note: queryset UPDATEs do not fire pre_save/post_save, so the availability
+rules in signals.py are applied here through a hook instead.
+"""
+import logging
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .history import build_history_entry, record_status_changes
+from .models import ServiceRequest
+
+logger = logging.getLogger(__name__)
+
+Transition = namedtuple('Transition', ['name', 'sources', 'target'])
+
+# target=None means the status is unchanged (the transition only records an action)
+TRANSITIONS = {
+    t.name: t for t in [
+        Transition('submit_estimate', ('PENDING_ESTIMATION',), 'ESTIMATION_SUBMITTED'),
+        Transition('finalize_price', ('ESTIMATION_SUBMITTED',), 'AWAITING_CLIENT_APPROVAL'),
+        Transition('confirm_payment', ('AWAITING_CLIENT_APPROVAL',), 'PAYMENT_COMPLETED'),
+        Transition('authorize_work', ('PAYMENT_COMPLETED',), 'IN_PROGRESS'),
+        Transition('complete_job', ('IN_PROGRESS',), 'COMPLETED'),
+        Transition('confirm_completion', ('COMPLETED',), None),
+        Transition('submit_review', ('COMPLETED',), 'CLIENT_REVIEWED'),
+    ]
+}
+
+_VALID_STATUSES = {code for code, _ in ServiceRequest.STATUS_CHOICES}
+for _t in TRANSITIONS.values():
+    assert set(_t.sources) <= _VALID_STATUSES and _t.target in _VALID_STATUSES | {None}, _t
+
+
+class TransitionError(Exception):
+    """The request was not in a status the transition can start from"""
+
+    def __init__(self, service_request, transition, current_status):
+        self.service_request = service_request
+        self.transition = transition
+        self.current_status = current_status
+        super().__init__(
+            f"Cannot {transition.name.replace('_', ' ')} request #{service_request.pk} "
+            f"from status {current_status}"
+        )
+
+    @property
+    def current_status_display(self):
+        return dict(ServiceRequest.STATUS_CHOICES).get(self.current_status, self.current_status)
+
+
+_hooks = defaultdict(list)
+
+
+def on_transition(*names):
+    """
+    Register a hook run on commit after any of the named transitions.
+
+    Hooks are called as hook(service_request, previous_status, transition).
+    """
+    def decorator(func):
+        for name in names:
+            if name not in TRANSITIONS:
+                raise ValueError(f"Unknown transition: {name}")
+            _hooks[name].append(func)
+        return func
+    return decorator
+
+
+def can_transition(service_request, name):
+    """Cheap pre-check against the in-memory status (apply_transition re-checks in SQL)"""
+    return service_request.status in TRANSITIONS[name].sources
+
+
+def _run_hook(hook, *args):
+    try:
+        hook(*args)
+    except Exception as e:
+        logger.error(f"Service request transition hook {hook.__name__} failed: {e}", exc_info=True)
+
+
+def apply_transition(service_request, name, fields=None, on_commit=(), changed_by=None, notes='',
+                     is_automated=False):
+    """
+    Atomically move service_request through transition `name`.
+
+    fields: extra column values written in the same UPDATE (e.g. final_cost)
+    on_commit: extra zero-argument callables run after commit (e.g. notifications)
+    changed_by / notes / is_automated: recorded on the status history row
+
+    Updates the instance in place and returns it. Raises TransitionError if the
+    row is no longer in the status the caller loaded.
+    """
+    transition = TRANSITIONS[name]
+    previous_status = service_request.status
+    if previous_status not in transition.sources:
+        raise TransitionError(service_request, transition, previous_status)
+
+    previous_entered_at = service_request.status_entered_at
+    now = timezone.now()
+    changes = dict(fields or {})
+    changes['updated_at'] = now
+    if transition.target:
+        changes['status'] = transition.target
+        changes['status_entered_at'] = now
+
+    # status_entered_at pins the exact status interval the caller loaded (guards A -> B -> A)
+    expected = {'pk': service_request.pk, 'status': previous_status}
+    if previous_entered_at is None:
+        expected['status_entered_at__isnull'] = True
+    else:
+        expected['status_entered_at'] = previous_entered_at
+
+    with transaction.atomic():
+        updated = ServiceRequest.objects.filter(**expected).update(**changes)
+        if not updated:
+            current_status = ServiceRequest.objects.filter(
+                pk=service_request.pk
+            ).values_list('status', flat=True).first()
+            raise TransitionError(service_request, transition, current_status)
+
+        for field, value in changes.items():
+            setattr(service_request, field, value)
+
+        if transition.target:
+            record_status_changes([build_history_entry(
+                service_request, previous_status, previous_entered_at, now,
+                changed_by=changed_by, notes=notes, is_automated=is_automated,
+            )])
+
+        for hook in _hooks[name]:
+            transaction.on_commit(lambda hook=hook: _run_hook(hook, service_request, previous_status, transition))
+        for callback in on_commit:
+            transaction.on_commit(lambda callback=callback: _run_hook(callback))
+
+    logger.info(
+        f"Service request #{service_request.pk}: {previous_status} -> "
+        f"{service_request.status} ({name})"
+    )
+    return service_request
+
+
+# ---------------------------------------------------------------------------
+# Default hooks
+# ---------------------------------------------------------------------------
+
+@on_transition('authorize_work', 'complete_job')
+def sync_availability(service_request, previous_status, transition):
+    from .signals import sync_serviceman_availability
+    sync_serviceman_availability(service_request, previous_status)
+
+
+@on_transition('complete_job')
+def increment_jobs_completed(service_request, previous_status, transition):
+    from apps.users.models import ServicemanProfile
+    if service_request.serviceman_id:
+        ServicemanProfile.objects.filter(user_id=service_request.serviceman_id).update(
+            total_jobs_completed=F('total_jobs_completed') + 1
+        )
+
+
+@on_transition('authorize_work', 'complete_job')
+def bump_serviceman_versions(service_request, previous_status, transition):
+    # Active job counts and total_jobs_completed show on the public profile/list endpoints
+    from apps.users.versions import invalidate_servicemen
+    invalidate_servicemen([service_request.serviceman_id, service_request.backup_serviceman_id])
@@ -2,8 +2,15 @@
 Service Request Status History Tracking
 
 This model tracks all status changes for service requests, providing a complete audit trail.
+
+Rows are written by apps.services.state_machine (same transaction as the
+status UPDATE) and by the post_save signal for code paths that still call
+ServiceRequest.save(). Each row is a closed interval: the request entered
+previous_status at entered_at and left it at changed_at, so time-in-status
+reports are plain scans of (previous_status, changed_at).
 """
 from django.db import models
+from django.utils import timezone
 from apps.users.models import User
 from .models import ServiceRequest
 
@@ -43,9 +50,20 @@ class ServiceRequestStatusHistory(models.Model):
         help_text="User who made the change"
     )
     changed_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         help_text="When the status was changed"
     )
+    entered_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the request entered previous_status (null for initial creation)"
+    )
+    duration_in_previous = models.DurationField(
+        null=True,
+        blank=True,
+        help_text="Time spent in previous_status (changed_at - entered_at)"
+    )
     notes = models.TextField(
         blank=True,
         help_text="Optional notes explaining why the status was changed"
@@ -64,6 +82,7 @@ class ServiceRequestStatusHistory(models.Model):
         indexes = [
             models.Index(fields=['service_request', '-changed_at']),
             models.Index(fields=['changed_by', '-changed_at']),
+            models.Index(fields=['previous_status', 'changed_at'], name='services_sr_history_prev_idx'),
         ]
     
     def __str__(self):
@@ -71,21 +90,8 @@ class ServiceRequestStatusHistory(models.Model):
     
     @property
     def time_in_previous_status(self):
-        """Calculate how long the request was in the previous status"""
-        if self.previous_status is None:
-            return None
-        
-        # Get the previous history entry
-        previous_entry = ServiceRequestStatusHistory.objects.filter(
-            service_request=self.service_request,
-            new_status=self.previous_status,
-            changed_at__lt=self.changed_at
-        ).first()
-        
-        if previous_entry:
-            duration = self.changed_at - previous_entry.changed_at
-            return duration
-        return None
+        """How long the request was in the previous status (stored when the row is written)"""
+        return self.duration_in_previous
 
 
 class ServiceRequestNote(models.Model):
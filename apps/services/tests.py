@@ -29,4 +29,568 @@ def test_service_request_flow(client_user, category):
         "service_description": "Fix it",
     }
     response = client.post(url, data)
-    assert response.status_code == 201
\ No newline at end of file
+    assert response.status_code == 201
+
+@pytest.mark.django_db
+def test_assignment_recommendations_rank_candidates(settings, django_capture_on_commit_callbacks):
+    from apps.users.models import ServicemanProfile, Skill
+    from .models import ServiceRequest
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    category = Category.objects.create(name="Plumbing", description="Pipes")
+    client_user = User.objects.create_user(username="reco_client", email="rc@example.com", password="x", user_type="CLIENT")
+    admin = User.objects.create_user(username="reco_admin", email="ra@example.com", password="x", user_type="ADMIN")
+    leak = Skill.objects.create(name="Leak detection")
+
+    servicemen = []
+    for name, available, rating_sum, rating_count in [("busy", False, 50, 10), ("skilled", True, 40, 10), ("new", True, 0, 0)]:
+        user = User.objects.create_user(username=name, email=f"{name}@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(user=user, defaults={
+            "category": category, "is_approved": True, "is_available": available,
+            "rating_sum": rating_sum, "rating_count": rating_count,
+        })
+        servicemen.append(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        servicemen[1].serviceman_profile.skills.add(leak)
+
+    request = ServiceRequest.objects.create(
+        client=client_user, category=category, booking_date="2025-10-05", status="PENDING_ADMIN_ASSIGNMENT",
+        initial_booking_fee=2000, client_address="addr", service_description="Leak detection under the sink",
+    )
+
+    api = APIClient()
+    api.force_authenticate(user=admin)
+    url = reverse("service-request-recommendations", kwargs={"pk": request.id})
+    response = api.get(url, {"backups": 1})
+    assert response.status_code == 200
+    assert response.data["primary"]["id"] == servicemen[1].id
+    assert response.data["primary"]["matched_skills"] == ["Leak detection"]
+    assert len(response.data["backups"]) == 1
+    assert response.data["candidates_considered"] == 3
+
+    # The client's preference outweighs skills
+    request.preferred_serviceman = servicemen[2]
+    request.save()
+    assert api.get(url).data["primary"]["id"] == servicemen[2].id
+
+    # A review is a queryset UPDATE, but the cached pool must still see the new rating
+    from apps.ratings.utils import record_rating
+    from .recommendations import get_candidate_pool
+    assert next(c for c in get_candidate_pool(category.id) if c["id"] == servicemen[2].id)["rating_count"] == 0
+    with django_capture_on_commit_callbacks(execute=True):
+        record_rating(servicemen[2].id, 5)
+    assert next(c for c in get_candidate_pool(category.id) if c["id"] == servicemen[2].id)["rating_count"] == 1
+
+    # A pool built from a pre-commit snapshot is written under the superseded version
+    from django.core.cache import cache
+    from apps.users.versions import category_servicemen_key
+    from config.http_cache import VERSION_KEY, get_versions
+    from config.versioned_cache import PAYLOAD_KEY, local_cache
+    from .recommendations import POOL_CACHE_KEY, POOL_VERSION
+    version = get_versions(POOL_VERSION.format(category.id))
+    stale_pool = get_candidate_pool(category.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        record_rating(servicemen[2].id, 1)
+    cache.set(PAYLOAD_KEY.format(POOL_CACHE_KEY.format(category.id), version), stale_pool)
+    local_cache.clear()
+    assert next(c for c in get_candidate_pool(category.id) if c["id"] == servicemen[2].id)["rating_count"] == 2
+
+
+@pytest.mark.django_db
+def test_state_machine_conditional_transition(django_capture_on_commit_callbacks):
+    from apps.users.models import ServicemanProfile
+    from .models import ServiceRequest
+    from .state_machine import TransitionError, apply_transition
+
+    category = Category.objects.create(name="Carpentry", description="Wood")
+    client_user = User.objects.create_user(username="sm_client", email="smc@example.com", password="x", user_type="CLIENT")
+    serviceman = User.objects.create_user(username="sm_worker", email="smw@example.com", password="x", user_type="SERVICEMAN")
+    profile, _ = ServicemanProfile.objects.update_or_create(
+        user=serviceman, defaults={"is_approved": True, "is_available": False}
+    )
+    request = ServiceRequest.objects.create(
+        client=client_user, serviceman=serviceman, category=category, booking_date="2025-10-05",
+        status="IN_PROGRESS", initial_booking_fee=2000, client_address="addr", service_description="Fix door",
+    )
+    stale = ServiceRequest.objects.get(pk=request.pk)
+
+    # Unrelated in-memory edits are not written by the transition UPDATE
+    request.service_description = "not saved"
+    with django_capture_on_commit_callbacks(execute=True):
+        apply_transition(request, "complete_job")
+    request.refresh_from_db()
+    assert request.status == "COMPLETED"
+    assert request.service_description == "Fix door"
+    profile.refresh_from_db()
+    assert profile.total_jobs_completed == 1
+
+    # A second caller holding the old status loses the race
+    with pytest.raises(TransitionError) as excinfo:
+        apply_transition(stale, "complete_job")
+    assert excinfo.value.current_status == "COMPLETED"
+    profile.refresh_from_db()
+    assert profile.total_jobs_completed == 1
+
+
+@pytest.mark.django_db
+def test_status_history_timeline(django_capture_on_commit_callbacks):
+    from .models import ServiceRequest, ServiceRequestStatusHistory
+    from .state_machine import apply_transition
+
+    category = Category.objects.create(name="Painting", description="Walls")
+    client_user = User.objects.create_user(username="tl_client", email="tlc@example.com", password="x", user_type="CLIENT")
+    admin = User.objects.create_user(username="tl_admin", email="tla@example.com", password="x", user_type="ADMIN")
+    request = ServiceRequest.objects.create(
+        client=client_user, category=category, booking_date="2025-10-05", status="ESTIMATION_SUBMITTED",
+        initial_booking_fee=2000, client_address="addr", service_description="Paint",
+    )
+    apply_transition(request, "finalize_price", changed_by=admin)
+
+    entries = list(ServiceRequestStatusHistory.objects.filter(service_request=request).order_by("changed_at", "id"))
+    assert [(e.previous_status, e.new_status) for e in entries] == [
+        (None, "ESTIMATION_SUBMITTED"),
+        ("ESTIMATION_SUBMITTED", "AWAITING_CLIENT_APPROVAL"),
+    ]
+    assert entries[1].changed_by == admin
+    assert entries[1].duration_in_previous == entries[1].changed_at - entries[0].changed_at
+
+    api = APIClient()
+    api.force_authenticate(user=client_user)
+    response = api.get(reverse("service-request-timeline", kwargs={"pk": request.id}))
+    assert response.status_code == 200
+    assert response.data["current_status"] == "AWAITING_CLIENT_APPROVAL"
+    assert len(response.data["timeline"]) == 2
+    assert "ESTIMATION_SUBMITTED" in response.data["time_in_status_seconds"]
+
+
+@pytest.mark.django_db
+def test_sla_scan_alerts_once_per_status():
+    from datetime import timedelta
+    from django.utils import timezone
+    from apps.notifications.models import Notification
+    from .models import ServiceRequest
+    from .sla import scan_sla_breaches
+
+    category = Category.objects.create(name="Roofing", description="Roofs")
+    client_user = User.objects.create_user(username="sla_client", email="slac@example.com", password="x", user_type="CLIENT")
+    User.objects.create_user(username="sla_admin", email="slaa@example.com", password="x", user_type="ADMIN")
+
+    def make_request(is_emergency, hours_waiting):
+        request = ServiceRequest.objects.create(
+            client=client_user, category=category, booking_date="2025-10-05", status="PENDING_ADMIN_ASSIGNMENT",
+            is_emergency=is_emergency, initial_booking_fee=2000, client_address="addr", service_description="Leak",
+        )
+        ServiceRequest.objects.filter(pk=request.pk).update(
+            status_entered_at=timezone.now() - timedelta(hours=hours_waiting)
+        )
+        return request
+
+    emergency = make_request(True, 2)      # emergency deadline 1h -> overdue
+    normal_recent = make_request(False, 2)  # normal deadline 4h -> fine
+    normal_old = make_request(False, 5)     # overdue
+    normal_older = make_request(False, 6)   # overdue
+
+    assert scan_sla_breaches(chunk_size=1) == {"PENDING_ADMIN_ASSIGNMENT": 3}
+    alerted = set(Notification.objects.filter(notification_type="ADMIN_ALERT").values_list("service_request_id", flat=True))
+    assert alerted == {emergency.id, normal_old.id, normal_older.id}
+    assert normal_recent.id not in alerted
+
+    # Already alerted for this status interval
+    assert scan_sla_breaches() == {}
+
+
+@pytest.mark.django_db
+def test_soft_deleted_requests_are_hidden_and_archived():
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.utils import timezone
+    from apps.payments.models import Payment
+    from .models import ArchivedServiceRequest, ServiceRequest
+
+    category = Category.objects.create(name="Painting", description="Walls")
+    client_user = User.objects.create_user(username="sd_client", email="sdc@example.com", password="x", user_type="CLIENT")
+    live, deleted = [
+        ServiceRequest.objects.create(
+            client=client_user, category=category, booking_date="2025-10-05", status="PENDING_ADMIN_ASSIGNMENT",
+            initial_booking_fee=2000, client_address="addr", service_description=description,
+        )
+        for description in ("Paint the hall", "Paint the porch")
+    ]
+    payment = Payment.objects.create(
+        service_request=deleted, payment_type="INITIAL_BOOKING", amount=2000,
+        paystack_reference="sd-ref", paystack_access_code="code", status="SUCCESSFUL",
+    )
+    ServiceRequest.objects.filter(pk=deleted.pk).soft_delete()
+
+    client = APIClient()
+    client.force_authenticate(user=client_user)
+    response = client.get(reverse("service-request-list-create"))
+    assert [row["id"] for row in response.data] == [live.id]
+    assert client.get(reverse("service-request-detail", args=[deleted.pk])).status_code == 404
+    assert ServiceRequest.all_objects.filter(pk=deleted.pk).exists()
+
+    # Too recent to archive
+    call_command("archive_deleted_requests", "--days", "30")
+    assert ArchivedServiceRequest.objects.count() == 0
+
+    ServiceRequest.all_objects.filter(pk=deleted.pk).update(deleted_at=timezone.now() - timedelta(days=31))
+    call_command("archive_deleted_requests", "--days", "30", "--batch-size", "1")
+
+    archived = ArchivedServiceRequest.objects.get()
+    assert archived.original_id == deleted.pk
+    assert archived.payload["request"]["service_description"] == "Paint the porch"
+    assert archived.payload["payment_ids"] == [payment.pk]
+    assert not ServiceRequest.all_objects.filter(pk=deleted.pk).exists()
+    payment.refresh_from_db()
+    assert payment.service_request_id is None
+    assert ServiceRequest.objects.filter(pk=live.pk).exists()
+
+
+def _make_serviceman_jobs():
+    from .models import ServiceRequest
+
+    category = Category.objects.create(name="Tiling", description="Tiles")
+    client_user = User.objects.create_user(username="un_client", email="unc@example.com", password="x", user_type="CLIENT")
+    serviceman = User.objects.create_user(username="un_sm", email="unsm@example.com", password="x", user_type="SERVICEMAN")
+    other = User.objects.create_user(username="un_other", email="uno@example.com", password="x", user_type="SERVICEMAN")
+
+    def make(**roles):
+        return ServiceRequest.objects.create(
+            client=client_user, category=category, booking_date="2025-10-05", status="PENDING_ESTIMATION",
+            initial_booking_fee=2000, client_address="addr", service_description="Tile it", **roles,
+        )
+
+    primary = make(serviceman=serviceman, backup_serviceman=other)
+    backup = make(serviceman=other, backup_serviceman=serviceman)
+    both = make(serviceman=serviceman, backup_serviceman=serviceman)
+    make(serviceman=other)
+    return serviceman, [primary, backup, both]
+
+
+@pytest.mark.django_db
+def test_serviceman_request_listing_unions_primary_and_backup():
+    serviceman, jobs = _make_serviceman_jobs()
+    client = APIClient()
+    client.force_authenticate(user=serviceman)
+    response = client.get(reverse("service-request-list-create"))
+    assert response.status_code == 200
+    assert sorted(row["id"] for row in response.data) == sorted(job.id for job in jobs)
+
+
+@pytest.mark.django_db
+def test_serviceman_request_listing_plan_uses_indexes():
+    from django.db import connection
+    from .models import ServiceRequest
+
+    if connection.vendor != "postgresql":
+        pytest.skip("Query plan assertions need PostgreSQL")
+
+    serviceman, _ = _make_serviceman_jobs()
+    with connection.cursor() as cursor:
+        # Tiny test tables would otherwise always be sequentially scanned
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    plan = ServiceRequest.objects.for_serviceman(serviceman).order_by("-created_at").explain()
+    assert "services_sr_live_sm_idx" in plan
+    assert "services_sr_live_backup_idx" in plan
+
+
+@pytest.mark.django_db
+def test_service_request_list_sparse_fieldsets(django_assert_num_queries):
+    serviceman, jobs = _make_serviceman_jobs()
+    client = APIClient()
+    client.force_authenticate(user=serviceman)
+    url = reverse("service-request-list-create")
+
+    with django_assert_num_queries(1):
+        rows = client.get(url).data
+    assert rows[0]["serviceman_name"] and "client" not in rows[0]
+
+    rows = client.get(url, {"fields": "status,serviceman_name"}).data
+    assert set(rows[0]) == {"id", "status", "serviceman_name"}
+
+    rows = client.get(url, {"fields": "id", "expand": "category"}).data
+    assert set(rows[0]) == {"id", "category"}
+    assert rows[0]["category"]["name"] == "Tiling"
+
+    # Nested servicemen: profiles, skills and active job counts are loaded per page, not per row
+    from apps.users.models import ServicemanProfile
+    for user in User.objects.filter(user_type="SERVICEMAN"):
+        ServicemanProfile.objects.update_or_create(user=user, defaults={"category": jobs[0].category})
+    with django_assert_num_queries(7):
+        rows = client.get(url, {"expand": "serviceman,backup_serviceman"}).data
+    assert len(rows) == 3
+    assert all("active_jobs_count" in row["serviceman"] for row in rows)
+
+    response = client.get(url, {"fields": "id,secret", "expand": "payments"})
+    assert response.status_code == 400
+    assert set(response.data) == {"fields", "expand"}
+
+
+@pytest.mark.django_db
+def test_category_list_served_from_versioned_cache(settings, django_assert_num_queries, django_capture_on_commit_callbacks):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    Category.objects.create(name="Plumbing", description="Pipes")
+    client = APIClient()
+    url = reverse("category-list-create")
+    assert [c["name"] for c in client.get(url).data] == ["Plumbing"]
+
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert [c["name"] for c in response.data] == ["Plumbing"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.create(name="Roofing", description="Roofs")
+    assert sorted(c["name"] for c in client.get(url).data) == ["Plumbing", "Roofing"]
+
+
+@pytest.mark.django_db
+def test_category_servicemen_cached_and_invalidated(settings, django_assert_num_queries, django_capture_on_commit_callbacks):
+    from django.core.cache import cache
+    from apps.users.models import ServicemanProfile
+    from apps.users.versions import category_servicemen_key
+    from config.http_cache import VERSION_KEY, get_versions
+    from config.versioned_cache import STALE_KEY, LOCK_KEY, local_cache, read_through
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    serviceman, jobs = _make_serviceman_jobs()
+    ServicemanProfile.objects.update_or_create(user=serviceman, defaults={"category": jobs[0].category, "is_available": False})
+    client = APIClient()
+    url = reverse("category-servicemen", args=[jobs[0].category_id])
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert [(s["id"], s["active_jobs_count"]) for s in response.data["servicemen"]] == [(serviceman.id, 0)]
+    with django_assert_num_queries(0):
+        assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        jobs[0].status = "IN_PROGRESS"
+        jobs[0].save()
+    response = client.get(url)
+    assert response.data["servicemen"][0]["active_jobs_count"] > 0
+
+    # Unknown categories are a 404 and leave no payload or version counter behind
+    missing = jobs[0].category_id + 1000
+    response = client.get(reverse("category-servicemen", args=[missing]))
+    assert response.status_code == 404 and not response.has_header("ETag")
+    assert local_cache.get(f"category_servicemen:{missing}") is None
+    assert cache.get(VERSION_KEY.format(category_servicemen_key(missing))) is None
+
+    # Single flight: while another worker holds the rebuild lock, the previous payload is served
+    local_cache.clear()
+    cache.set(STALE_KEY.format("stampede"), "previous")
+    cache.add(LOCK_KEY.format("stampede", get_versions("stampede")), 1)
+    assert read_through("stampede", ["stampede"], lambda: pytest.fail("rebuilt while locked")) == "previous"
+
+
+@pytest.mark.django_db
+def test_capacity_calendar_blocks_double_booking(settings, django_assert_num_queries):
+    from apps.users.models import ServicemanProfile
+    from .models import ServiceRequest
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    category = Category.objects.create(name="Capacity", description="")
+    client_user = User.objects.create_user(username="cap_client", email="capc@example.com", password="x", user_type="CLIENT")
+    admin = User.objects.create_user(username="cap_admin", email="capa@example.com", password="x", user_type="ADMIN")
+    servicemen = []
+    for n, capacity in enumerate([1, 2]):
+        user = User.objects.create_user(username=f"cap_sm{n}", email=f"capsm{n}@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(user=user, defaults={
+            "category": category, "is_approved": True, "is_available": False, "daily_capacity": capacity,
+        })
+        servicemen.append(user)
+    requests = [
+        ServiceRequest.objects.create(
+            client=client_user, category=category, booking_date="2025-10-05", status="PENDING_ADMIN_ASSIGNMENT",
+            initial_booking_fee=2000, client_address="addr", service_description="job",
+        )
+        for _ in range(3)
+    ]
+
+    api = APIClient()
+    api.force_authenticate(user=admin)
+    assign = lambda request, serviceman: api.post(
+        reverse("service-request-assign", kwargs={"pk": request.id}), {"serviceman_id": serviceman.id}, format="json"
+    )
+    assert assign(requests[0], servicemen[0]).status_code == 200
+    response = assign(requests[1], servicemen[0])
+    assert response.status_code == 409
+    assert (response.data["booked"], response.data["capacity"]) == (1, 1)
+    assert ServiceRequest.objects.get(pk=requests[1].pk).serviceman_id is None
+    # Re-assigning the same serviceman does not count their own booking twice
+    assert assign(requests[0], servicemen[0]).status_code == 200
+    assert assign(requests[1], servicemen[1]).status_code == 200
+
+    free_url = reverse("category-free-servicemen", kwargs={"pk": category.id})
+    with django_assert_num_queries(1):
+        response = api.get(free_url, {"date": "2025-10-05"})
+    assert [(row["id"], row["free_slots"]) for row in response.data["servicemen"]] == [(servicemen[1].id, 1)]
+    assert response.data["total_free"] == 1
+    assert api.get(free_url, {"date": "2025-10-06"}).data["total_free"] == 2
+    assert api.get(free_url).status_code == 400
+
+    # Cancelled jobs free their slot
+    ServiceRequest.objects.filter(pk=requests[0].pk).update(status="CANCELLED")
+    calendar = api.get(reverse("serviceman-calendar", kwargs={"pk": servicemen[1].id}), {"start": "2025-10-04", "days": 3}).data
+    assert [(str(day["date"]), day["booked"], day["free"]) for day in calendar["days"]] == [
+        ("2025-10-04", 0, 2), ("2025-10-05", 1, 1), ("2025-10-06", 0, 2),
+    ]
+    assert assign(requests[2], servicemen[0]).status_code == 200
+
+    # Clients moving an assigned job need a free slot on the new date too
+    ServiceRequest.objects.create(
+        client=client_user, category=category, booking_date="2025-10-06", status="PENDING_ESTIMATION",
+        serviceman=servicemen[0], initial_booking_fee=2000, client_address="addr", service_description="job",
+    )
+    owner = APIClient()
+    owner.force_authenticate(user=client_user)
+    detail_url = reverse("service-request-detail", kwargs={"pk": requests[2].id})
+    response = owner.patch(detail_url, {"booking_date": "2025-10-06"}, format="json")
+    assert response.status_code == 409 and (response.data["booked"], response.data["capacity"]) == (1, 1)
+    assert str(ServiceRequest.objects.get(pk=requests[2].pk).booking_date) == "2025-10-05"
+    assert owner.patch(detail_url, {"service_description": "job, 2 rooms"}, format="json").status_code == 200
+    assert owner.patch(detail_url, {"booking_date": "2025-10-07"}, format="json").status_code == 200
+
+
+@pytest.mark.django_db
+def test_dispatch_queue_priority_and_claims():
+    import datetime
+    from django.db import connection
+    from django.utils import timezone
+    from .models import ServiceRequest
+
+    category = Category.objects.create(name="Dispatch", description="")
+    client_user = User.objects.create_user(username="dq_client", email="dqc@example.com", password="x", user_type="CLIENT")
+    admins = [
+        User.objects.create_user(username=f"dq_admin{n}", email=f"dqa{n}@example.com", password="x", user_type="ADMIN")
+        for n in range(2)
+    ]
+
+    def make(booking_date, is_emergency=False, status="PENDING_ADMIN_ASSIGNMENT"):
+        return ServiceRequest.objects.create(
+            client=client_user, category=category, booking_date=booking_date, is_emergency=is_emergency,
+            status=status, initial_booking_fee=2000, client_address="addr", service_description="job",
+        )
+
+    late = make("2025-10-20")
+    soon = make("2025-10-06")
+    emergency = make("2025-10-08", is_emergency=True)
+    soon_later = make("2025-10-06")
+    make("2025-10-01", status="PENDING_ESTIMATION")
+    expected = [emergency.id, soon.id, soon_later.id, late.id]
+
+    api = APIClient()
+    api.force_authenticate(user=admins[0])
+    seen, cursor = [], None
+    while True:
+        response = api.get(reverse("dispatch-queue"), {"limit": 3, **({"cursor": cursor} if cursor else {})})
+        seen += [row["id"] for row in response.data["results"]]
+        cursor = response.data["next"]
+        if not cursor:
+            break
+    assert seen == expected
+
+    claimed = api.post(reverse("dispatch-queue-claim"), {"count": 2}, format="json").data["claimed"]
+    assert [row["id"] for row in claimed] == expected[:2]
+    assert claimed[0]["claimed_by"]["username"] == "dq_admin0"
+
+    other = APIClient()
+    other.force_authenticate(user=admins[1])
+    assert [row["id"] for row in other.post(reverse("dispatch-queue-claim"), format="json").data["claimed"]] == [soon_later.id]
+    unclaimed = other.get(reverse("dispatch-queue"), {"unclaimed": "true"}).data["results"]
+    assert [row["id"] for row in unclaimed] == [late.id]
+
+    # Only the holder can release; released and expired claims return to the queue
+    assert other.post(reverse("dispatch-queue-release", kwargs={"pk": soon.id})).status_code == 409
+    assert api.post(reverse("dispatch-queue-release", kwargs={"pk": soon.id})).status_code == 200
+    ServiceRequest.objects.filter(pk=emergency.pk).update(claimed_until=timezone.now() - datetime.timedelta(seconds=1))
+    assert [row["id"] for row in other.post(reverse("dispatch-queue-claim"), {"count": 5}, format="json").data["claimed"]] == [
+        emergency.id, soon.id, late.id,
+    ]
+    assert api.post(reverse("dispatch-queue-claim"), format="json").data["claimed"] == []
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        from .dispatch import QUEUE_ORDER, queue
+        assert "services_sr_dispatch_idx" in queue().order_by(*QUEUE_ORDER).explain()
+
+
+@pytest.mark.django_db
+def test_bulk_assignment_outcomes_and_query_budget(django_assert_max_num_queries, django_capture_on_commit_callbacks):
+    from apps.notifications.models import Notification
+    from apps.users.models import ServicemanProfile
+    from .models import ServiceRequest, ServiceRequestStatusHistory
+
+    category = Category.objects.create(name="Bulk", description="")
+    client_user = User.objects.create_user(username="ba_client", email="bac@example.com", password="x", user_type="CLIENT")
+    admin = User.objects.create_user(username="ba_admin", email="baa@example.com", password="x", user_type="ADMIN")
+    servicemen = []
+    for n, (approved, capacity) in enumerate([(True, 1), (True, 9), (False, 1)]):
+        user = User.objects.create_user(username=f"ba_sm{n}", email=f"basm{n}@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(user=user, defaults={
+            "category": category, "is_approved": approved, "is_available": True, "daily_capacity": capacity,
+        })
+        servicemen.append(user)
+    requests = [
+        ServiceRequest.objects.create(
+            client=client_user, category=category, booking_date="2025-10-05", status="PENDING_ADMIN_ASSIGNMENT",
+            initial_booking_fee=2000, client_address="addr", service_description="job",
+        )
+        for _ in range(12)
+    ]
+    sm0, sm1, unapproved = (user.id for user in servicemen)
+
+    api = APIClient()
+    api.force_authenticate(user=admin)
+    url = reverse("service-request-bulk-assign")
+    assignments = [
+        {"service_request_id": requests[0].id, "serviceman_id": sm0, "notes": "first"},
+        {"service_request_id": requests[1].id, "serviceman_id": sm0},
+        {"service_request_id": requests[2].id, "serviceman_id": sm1, "backup_serviceman_id": sm0},
+        {"service_request_id": requests[3].id, "serviceman_id": unapproved},
+        {"service_request_id": requests[4].id, "serviceman_id": sm1, "backup_serviceman_id": sm1},
+        {"service_request_id": 999999, "serviceman_id": sm1},
+    ] + [{"service_request_id": request.id, "serviceman_id": sm1} for request in requests[5:]]
+    with django_capture_on_commit_callbacks(execute=True), django_assert_max_num_queries(12):
+        response = api.post(url, {"assignments": assignments}, format="json")
+    assert response.status_code == 200
+    assert [row["result"] for row in response.data["results"]] == [
+        "assigned", "fully_booked", "assigned", "invalid", "invalid", "not_found",
+    ] + ["assigned"] * 7
+    assert response.data["total_assigned"] == 9
+    assert response.data["results"][1]["capacity"] == 1
+
+    assigned = ServiceRequest.objects.filter(serviceman__isnull=False)
+    assert assigned.count() == 9 and not assigned.exclude(status="PENDING_ESTIMATION").exists()
+    assert ServiceRequest.objects.get(pk=requests[2].pk).backup_serviceman_id == sm0
+    assert ServiceRequestStatusHistory.objects.filter(new_status="PENDING_ESTIMATION", changed_by=admin).count() == 9
+    # primary + client per request, plus one backup notification
+    assert Notification.objects.count() == 9 * 2 + 1
+    assert "Admin Notes: first" in Notification.objects.get(user_id=sm0, notification_type="JOB_ASSIGNED").message
+
+    # sm1 has room for one more job that day; the request is reassigned away from sm0
+    response = api.post(url, {"assignments": [
+        {"service_request_id": requests[0].id, "serviceman_id": sm1},
+        {"service_request_id": requests[1].id, "serviceman_id": sm1},
+        {"service_request_id": requests[3].id, "serviceman_id": sm0},
+    ]}, format="json")
+    assert [row["result"] for row in response.data["results"]] == ["assigned", "fully_booked", "assigned"]
+    assert api.post(url, {"assignments": [{"service_request_id": "x"}]}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_list_endpoints_stay_within_query_budgets(platform, assert_query_budget):
+    category = platform.categories[0]
+    list_url = reverse("service-request-list-create")
+    expand = {"expand": "client,category,serviceman,backup_serviceman,preferred_serviceman"}
+
+    assert_query_budget(None, reverse("category-servicemen", args=[category.pk]), 3, platform)
+    assert_query_budget(platform.client, list_url, 3, platform)
+    assert_query_budget(platform.serviceman, list_url, 3, platform)
+    assert_query_budget(platform.admin, list_url, 3, platform)
+    # Nested servicemen: profile, skills, client profile and active jobs are prefetched, not fetched per row
+    response = assert_query_budget(platform.admin, list_url, 12, platform, params=expand)
+    assert "active_jobs_count" in next(row["serviceman"] for row in response.data if row["serviceman"])
+    assert_query_budget(platform.serviceman, reverse("serviceman-job-history"), 6, platform)
+    assert_query_budget(platform.admin, reverse("dispatch-queue"), 3, platform)
@@ -7,11 +7,18 @@ urlpatterns = [
     path("categories/", views.CategoryListCreateView.as_view(), name="category-list-create"),
     path("categories/<int:pk>/", views.CategoryDetailUpdateView.as_view(), name="category-detail-update"),
     path("categories/<int:pk>/servicemen/", views.CategoryServicemenListView.as_view(), name="category-servicemen"),
+    path("categories/<int:pk>/servicemen/free/", views.CategoryFreeServicemenView.as_view(), name="category-free-servicemen"),
     
     # Service Requests
     path("service-requests/", views.ServiceRequestListCreateView.as_view(), name="service-request-list-create"),
+    path("service-requests/bulk-assign/", views.ServiceRequestBulkAssignView.as_view(), name="service-request-bulk-assign"),
+    path("service-requests/dispatch-queue/", views.DispatchQueueView.as_view(), name="dispatch-queue"),
+    path("service-requests/dispatch-queue/claim/", views.DispatchQueueClaimView.as_view(), name="dispatch-queue-claim"),
     path("service-requests/<int:pk>/", views.ServiceRequestDetailView.as_view(), name="service-request-detail"),
+    path("service-requests/<int:pk>/release/", views.DispatchQueueReleaseView.as_view(), name="dispatch-queue-release"),
     path("service-requests/<int:pk>/assign/", views.ServiceRequestAssignView.as_view(), name="service-request-assign"),
+    path("service-requests/<int:pk>/recommendations/", views.ServiceRequestRecommendationView.as_view(), name="service-request-recommendations"),
+    path("service-requests/<int:pk>/timeline/", views.ServiceRequestTimelineView.as_view(), name="service-request-timeline"),
     
     # Professional Workflow Endpoints
     path("service-requests/<int:pk>/submit-estimate/", workflow_views.ServicemanSubmitEstimateView.as_view(), name="serviceman-submit-estimate"),
@@ -23,4 +30,5 @@ urlpatterns = [
     
     # Serviceman Job History
     path("serviceman/job-history/", views.ServicemanJobHistoryView.as_view(), name="serviceman-job-history"),
+    path("servicemen/<int:pk>/calendar/", views.ServicemanCalendarView.as_view(), name="serviceman-calendar"),
 ]
\ No newline at end of file
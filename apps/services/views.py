@@ -1,20 +1,220 @@
 from rest_framework import generics, permissions, status, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from .capacity import SlotUnavailable, reserve_slot
 from .models import Category, ServiceRequest
 from .serializers import (
-    CategorySerializer, CategoryCreateSerializer, ServiceRequestSerializer
+    CategorySerializer, CategoryCreateSerializer, ServiceRequestSerializer, ServiceRequestListSerializer,
+    DispatchQueueSerializer
 )
 from .permissions import (
     IsAdmin, IsClient, IsServiceman, IsRequestOwner, IsAssignedServiceman
 )
 from apps.users.models import User
+from apps.users.versions import CATEGORIES, category_servicemen_key, category_servicemen_version
+from config.http_cache import conditional_get
+from config.versioned_cache import read_through
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Safety net only: the payload key already changes with every relevant write
+CATEGORY_SERVICEMEN_TIMEOUT = 60 * 10
+DEFAULT_NEARBY_RADIUS_KM = 25
+MAX_NEARBY_RADIUS_KM = 500
+
+
+def _build_category_catalog():
+    from django.db.models import Count, Max
+    # Any category insert/update/delete changes the row count or the newest updated_at
+    stats = Category.objects.aggregate(last_modified=Max('updated_at'), total=Count('id'))
+    return {
+        "etag": f"categories:{stats['total']}:{stats['last_modified']}",
+        "last_modified": stats['last_modified'],
+        "data": CategorySerializer(Category.objects.filter(is_active=True), many=True).data,
+    }
+
+
+def _category_catalog():
+    """Active categories payload from the versioned catalog cache (in-process LRU, then Redis)"""
+    return read_through('categories:active', [CATEGORIES], _build_category_catalog)
+
+
+def _category_validators(request, *args, **kwargs):
+    catalog = _category_catalog()
+    return catalog["etag"], catalog["last_modified"]
+
+
+def _category_servicemen_summary(pk, data):
+    """Response body with the availability summary of the listed servicemen"""
+    available_count = sum(1 for serviceman in data if serviceman["is_available"])
+    busy_count = len(data) - available_count
+
+    # Build response with summary
+    response_data = {
+        "category_id": pk,
+        "total_servicemen": len(data),
+        "available_servicemen": available_count,
+        "busy_servicemen": busy_count,
+        "servicemen": data
+    }
+
+    # Add overall availability message
+    if available_count == 0:
+        response_data["availability_message"] = {
+            "type": "warning",
+            "message": f"All {busy_count} servicemen in this category are currently busy. You can still book, but please expect potential delays."
+        }
+    elif available_count < busy_count:
+        response_data["availability_message"] = {
+            "type": "info",
+            "message": f"{available_count} available, {busy_count} busy. Choose available servicemen for immediate service."
+        }
+    else:
+        response_data["availability_message"] = {
+            "type": "success",
+            "message": f"{available_count} servicemen are available for immediate service."
+        }
+
+    return response_data
+
+
+def _build_category_servicemen(pk):
+    from django.db.models import Q, Count, Case, When, IntegerField
+    from apps.users.models import ServicemanProfile
+
+    # Read the version first: a bump during the build leaves this payload with
+    # an outdated ETag, so the next request rebuilds instead of pinning it
+    version = category_servicemen_version(pk)
+
+    profiles = ServicemanProfile.objects.filter(
+        category_id=pk,
+        user__user_type='SERVICEMAN',
+    ).select_related('user').annotate(
+        active_jobs_count=Count(
+            Case(
+                When(
+                    Q(user__serviceman_requests__status='IN_PROGRESS', user__serviceman_requests__is_deleted=False) |
+                    Q(user__backup_requests__status='IN_PROGRESS', user__backup_requests__is_deleted=False),
+                    then=1
+                ),
+                output_field=IntegerField()
+            )
+        )
+    ).order_by('user_id')
+
+    data = []
+    for profile in profiles:
+        s = profile.user
+        is_available = profile.is_available
+        active_jobs = profile.active_jobs_count
+
+        serviceman_data = {
+            "id": s.id,
+            "full_name": s.get_full_name() or s.username,
+            "username": s.username,
+            "rating": float(profile.rating),
+            "total_jobs_completed": profile.total_jobs_completed,
+            "bio": profile.bio,
+            "years_of_experience": profile.years_of_experience,
+            "is_available": is_available,
+            "active_jobs_count": active_jobs,
+            "availability_status": {
+                "status": "available" if is_available else "busy",
+                "label": "Available" if is_available else "Currently Busy",
+                "badge_color": "green" if is_available else "orange"
+            }
+        }
+
+        # Add warning if busy
+        if not is_available:
+            serviceman_data["booking_warning"] = {
+                "message": f"This serviceman is currently working on {active_jobs} active job(s)",
+                "recommendation": "Consider choosing an available serviceman for faster service",
+                "can_still_book": True,
+                "estimated_delay": "Service may be delayed" if active_jobs > 1 else "Minor delay possible"
+            }
+
+        data.append(serviceman_data)
+
+    return {
+        "etag": f"category_servicemen:{pk}:{version}" if version else None,
+        "data": _category_servicemen_summary(pk, data),
+    }
+
+
+def _category_exists(pk):
+    """Checked against the cached active catalog; only inactive or unknown ids hit the database"""
+    return (
+        any(category["id"] == pk for category in _category_catalog()["data"])
+        or Category.objects.filter(pk=pk).exists()
+    )
+
+
+def _category_servicemen(pk):
+    """
+    Per-category payload from the versioned cache. The category_servicemen:<pk>
+    counter is bumped whenever a serviceman in the category changes profile,
+    availability, approval or rating, or a job of theirs enters/leaves
+    IN_PROGRESS (apps/users/versions.py); rebuilds are single-flight.
+    """
+    return read_through(
+        f'category_servicemen:{pk}', [category_servicemen_key(pk)],
+        lambda: _build_category_servicemen(pk),
+        timeout=CATEGORY_SERVICEMEN_TIMEOUT,
+    )
+
+
+def _category_servicemen_validators(request, pk, *args, **kwargs):
+    # Unknown ids get no ETag and no cache entry; the view answers 404
+    if not _category_exists(pk):
+        return None, None
+    return _category_servicemen(pk)["etag"], None
+
+
+def _slot_unavailable_response(e):
+    return Response({
+        "detail": str(e),
+        "booking_date": e.booking_date,
+        "booked": e.booked,
+        "capacity": e.capacity
+    }, status=409)
+
+
+def _parse_location_params(params):
+    """(lat, lng, radius_km, nearest) from ?lat=&lng=&radius_km=&nearest=; raises ValueError"""
+    lat, lng = float(params['lat']), float(params['lng'])
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('lat/lng out of range')
+    radius_km = float(params.get('radius_km') or DEFAULT_NEARBY_RADIUS_KM)
+    nearest = int(params['nearest']) if params.get('nearest') else None
+    if not 0 < radius_km <= MAX_NEARBY_RADIUS_KM or (nearest is not None and not 0 < nearest <= 100):
+        raise ValueError('radius_km/nearest out of range')
+    return lat, lng, radius_km, nearest
+
+
+def _nearby_category_servicemen(pk, payload, lat, lng, radius_km, nearest):
+    """The cached category payload narrowed to servicemen near (lat, lng), nearest first"""
+    from apps.users.geo import nearest_servicemen, servicemen_within
+    from apps.users.models import ServicemanProfile
+
+    candidates = ServicemanProfile.objects.filter(category_id=pk).only('user_id', 'latitude', 'longitude', 'geohash')
+    if nearest:
+        profiles = nearest_servicemen(lat, lng, nearest, candidates, max_radius_km=radius_km)
+    else:
+        profiles = servicemen_within(lat, lng, radius_km, candidates)
+    distances = {profile.user_id: profile.distance_km for profile in profiles}
+
+    by_id = {serviceman["id"]: serviceman for serviceman in payload["servicemen"]}
+    data = [
+        {**by_id[user_id], "distance_km": distance}
+        for user_id, distance in distances.items() if user_id in by_id
+    ]
+    return _category_servicemen_summary(pk, data)
+
 # --- Category Views ---
 
 class CategoryListCreateView(generics.ListCreateAPIView):
@@ -36,6 +236,11 @@ class CategoryListCreateView(generics.ListCreateAPIView):
             return [IsAdmin()]
         return [permissions.AllowAny()]
     
+    # ✅ OPTIMIZATION: served from the catalog cache (304s included), CDN-cacheable for anonymous traffic
+    @conditional_get(_category_validators, public=True, max_age=300, s_maxage=3600)
+    def get(self, request, *args, **kwargs):
+        return Response(_category_catalog()["data"])
+    
     def get_queryset(self):
         # For POST requests (create), use all categories
         if self.request.method == 'POST':
@@ -71,151 +276,49 @@ class CategoryServicemenListView(APIView):
     - Availability status (available/busy)
     - Active jobs count
     - Warnings if busy
+    
+    Query Parameters (optional, proximity search):
+    - lat, lng: Only list servicemen located near this point, nearest first,
+      each with a distance_km
+    - radius_km: Search radius (default: 25, max: 500)
+    - nearest: Return only the N nearest servicemen within radius_km
     """
     permission_classes = [permissions.AllowAny]
     
     @extend_schema(
+        parameters=[
+            OpenApiParameter(name='lat', type=float, required=False, description='Latitude to search around'),
+            OpenApiParameter(name='lng', type=float, required=False, description='Longitude to search around'),
+            OpenApiParameter(name='radius_km', type=float, required=False, description='Search radius in km (default 25)'),
+            OpenApiParameter(name='nearest', type=int, required=False, description='Only the N nearest servicemen'),
+        ],
         responses={200: OpenApiResponse(description="Servicemen in category with availability")}
     )
+    # ✅ OPTIMIZATION: body and ETag come from the cached per-category payload; short TTLs
+    # because availability changes often
+    @conditional_get(_category_servicemen_validators, public=True, max_age=15, s_maxage=30, stale_while_revalidate=30)
     def get(self, request, pk):
-        from django.db.models import Q, Count, Case, When, IntegerField
-        from django.db import connection
         import traceback
-        import logging
-        
-        logger = logging.getLogger(__name__)
-        
-        try:
-            # Check which fields exist in the database
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name='users_servicemanprofile'
-                """)
-                existing_columns = [row[0] for row in cursor.fetchall()]
-            
-            logger.info(f"Existing columns in users_servicemanprofile: {existing_columns}")
-            
-            # Determine which fields to defer from ServicemanProfile
-            from django.db.models import Prefetch
-            from apps.users.models import ServicemanProfile
-            
-            fields_to_defer = []
-            potential_new_fields = ['is_approved', 'approved_by_id', 'approved_at', 'rejection_reason']
-            
-            for field in potential_new_fields:
-                if field not in existing_columns:
-                    defer_name = field.replace('_id', '') if field.endswith('_id') else field
-                    fields_to_defer.append(defer_name)
-            
-            logger.info(f"Fields to defer: {fields_to_defer}")
-            
-            # Build ServicemanProfile queryset with deferred fields
-            profile_qs = ServicemanProfile.objects.all()
-            if fields_to_defer:
-                profile_qs = profile_qs.defer(*fields_to_defer)
-            
-            # Build queryset with safe prefetch
-            servicemen = User.objects.filter(
-                user_type='SERVICEMAN',
-                serviceman_profile__category_id=pk
-            ).prefetch_related(
-                Prefetch('serviceman_profile', queryset=profile_qs)
-            ).annotate(
-                active_jobs_count=Count(
-                    Case(
-                        When(
-                            Q(serviceman_requests__status='IN_PROGRESS', serviceman_requests__is_deleted=False) |
-                            Q(backup_requests__status='IN_PROGRESS', backup_requests__is_deleted=False),
-                            then=1
-                        ),
-                        output_field=IntegerField()
-                    )
+
+        location = None
+        if 'lat' in request.query_params or 'lng' in request.query_params:
+            try:
+                location = _parse_location_params(request.query_params)
+            except (KeyError, ValueError):
+                return Response(
+                    {"detail": "lat and lng must be valid coordinates; radius_km must be in (0, 500] and nearest in [1, 100]"},
+                    status=400
                 )
-            )
-            
-            # Simple order - avoid ordering by deferred fields
-            servicemen = servicemen.order_by('id')
-            
-            logger.info(f"Queryset created, count: {servicemen.count()}")
-            
-            data = []
-            available_count = 0
-            busy_count = 0
-            
-            for s in servicemen:
-                try:
-                    # Safely get is_available (may not exist in database yet)
-                    is_available = getattr(s.serviceman_profile, 'is_available', True)
-                    active_jobs = s.active_jobs_count
-                    
-                    if is_available:
-                        available_count += 1
-                    else:
-                        busy_count += 1
-                    
-                    serviceman_data = {
-                        "id": s.id,
-                        "full_name": s.get_full_name() or s.username,
-                        "username": s.username,
-                        "rating": float(s.serviceman_profile.rating),
-                        "total_jobs_completed": s.serviceman_profile.total_jobs_completed,
-                        "bio": s.serviceman_profile.bio,
-                        "years_of_experience": s.serviceman_profile.years_of_experience,
-                        "is_available": is_available,
-                        "active_jobs_count": active_jobs,
-                        "availability_status": {
-                            "status": "available" if is_available else "busy",
-                            "label": "Available" if is_available else "Currently Busy",
-                            "badge_color": "green" if is_available else "orange"
-                        }
-                    }
-                    
-                    # Add warning if busy
-                    if not is_available:
-                        serviceman_data["booking_warning"] = {
-                            "message": f"This serviceman is currently working on {active_jobs} active job(s)",
-                            "recommendation": "Consider choosing an available serviceman for faster service",
-                            "can_still_book": True,
-                            "estimated_delay": "Service may be delayed" if active_jobs > 1 else "Minor delay possible"
-                        }
-                    
-                    data.append(serviceman_data)
-                except Exception as e:
-                    logger.error(f"Error processing serviceman {s.id}: {str(e)}")
-                    logger.error(traceback.format_exc())
-                    # Skip this serviceman and continue
-                    continue
-            
-            # Build response with summary
-            response_data = {
-                "category_id": pk,
-                "total_servicemen": len(data),
-                "available_servicemen": available_count,
-                "busy_servicemen": busy_count,
-                "servicemen": data
-            }
-            
-            # Add overall availability message
-            if available_count == 0:
-                response_data["availability_message"] = {
-                    "type": "warning",
-                    "message": f"All {busy_count} servicemen in this category are currently busy. You can still book, but please expect potential delays."
-                }
-            elif available_count < busy_count:
-                response_data["availability_message"] = {
-                    "type": "info",
-                    "message": f"{available_count} available, {busy_count} busy. Choose available servicemen for immediate service."
-                }
-            else:
-                response_data["availability_message"] = {
-                    "type": "success",
-                    "message": f"{available_count} servicemen are available for immediate service."
-                }
-            
-            return Response(response_data)
-            
+
+        if not _category_exists(pk):
+            return Response({"detail": "Category not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            payload = _category_servicemen(pk)["data"]
+            if location:
+                # The query string is part of the URL the ETag is validated against
+                payload = _nearby_category_servicemen(pk, payload, *location)
+            return Response(payload)
         except Exception as e:
             logger.error(f"Error in CategoryServicemenListView: {str(e)}")
             logger.error(traceback.format_exc())
@@ -228,6 +331,99 @@ class CategoryServicemenListView(APIView):
                 status=500
             )
 
+class CategoryFreeServicemenView(APIView):
+    """
+    Servicemen in a category with a free slot on a date (capacity calendar).
+    
+    Query Parameters:
+    - date: Booking date, YYYY-MM-DD (required)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @extend_schema(
+        parameters=[OpenApiParameter(name='date', type=str, required=True, description='Booking date (YYYY-MM-DD)')],
+        responses={200: OpenApiResponse(description="Servicemen with a free slot on the date")}
+    )
+    def get(self, request, pk):
+        from django.utils.dateparse import parse_date
+        from .capacity import free_servicemen
+        
+        try:
+            booking_date = parse_date(request.query_params.get('date', ''))
+        except ValueError:
+            booking_date = None
+        if booking_date is None:
+            return Response({"detail": "date is required (YYYY-MM-DD)"}, status=400)
+        
+        # ✅ OPTIMIZATION: one query - per-profile booking count on the (serviceman, booking_date) index
+        profiles = free_servicemen(pk, booking_date).select_related('user').only(
+            'user_id', 'rating', 'is_available', 'daily_capacity',
+            'user__id', 'user__username', 'user__first_name', 'user__last_name',
+        ).order_by('-rating', 'user_id')
+        
+        servicemen = [
+            {
+                "id": profile.user_id,
+                "full_name": profile.user.get_full_name() or profile.user.username,
+                "username": profile.user.username,
+                "rating": float(profile.rating),
+                "is_available": profile.is_available,
+                "booked": profile.booked,
+                "capacity": profile.daily_capacity,
+                "free_slots": profile.daily_capacity - profile.booked,
+            }
+            for profile in profiles
+        ]
+        return Response({
+            "category_id": pk,
+            "date": booking_date,
+            "total_free": len(servicemen),
+            "servicemen": servicemen
+        })
+
+
+class ServicemanCalendarView(APIView):
+    """
+    Booked and free slots per day for a serviceman (capacity calendar).
+    
+    Query Parameters:
+    - start: First day, YYYY-MM-DD (default: today)
+    - days: Number of days (default: 14, max: 62)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='start', type=str, required=False, description='First day (YYYY-MM-DD, default today)'),
+            OpenApiParameter(name='days', type=int, required=False, description='Number of days (default 14, max 62)'),
+        ],
+        responses={200: OpenApiResponse(description="Daily booked/free slots")}
+    )
+    def get(self, request, pk):
+        from django.utils import timezone
+        from django.utils.dateparse import parse_date
+        from apps.users.models import ServicemanProfile
+        from .capacity import MAX_CALENDAR_DAYS, calendar
+        
+        profile = get_object_or_404(
+            ServicemanProfile.objects.only('user_id', 'daily_capacity'), user_id=pk, user__user_type='SERVICEMAN'
+        )
+        try:
+            start = parse_date(request.query_params['start']) if request.query_params.get('start') else timezone.localdate()
+            days = int(request.query_params.get('days', 14))
+        except ValueError:
+            start = None
+        if start is None or not 0 < days <= MAX_CALENDAR_DAYS:
+            return Response(
+                {"detail": f"start must be YYYY-MM-DD and days between 1 and {MAX_CALENDAR_DAYS}"}, status=400
+            )
+        
+        return Response({
+            "serviceman_id": pk,
+            "daily_capacity": profile.daily_capacity,
+            "days": calendar(pk, start, days, profile.daily_capacity)
+        })
+
 # --- ServiceRequest Views ---
 
 class ServiceRequestListCreateView(generics.ListCreateAPIView):
@@ -242,6 +438,11 @@ class ServiceRequestListCreateView(generics.ListCreateAPIView):
     2. User pays on Paystack
     3. Call POST /api/payments/verify/ to confirm payment
     4. Call POST /api/services/requests/ with payment_reference to create request
+    
+    GET returns compact rows (ids, names, status). Query params:
+    - fields: comma-separated subset of fields, e.g. ?fields=id,status,serviceman_name
+    - expand: nested objects to embed, any of client, category, serviceman,
+      backup_serviceman, preferred_serviceman (e.g. ?expand=serviceman)
     """
     serializer_class = ServiceRequestSerializer
     
@@ -250,23 +451,27 @@ class ServiceRequestListCreateView(generics.ListCreateAPIView):
             return [IsClient()]
         return [permissions.IsAuthenticated()]
     
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ServiceRequestListSerializer
+        return ServiceRequestSerializer
+    
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs['fields'], kwargs['expand'] = self.get_sparse_fieldset()
+        return super().get_serializer(*args, **kwargs)
+    
+    def get_sparse_fieldset(self):
+        if not hasattr(self, '_sparse_fieldset'):
+            self._sparse_fieldset = ServiceRequestListSerializer.parse_params(self.request.query_params)
+        return self._sparse_fieldset
+    
     def get_queryset(self):
         user = self.request.user
-        # ✅ Optimize queries: fetch related users and their profiles
-        qs = ServiceRequest.objects.select_related(
-            'client',
-            'category',
-            'preferred_serviceman',
-            'serviceman',
-            'backup_serviceman'
-        ).prefetch_related(
-            'client__client_profile',  # ✅ Added: Fetch client phone number
-            'preferred_serviceman__serviceman_profile',
-            'preferred_serviceman__serviceman_profile__skills',
-            'serviceman__serviceman_profile',
-            'serviceman__serviceman_profile__skills',
-            'backup_serviceman__serviceman_profile',
-            'backup_serviceman__serviceman_profile__skills'
+        # ✅ OPTIMIZATION: load only the columns/relations behind the requested ?fields= / ?expand=
+        fields, expand = self.get_sparse_fieldset()
+        qs = ServiceRequestListSerializer.prepare_queryset(
+            ServiceRequest.objects.order_by('-created_at'), fields, expand
         )
         
         if user.user_type == 'ADMIN':
@@ -274,7 +479,8 @@ class ServiceRequestListCreateView(generics.ListCreateAPIView):
         elif user.user_type == 'CLIENT':
             return qs.filter(client=user)
         elif user.user_type == 'SERVICEMAN':
-            return qs.filter(serviceman=user) | qs.filter(backup_serviceman=user)
+            # ✅ OPTIMIZATION: UNION of the primary/backup index scans instead of an OR across two FKs
+            return qs.for_serviceman(user)
         return ServiceRequest.objects.none()
     
     def create(self, request, *args, **kwargs):
@@ -387,7 +593,8 @@ class ServiceRequestDetailView(generics.RetrieveUpdateAPIView):
     
     Update permissions:
     - Admins: Can update all fields including serviceman assignment
-    - Clients: Can update description, address, booking_date
+    - Clients: Can update description, address, booking_date (409 if the
+      assigned serviceman has no free slot on the new date)
     - Servicemen: Can update status, estimated_cost (when assigned)
     """
     serializer_class = ServiceRequestSerializer
@@ -438,6 +645,12 @@ class ServiceRequestDetailView(generics.RetrieveUpdateAPIView):
         else:
             return ServiceRequestSerializer
     
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except SlotUnavailable as e:
+            return _slot_unavailable_response(e)
+    
     def perform_update(self, serializer):
         """Custom update logic based on user type"""
         user = self.request.user
@@ -459,11 +672,16 @@ class ServiceRequestDetailView(generics.RetrieveUpdateAPIView):
             
             # Only allow updating certain fields
             allowed_fields = ['service_description', 'client_address', 'booking_date']
-            for field in allowed_fields:
-                if field in serializer.validated_data:
-                    setattr(instance, field, serializer.validated_data[field])
-            
-            instance.save()
+            new_date = serializer.validated_data.get('booking_date', instance.booking_date)
+            with transaction.atomic():
+                # Moving an assigned job takes a slot on the new date, checked under the serviceman lock
+                if instance.serviceman_id and new_date != instance.booking_date:
+                    reserve_slot(instance.serviceman_id, new_date, exclude_request_id=instance.pk)
+                for field in allowed_fields:
+                    if field in serializer.validated_data:
+                        setattr(instance, field, serializer.validated_data[field])
+                
+                instance.save()
             logger.info(f"Client {user.username} updated service request {instance.id}")
             
         elif user.user_type == 'SERVICEMAN':
@@ -494,6 +712,9 @@ class ServiceRequestAssignView(APIView):
     - Update serviceman assignments
     - Remove serviceman assignments
     
+    The primary serviceman must have a free slot on the request's booking date
+    (capacity calendar, apps/services/capacity.py); otherwise 409 is returned.
+    
     Body:
     {
         "serviceman_id": int (optional - primary serviceman),
@@ -518,7 +739,8 @@ class ServiceRequestAssignView(APIView):
             200: OpenApiResponse(description="Servicemen assigned successfully"),
             400: OpenApiResponse(description="Invalid serviceman ID or validation error"),
             403: OpenApiResponse(description="Only administrators can assign servicemen"),
-            404: OpenApiResponse(description="Service request or serviceman not found")
+            404: OpenApiResponse(description="Service request or serviceman not found"),
+            409: OpenApiResponse(description="Serviceman is fully booked on the booking date")
         }
     )
     def post(self, request, pk):
@@ -583,66 +805,47 @@ class ServiceRequestAssignView(APIView):
             }, status=400)
         
         # Update assignments
-        old_serviceman = service_request.serviceman
-        old_backup = service_request.backup_serviceman
-        
-        if serviceman_id is not None:
-            service_request.serviceman = serviceman
-        if backup_serviceman_id is not None:
-            service_request.backup_serviceman = backup_serviceman
-        
-        # STEP 2: Update status when admin assigns serviceman
-        if serviceman and service_request.status == 'PENDING_ADMIN_ASSIGNMENT':
-            service_request.status = 'PENDING_ESTIMATION'
-        
-        service_request.save()
+        try:
+            with transaction.atomic():
+                # Re-read under lock so concurrent assignments of this request are applied one at a time
+                service_request = ServiceRequest.objects.select_for_update().get(pk=pk)
+                old_serviceman = service_request.serviceman
+                old_backup = service_request.backup_serviceman
+                
+                # ✅ OPTIMIZATION: conflict check under a lock on the serviceman, so two concurrent
+                # assignments cannot both take their last slot on the booking date
+                if serviceman and serviceman != old_serviceman:
+                    reserve_slot(serviceman.id, service_request.booking_date, exclude_request_id=service_request.id)
+                
+                if serviceman_id is not None:
+                    service_request.serviceman = serviceman
+                if backup_serviceman_id is not None:
+                    service_request.backup_serviceman = backup_serviceman
+                
+                # STEP 2: Update status when admin assigns serviceman
+                if serviceman and service_request.status == 'PENDING_ADMIN_ASSIGNMENT':
+                    service_request.status = 'PENDING_ESTIMATION'
+                
+                if serviceman:
+                    # Assigned: the request leaves the dispatch queue, and with it any claim on it
+                    service_request.claimed_by = None
+                    service_request.claimed_until = None
+                
+                service_request._status_changed_by = request.user  # recorded in status history
+                service_request.save()
+        except SlotUnavailable as e:
+            return _slot_unavailable_response(e)
         
         # Send notifications
         try:
-            from apps.notifications.models import Notification
-            
-            # STEP 2: Notify primary serviceman
-            if serviceman and serviceman != old_serviceman:
-                client_phone = getattr(service_request.client, 'phone_number', 'Not provided')
-                Notification.objects.create(
-                    user=serviceman,
-                    notification_type='JOB_ASSIGNED',
-                    title=f'New Job Assignment - Request #{service_request.id}',
-                    message=f'You have been assigned to a new service request.\n\n'
-                            f'📋 Job Details:\n'
-                            f'• Category: {service_request.category.name}\n'
-                            f'• Booking Date: {service_request.booking_date}\n'
-                            f'• Address: {service_request.client_address}\n'
-                            f'• Description: {service_request.service_description}\n\n'
-                            f'👤 Client Contact:\n'
-                            f'• Name: {service_request.client.get_full_name()}\n'
-                            f'• Phone: {client_phone}\n\n'
-                            f'📝 Next Step: Please contact the client to schedule a site visit and provide a cost estimate.{f"\n\nAdmin Notes: {notes}" if notes else ""}',
-                    is_read=False
-                )
-            
-            # Notify backup serviceman
-            if backup_serviceman and backup_serviceman != old_backup:
-                Notification.objects.create(
-                    user=backup_serviceman,
-                    notification_type='SERVICE_ASSIGNED',
-                    title='Service Request Backup Assignment',
-                    message=f'You have been assigned as backup serviceman for request #{service_request.id}. '
-                            f'Category: {service_request.category.name}. '
-                            f'Date: {service_request.booking_date}.',
-                    is_read=False
-                )
+            from apps.notifications.bulk import create_notifications
+            from .assignment import assignment_notifications
             
-            # Notify client
-            Notification.objects.create(
-                user=service_request.client,
-                notification_type='STATUS_UPDATE',
-                title=f'Serviceman Assigned - Request #{service_request.id}',
-                message=f'Good news! A serviceman has been assigned to your service request.\n\n'
-                        f'The serviceman will contact you shortly to schedule a site visit and discuss your requirements.\n\n'
-                        f'Please ensure you are available at the provided address.',
-                is_read=False
-            )
+            # STEP 2: Notify primary serviceman, backup serviceman and client (one INSERT, one email job)
+            create_notifications(assignment_notifications(
+                service_request, serviceman, backup_serviceman,
+                old_serviceman.pk if old_serviceman else None, old_backup.pk if old_backup else None, notes,
+            ))
             
         except Exception as e:
             logger.error(f"Failed to send assignment notifications: {e}")
@@ -677,6 +880,328 @@ class ServiceRequestAssignView(APIView):
         }, status=200)
 
 
+class ServiceRequestBulkAssignView(APIView):
+    """
+    Assign servicemen to many service requests at once (Admin only).
+    
+    All servicemen are validated with one query, the requests are updated with
+    one bulk write in a single transaction, and all notifications are created
+    with one bulk insert and emailed by one batched background job. The same
+    capacity calendar rules as the single assign endpoint apply.
+    
+    Body:
+    {
+        "assignments": [
+            {
+                "service_request_id": int,
+                "serviceman_id": int (optional - primary serviceman),
+                "backup_serviceman_id": int (optional - backup serviceman),
+                "notes": string (optional - assignment notes)
+            }
+        ]
+    }
+    
+    Every item is reported back as assigned, not_found, invalid or fully_booked.
+    
+    Tags: Admin
+    """
+    permission_classes = [IsAdmin]
+    
+    @extend_schema(
+        request={'application/json': {
+            'type': 'object',
+            'properties': {
+                'assignments': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'service_request_id': {'type': 'integer'},
+                            'serviceman_id': {'type': 'integer', 'nullable': True},
+                            'backup_serviceman_id': {'type': 'integer', 'nullable': True},
+                            'notes': {'type': 'string'}
+                        },
+                        'required': ['service_request_id']
+                    }
+                }
+            },
+            'required': ['assignments']
+        }},
+        responses={
+            200: OpenApiResponse(description="Per-request results"),
+            400: OpenApiResponse(description="Malformed assignments")
+        }
+    )
+    def post(self, request):
+        from .assignment import ASSIGNED, MAX_BATCH_SIZE, assign_requests
+        
+        def is_id(value, optional=False):
+            if optional and value is None:
+                return True
+            return isinstance(value, int) and not isinstance(value, bool)
+        
+        assignments = request.data.get('assignments')
+        if not assignments or not isinstance(assignments, list) or not all(
+            isinstance(item, dict)
+            and is_id(item.get('service_request_id'))
+            and is_id(item.get('serviceman_id'), optional=True)
+            and is_id(item.get('backup_serviceman_id'), optional=True)
+            and isinstance(item.get('notes', ''), str)
+            for item in assignments
+        ):
+            return Response({
+                "detail": "assignments must be a non-empty array of {service_request_id, serviceman_id, "
+                          "backup_serviceman_id, notes} with integer ids"
+            }, status=400)
+        
+        if len(assignments) > MAX_BATCH_SIZE:
+            return Response({
+                "detail": f"At most {MAX_BATCH_SIZE} requests can be assigned per call"
+            }, status=400)
+        
+        results = assign_requests(assignments, request.user)
+        return Response({
+            "total_requested": len(results),
+            "total_assigned": sum(1 for result in results if result["result"] == ASSIGNED),
+            "results": results
+        }, status=200)
+
+
+class DispatchQueueView(APIView):
+    """
+    Priority queue of requests awaiting assignment (Admin only).
+    
+    Emergencies first, then the earliest booking date, then the oldest request,
+    with keyset (cursor) pagination. Claims show which admin is working a
+    request; claim work with the claim endpoint so admins don't collide.
+    
+    Query Parameters:
+    - cursor: `next` value from the previous page
+    - limit: page size (default 50, max 200)
+    - unclaimed: true to hide requests another admin has claimed
+    
+    Tags: Admin
+    """
+    permission_classes = [IsAdmin]
+    
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('cursor', str, description="Opaque cursor from the previous page's `next`"),
+            OpenApiParameter('limit', int, description="Page size (default 50, max 200)"),
+            OpenApiParameter('unclaimed', bool, description="Only requests nobody has claimed"),
+        ],
+        responses={
+            200: OpenApiResponse(description="One page of the dispatch queue"),
+            400: OpenApiResponse(description="Invalid cursor or limit")
+        }
+    )
+    def get(self, request):
+        from . import dispatch
+        
+        try:
+            limit = int(request.query_params.get('limit', dispatch.DEFAULT_PAGE_SIZE))
+            if limit < 1:
+                raise ValueError
+            rows, next_cursor = dispatch.queue_page(
+                cursor=request.query_params.get('cursor'),
+                limit=min(limit, dispatch.MAX_PAGE_SIZE),
+                unclaimed_only=request.query_params.get('unclaimed') in ('1', 'true', 'True'),
+            )
+        except ValueError:
+            return Response({"detail": "Invalid cursor or limit"}, status=400)
+        
+        return Response({
+            "next": next_cursor,
+            "results": DispatchQueueSerializer(rows, many=True).data
+        })
+
+
+class DispatchQueueClaimView(APIView):
+    """
+    Claim the next requests from the dispatch queue (Admin only).
+    
+    Claims are exclusive: concurrent claims by other admins skip rows being
+    claimed (SELECT ... FOR UPDATE SKIP LOCKED) and rows already claimed. A
+    claim lasts 10 minutes or until the request is assigned or released.
+    
+    Body:
+    {
+        "count": int (optional - requests to claim, default 1, max 20)
+    }
+    
+    Tags: Admin
+    """
+    permission_classes = [IsAdmin]
+    
+    @extend_schema(
+        request={'application/json': {
+            'type': 'object',
+            'properties': {'count': {'type': 'integer', 'minimum': 1, 'maximum': 20}}
+        }},
+        responses={
+            200: OpenApiResponse(description="Claimed requests (empty when the queue is drained)"),
+            400: OpenApiResponse(description="Invalid count")
+        }
+    )
+    def post(self, request):
+        from . import dispatch
+        
+        try:
+            count = int(request.data.get('count', 1))
+        except (TypeError, ValueError):
+            count = 0
+        if not 0 < count <= dispatch.MAX_CLAIM:
+            return Response({"detail": f"count must be between 1 and {dispatch.MAX_CLAIM}"}, status=400)
+        
+        claimed = dispatch.claim_next(request.user, count)
+        logger.info(f"Admin {request.user.username} claimed requests {[r.id for r in claimed]} from the dispatch queue")
+        return Response({
+            "claimed": DispatchQueueSerializer(claimed, many=True).data
+        })
+
+
+class DispatchQueueReleaseView(APIView):
+    """
+    Give back a claimed request to the dispatch queue (Admin only, claim holder).
+    
+    Tags: Admin
+    """
+    permission_classes = [IsAdmin]
+    
+    @extend_schema(
+        request=None,
+        responses={
+            200: OpenApiResponse(description="Claim released"),
+            409: OpenApiResponse(description="You do not hold a claim on this request")
+        }
+    )
+    def post(self, request, pk):
+        from . import dispatch
+        
+        if not dispatch.release(pk, request.user):
+            return Response({"detail": "You do not hold a claim on this request"}, status=409)
+        return Response({"detail": "Claim released"})
+
+
+class ServiceRequestRecommendationView(APIView):
+    """
+    Recommend servicemen for a service request (Admin only).
+    
+    Returns a ranked shortlist - one primary and N backup candidates - scored on
+    category match, skills mentioned in the description, availability, current
+    job load, rating and the client's preferred serviceman. Use the returned IDs
+    with the assign endpoint.
+    
+    Query Parameters:
+    - backups: Number of backup candidates to return (default: 2, max: 10)
+    - radius_km: Only consider servicemen within this distance of the request
+      location (ignored when the request has no location)
+    
+    Tags: Admin
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="Ranked primary and backup candidates"),
+            403: OpenApiResponse(description="Only administrators can view recommendations"),
+            404: OpenApiResponse(description="Service request not found")
+        }
+    )
+    def get(self, request, pk):
+        from .recommendations import recommend_servicemen
+        
+        if request.user.user_type != 'ADMIN':
+            return Response({
+                "detail": "Only administrators can view assignment recommendations"
+            }, status=403)
+        
+        service_request = get_object_or_404(
+            ServiceRequest.objects.only(
+                'id', 'category_id', 'preferred_serviceman_id', 'service_description', 'status', 'latitude', 'longitude'
+            ),
+            pk=pk
+        )
+        
+        try:
+            backups = min(max(int(request.query_params.get('backups', 2)), 0), 10)
+        except ValueError:
+            backups = 2
+        
+        radius_km = request.query_params.get('radius_km')
+        try:
+            radius_km = float(radius_km) if radius_km else None
+        except ValueError:
+            return Response({"detail": "radius_km must be a number"}, status=400)
+        
+        recommendation = recommend_servicemen(service_request, backups=backups, radius_km=radius_km)
+        return Response({
+            "service_request_id": service_request.id,
+            "category_id": service_request.category_id,
+            "status": service_request.status,
+            **recommendation
+        })
+
+
+class ServiceRequestTimelineView(APIView):
+    """
+    Status timeline of a service request.
+    
+    Returns every status change (oldest first) with who made it and how long
+    the request spent in the previous status, plus total time per status.
+    
+    Access: admins, the request's client, and its assigned servicemen.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="Status timeline"),
+            403: OpenApiResponse(description="Not allowed to view this request"),
+            404: OpenApiResponse(description="Service request not found")
+        }
+    )
+    def get(self, request, pk):
+        from collections import defaultdict
+        from .models import ServiceRequestStatusHistory
+        from .serializers import ServiceRequestStatusHistorySerializer
+        
+        service_request = get_object_or_404(
+            ServiceRequest.objects.only(
+                'id', 'status', 'status_entered_at', 'client_id', 'serviceman_id', 'backup_serviceman_id'
+            ),
+            pk=pk
+        )
+        user = request.user
+        allowed = (
+            user.user_type == 'ADMIN'
+            or service_request.client_id == user.id
+            or user.id in (service_request.serviceman_id, service_request.backup_serviceman_id)
+        )
+        if not allowed:
+            return Response({"detail": "You do not have permission to view this request."}, status=403)
+        
+        # ✅ OPTIMIZATION: Whole history in one indexed query, durations precomputed per row
+        entries = list(
+            ServiceRequestStatusHistory.objects.filter(service_request_id=pk)
+            .select_related('changed_by')
+            .order_by('changed_at', 'id')
+        )
+        
+        time_in_status = defaultdict(int)
+        for entry in entries:
+            if entry.previous_status and entry.duration_in_previous is not None:
+                time_in_status[entry.previous_status] += int(entry.duration_in_previous.total_seconds())
+        
+        return Response({
+            "service_request_id": service_request.id,
+            "current_status": service_request.status,
+            "status_entered_at": service_request.status_entered_at,
+            "timeline": ServiceRequestStatusHistorySerializer(entries, many=True).data,
+            "time_in_status_seconds": dict(time_in_status),
+        })
+
+
 class ServicemanJobHistoryView(APIView):
     """
     Get job history for a serviceman (Serviceman only).
@@ -755,9 +1280,8 @@ class ServicemanJobHistoryView(APIView):
         limit = min(int(request.query_params.get('limit', 50)), 100)
         
         # Build queryset - get all requests where user is primary or backup serviceman
-        queryset = ServiceRequest.objects.filter(
-            Q(serviceman=request.user) | Q(backup_serviceman=request.user)
-        ).select_related(
+        jobs_qs = ServiceRequest.objects.for_serviceman(request.user)
+        queryset = jobs_qs.select_related(
             'client', 'category', 'serviceman', 'backup_serviceman'
         ).order_by('-created_at')
         
@@ -775,23 +1299,14 @@ class ServicemanJobHistoryView(APIView):
         jobs = queryset[:limit]
         
         # Calculate statistics
-        total_jobs = ServiceRequest.objects.filter(
-            Q(serviceman=request.user) | Q(backup_serviceman=request.user)
-        ).count()
+        total_jobs = jobs_qs.count()
         
-        completed_jobs = ServiceRequest.objects.filter(
-            Q(serviceman=request.user) | Q(backup_serviceman=request.user),
-            status='COMPLETED'
-        ).count()
+        completed_jobs = jobs_qs.filter(status='COMPLETED').count()
         
-        in_progress_jobs = ServiceRequest.objects.filter(
-            Q(serviceman=request.user) | Q(backup_serviceman=request.user),
-            status__in=['IN_PROGRESS', 'PAYMENT_CONFIRMED']
-        ).count()
+        in_progress_jobs = jobs_qs.filter(status__in=['IN_PROGRESS', 'PAYMENT_CONFIRMED']).count()
         
         # Calculate total earnings (only from completed jobs)
-        earnings_data = ServiceRequest.objects.filter(
-            Q(serviceman=request.user) | Q(backup_serviceman=request.user),
+        earnings_data = jobs_qs.filter(
             status='COMPLETED',
             final_cost__isnull=False
         ).aggregate(
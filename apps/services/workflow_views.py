@@ -14,6 +14,9 @@ Workflow:
 7. Serviceman completes job → Admin notified
 8. Admin confirms to client → Client notified
 9. Client rates serviceman → Serviceman & Admin notified
+
+Status changes go through state_machine.apply_transition(): one conditional
+UPDATE per step, with notifications sent only after the transaction commits.
 """
 
 from rest_framework import generics, permissions, status
@@ -29,8 +32,11 @@ import logging
 
 from .models import ServiceRequest
 from .serializers import ServiceRequestSerializer
+from .state_machine import TransitionError, apply_transition, can_transition
 from apps.notifications.models import Notification
 from apps.users.models import ServicemanProfile
+from apps.ratings.models import Rating
+from apps.ratings.utils import record_rating
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -62,6 +68,14 @@ def notify_user(user, title, message, notification_type='GENERAL', service_reque
     logger.info(f"Notified {user.username}: {title}")
 
 
+def transition_conflict(error, action):
+    """409 response for a request that changed status under us (concurrent update)"""
+    return Response(
+        {'error': f'Cannot {action}. Current status: {error.current_status_display}'},
+        status=status.HTTP_409_CONFLICT
+    )
+
+
 # ============================================================================
 # STEP 3: SERVICEMAN SUBMITS COST ESTIMATE
 # ============================================================================
@@ -118,7 +132,7 @@ class ServicemanSubmitEstimateView(APIView):
             )
         
         # Verify status
-        if service_request.status != 'PENDING_ESTIMATION':
+        if not can_transition(service_request, 'submit_estimate'):
             return Response(
                 {'error': f'Cannot submit estimate. Current status: {service_request.get_status_display()}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -143,31 +157,32 @@ class ServicemanSubmitEstimateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        def send_notifications():
+            # Notify admin
+            notify_admins(
+                title=f"Cost Estimate Submitted - Request #{service_request.id}",
+                message=f"Serviceman {request.user.get_full_name()} submitted cost estimate of ₦{estimated_cost:,.2f} for service request #{service_request.id}. Please review and add platform fee.{f' Notes: {notes}' if notes else ''}",
+                service_request=service_request
+            )
+            
+            # Notify client
+            Notification.objects.create(
+                user=service_request.client,
+                title=f'Estimate Submitted - Request #{service_request.id}',
+                message=f'The serviceman has submitted a cost estimate of ₦{estimated_cost:,.2f}. Our admin will review and finalize the pricing shortly.',
+                notification_type='STATUS_UPDATE',
+                is_read=False
+            )
+        
         # Update service request
         try:
-            with transaction.atomic():
-                service_request.serviceman_estimated_cost = estimated_cost
-                service_request.status = 'ESTIMATION_SUBMITTED'
-                service_request.save()
-                
-                # Notify admin
-                notify_admins(
-                    title=f"Cost Estimate Submitted - Request #{service_request.id}",
-                    message=f"Serviceman {request.user.get_full_name()} submitted cost estimate of ₦{estimated_cost:,.2f} for service request #{service_request.id}. Please review and add platform fee.{f' Notes: {notes}' if notes else ''}",
-                    service_request=service_request
-                )
-                
-                # Notify client
-                Notification.objects.create(
-                    user=service_request.client,
-                    title=f'Estimate Submitted - Request #{service_request.id}',
-                    message=f'The serviceman has submitted a cost estimate of ₦{estimated_cost:,.2f}. Our admin will review and finalize the pricing shortly.',
-                    notification_type='STATUS_UPDATE',
-                    is_read=False
-                )
-            
-            # Refresh from database to get updated relations
-            service_request.refresh_from_db()
+            apply_transition(
+                service_request,
+                'submit_estimate',
+                fields={'serviceman_estimated_cost': estimated_cost},
+                on_commit=[send_notifications],
+                changed_by=request.user,
+            )
             serializer = ServiceRequestSerializer(service_request, context={'request': request})
             
             return Response({
@@ -175,6 +190,8 @@ class ServicemanSubmitEstimateView(APIView):
                 'service_request': serializer.data
             }, status=status.HTTP_200_OK)
             
+        except TransitionError as e:
+            return transition_conflict(e, 'submit estimate')
         except Exception as e:
             logger.error(f"Error submitting estimate: {str(e)}", exc_info=True)
             return Response({
@@ -231,7 +248,7 @@ class AdminFinalizePriceView(APIView):
         service_request = get_object_or_404(ServiceRequest, pk=pk)
         
         # Verify status
-        if service_request.status != 'ESTIMATION_SUBMITTED':
+        if not can_transition(service_request, 'finalize_price'):
             return Response(
                 {'error': f'Cannot finalize price. Current status: {service_request.get_status_display()}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -261,13 +278,7 @@ class AdminFinalizePriceView(APIView):
         platform_fee = base_cost * (markup_percentage / 100)
         final_cost = base_cost + platform_fee
         
-        # Update service request
-        with transaction.atomic():
-            service_request.admin_markup_percentage = markup_percentage
-            service_request.final_cost = final_cost
-            service_request.status = 'AWAITING_CLIENT_APPROVAL'
-            service_request.save()
-            
+        def send_notifications():
             # Notify client
             notify_user(
                 user=service_request.client,
@@ -281,6 +292,18 @@ class AdminFinalizePriceView(APIView):
                 service_request=service_request
             )
         
+        # Update service request
+        try:
+            apply_transition(
+                service_request,
+                'finalize_price',
+                fields={'admin_markup_percentage': markup_percentage, 'final_cost': final_cost},
+                on_commit=[send_notifications],
+                changed_by=request.user,
+            )
+        except TransitionError as e:
+            return transition_conflict(e, 'finalize price')
+        
         serializer = ServiceRequestSerializer(service_request)
         return Response({
             'message': 'Price finalized and sent to client for approval',
@@ -338,7 +361,7 @@ class AdminAuthorizeWorkView(APIView):
         service_request = get_object_or_404(ServiceRequest, pk=pk)
         
         # Verify status
-        if service_request.status != 'PAYMENT_COMPLETED':
+        if not can_transition(service_request, 'authorize_work'):
             return Response(
                 {'error': f'Cannot authorize work. Current status: {service_request.get_status_display()}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -352,11 +375,7 @@ class AdminAuthorizeWorkView(APIView):
         
         instructions = request.data.get('instructions', '')
         
-        # Update service request
-        with transaction.atomic():
-            service_request.status = 'IN_PROGRESS'
-            service_request.save()
-            
+        def send_notifications():
             # Notify serviceman
             notify_user(
                 user=service_request.serviceman,
@@ -379,6 +398,12 @@ class AdminAuthorizeWorkView(APIView):
                 service_request=service_request
             )
         
+        # Update service request (serviceman is marked busy by the state machine hook)
+        try:
+            apply_transition(service_request, 'authorize_work', on_commit=[send_notifications], changed_by=request.user)
+        except TransitionError as e:
+            return transition_conflict(e, 'authorize work')
+        
         serializer = ServiceRequestSerializer(service_request)
         return Response({
             'message': 'Work authorized. Serviceman has been notified to begin.',
@@ -437,7 +462,7 @@ class ServicemanCompleteJobView(APIView):
             )
         
         # Verify status
-        if service_request.status != 'IN_PROGRESS':
+        if not can_transition(service_request, 'complete_job'):
             return Response(
                 {'error': f'Cannot mark as complete. Current status: {service_request.get_status_display()}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -445,21 +470,7 @@ class ServicemanCompleteJobView(APIView):
         
         completion_notes = request.data.get('completion_notes', '')
         
-        # Update service request
-        with transaction.atomic():
-            from django.utils import timezone
-            service_request.status = 'COMPLETED'
-            service_request.work_completed_at = timezone.now()
-            service_request.save()
-            
-            # Update serviceman stats
-            try:
-                profile = request.user.serviceman_profile
-                profile.total_jobs_completed = (profile.total_jobs_completed or 0) + 1
-                profile.save(update_fields=['total_jobs_completed'])
-            except:
-                pass
-            
+        def send_notifications():
             # Notify admin
             notify_admins(
                 title=f"Job Completed - Request #{service_request.id}",
@@ -467,6 +478,19 @@ class ServicemanCompleteJobView(APIView):
                 service_request=service_request
             )
         
+        # Update service request (jobs-completed counter and availability are state machine hooks)
+        from django.utils import timezone
+        try:
+            apply_transition(
+                service_request,
+                'complete_job',
+                fields={'work_completed_at': timezone.now()},
+                on_commit=[send_notifications],
+                changed_by=request.user,
+            )
+        except TransitionError as e:
+            return transition_conflict(e, 'mark as complete')
+        
         serializer = ServiceRequestSerializer(service_request)
         return Response({
             'message': 'Job marked as complete. Admin will verify and notify the client.',
@@ -518,7 +542,7 @@ class AdminConfirmCompletionView(APIView):
         service_request = get_object_or_404(ServiceRequest, pk=pk)
         
         # Verify status
-        if service_request.status != 'COMPLETED':
+        if not can_transition(service_request, 'confirm_completion'):
             return Response(
                 {'error': f'Cannot confirm completion. Current status: {service_request.get_status_display()}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -526,8 +550,7 @@ class AdminConfirmCompletionView(APIView):
         
         message_to_client = request.data.get('message_to_client', '')
         
-        # Notify client
-        with transaction.atomic():
+        def send_notifications():
             notify_user(
                 user=service_request.client,
                 title=f"Job Completed - Request #{service_request.id}",
@@ -539,6 +562,12 @@ class AdminConfirmCompletionView(APIView):
                 service_request=service_request
             )
         
+        # Status stays COMPLETED; the transition only re-checks it and stamps updated_at
+        try:
+            apply_transition(service_request, 'confirm_completion', on_commit=[send_notifications], changed_by=request.user)
+        except TransitionError as e:
+            return transition_conflict(e, 'confirm completion')
+        
         serializer = ServiceRequestSerializer(service_request)
         return Response({
             'message': 'Client has been notified of job completion',
@@ -605,7 +634,7 @@ class ClientSubmitReviewView(APIView):
             )
         
         # Verify status
-        if service_request.status != 'COMPLETED':
+        if not can_transition(service_request, 'submit_review'):
             return Response(
                 {'error': f'Cannot submit review. Current status: {service_request.get_status_display()}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -630,26 +659,7 @@ class ClientSubmitReviewView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Update serviceman rating
-        with transaction.atomic():
-            service_request.status = 'CLIENT_REVIEWED'
-            service_request.save()
-            
-            # Update serviceman profile rating
-            if service_request.serviceman:
-                try:
-                    profile = service_request.serviceman.serviceman_profile
-                    current_rating = profile.rating or Decimal('0.00')
-                    total_jobs = profile.total_jobs_completed or 0
-                    
-                    # Calculate new average rating
-                    if total_jobs > 0:
-                        new_rating = ((current_rating * (total_jobs - 1)) + Decimal(str(rating))) / total_jobs
-                        profile.rating = round(new_rating, 2)
-                        profile.save(update_fields=['rating'])
-                except Exception as e:
-                    logger.error(f"Error updating serviceman rating: {str(e)}")
-            
+        def send_notifications():
             # Notify serviceman
             if service_request.serviceman:
                 stars = '⭐' * rating
@@ -668,6 +678,27 @@ class ClientSubmitReviewView(APIView):
                 service_request=service_request
             )
         
+        # Update status and serviceman rating together
+        try:
+            with transaction.atomic():
+                apply_transition(service_request, 'submit_review', on_commit=[send_notifications], changed_by=request.user)
+                
+                # Store the review and update serviceman rating aggregate
+                if service_request.serviceman_id:
+                    _, created = Rating.objects.get_or_create(
+                        service_request=service_request,
+                        defaults={
+                            'serviceman_id': service_request.serviceman_id,
+                            'rating': rating,
+                            'review': review_text,
+                        }
+                    )
+                    # A rating may already exist if it was posted via /api/ratings/create/
+                    if created:
+                        record_rating(service_request.serviceman_id, rating)
+        except TransitionError as e:
+            return transition_conflict(e, 'submit review')
+        
         serializer = ServiceRequestSerializer(service_request)
         return Response({
             'message': 'Thank you for your review! Your feedback helps us improve.',
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from .models import User, ClientProfile, ServicemanProfile, Skill
 
 
@@ -38,7 +40,7 @@ class ServicemanProfileAdmin(admin.ModelAdmin):
     )
     list_filter = ("category", "is_approved", "is_available", "rating", "approved_at")
     search_fields = ("user__username", "user__email", "phone_number", "bio")
-    readonly_fields = ("created_at", "updated_at", "rating", "total_jobs_completed", "approved_at", "approved_by")
+    readonly_fields = ("created_at", "updated_at", "rating", "rating_count", "total_jobs_completed", "approved_at", "approved_by")
     filter_horizontal = ("skills",)  # Makes it easier to manage many-to-many relationships
     
     fieldsets = (
@@ -49,7 +51,7 @@ class ServicemanProfileAdmin(admin.ModelAdmin):
             'fields': ('category', 'skills', 'bio', 'years_of_experience', 'phone_number')
         }),
         ('Availability & Performance', {
-            'fields': ('is_available', 'rating', 'total_jobs_completed')
+            'fields': ('is_available', 'rating', 'rating_count', 'total_jobs_completed')
         }),
         ('Approval Status', {
             'fields': ('is_approved', 'approved_by', 'approved_at', 'rejection_reason'),
@@ -79,21 +81,20 @@ class ServicemanProfileAdmin(admin.ModelAdmin):
     approved_status_badge.short_description = 'Status'
     
     def approve_servicemen(self, request, queryset):
-        """Bulk approve selected servicemen"""
-        from django.utils import timezone
-        updated = queryset.filter(is_approved=False).update(
-            is_approved=True,
-            approved_by=request.user,
-            approved_at=timezone.now()
-        )
-        self.message_user(request, f"{updated} serviceman application(s) approved successfully.")
+        """Bulk approve selected servicemen (one UPDATE, batched notifications)"""
+        from .approval import APPROVED, approve_servicemen
+        outcomes = approve_servicemen(queryset.values_list('user_id', flat=True), request.user)
+        approved = sum(1 for outcome in outcomes.values() if outcome == APPROVED)
+        self.message_user(request, f"{approved} serviceman application(s) approved successfully.")
     approve_servicemen.short_description = "Approve selected servicemen"
     
     def reject_servicemen(self, request, queryset):
-        """Bulk reject selected servicemen"""
-        rejected = queryset.filter(is_approved=False).update(
-            rejection_reason="Rejected by admin via bulk action"
+        """Bulk reject selected servicemen (one UPDATE, batched notifications)"""
+        from .approval import REJECTED, reject_servicemen
+        outcomes = reject_servicemen(
+            queryset.values_list('user_id', flat=True), request.user, "Rejected by admin via bulk action"
         )
+        rejected = sum(1 for outcome in outcomes.values() if outcome == REJECTED)
         self.message_user(request, f"{rejected} serviceman application(s) rejected.")
     reject_servicemen.short_description = "Reject selected servicemen"
 
@@ -129,14 +130,30 @@ class SkillAdmin(admin.ModelAdmin):
     
     actions = ['activate_skills', 'deactivate_skills']
     
+    def _set_active(self, queryset, is_active):
+        """
+        Queryset UPDATE skips Skill post_save, so do what those signals do:
+        move updated_at (the catalog ETag), bump the skills catalog version
+        and refresh the search documents that list active skill names.
+        """
+        from .search import refresh_search_documents
+        from .versions import SKILLS, invalidate_catalog
+        
+        with transaction.atomic():
+            skill_ids = list(queryset.values_list('pk', flat=True))
+            updated = Skill.objects.filter(pk__in=skill_ids).update(is_active=is_active, updated_at=timezone.now())
+            invalidate_catalog(SKILLS)
+            refresh_search_documents(ServicemanProfile.objects.filter(skills__in=skill_ids).distinct())
+        return updated
+    
     def activate_skills(self, request, queryset):
         """Bulk activate selected skills"""
-        updated = queryset.update(is_active=True)
+        updated = self._set_active(queryset, True)
         self.message_user(request, f"{updated} skill(s) activated successfully.")
     activate_skills.short_description = "Activate selected skills"
     
     def deactivate_skills(self, request, queryset):
         """Bulk deactivate selected skills (soft delete)"""
-        updated = queryset.update(is_active=False)
+        updated = self._set_active(queryset, False)
         self.message_user(request, f"{updated} skill(s) deactivated successfully.")
     deactivate_skills.short_description = "Deactivate selected skills"
\ No newline at end of file
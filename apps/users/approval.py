@@ -0,0 +1,153 @@
+"""
+Batch approval/rejection of serviceman applications.
+
+approve_servicemen() / reject_servicemen() apply the decision to every
+eligible profile with a single UPDATE, create the applicant notifications with
+one bulk_create and queue one batched email task for all of them (bulk_create
+skips the per-notification post_save email signal). Used by
+AdminBulkReviewServicemenView and the ServicemanProfile admin actions.
+
+Both return {user_id: outcome} for every requested id, where outcome is one
+of APPROVED/REJECTED, ALREADY_APPROVED or NOT_FOUND (not a serviceman with a
+profile).
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ServicemanProfile, User
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 1000
+
+APPROVED = 'approved'
+REJECTED = 'rejected'
+ALREADY_APPROVED = 'already_approved'
+NOT_FOUND = 'not_found'
+
+
+def _pending_profiles(user_ids):
+    """
+    Split user_ids into pending profile rows and the outcomes of the rest.
+    Must run inside the caller's transaction: the rows stay locked (in pk
+    order, so overlapping batches cannot deadlock) until the UPDATE commits,
+    so a concurrent batch waits and then sees them as already decided instead
+    of notifying the applicants and decrementing the review queue twice.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    rows = ServicemanProfile.objects.select_for_update(of=('self',)).filter(
+        user_id__in=user_ids, user__user_type=User.SERVICEMAN
+    ).order_by('pk').values_list('pk', 'user_id', 'is_approved', 'category_id', 'rejection_reason')
+    found = {row[1]: (row[0], *row[2:]) for row in rows}
+
+    outcomes = {}
+    pending = []
+    for user_id in user_ids:
+        if user_id not in found:
+            outcomes[user_id] = NOT_FOUND
+        elif found[user_id][1]:
+            outcomes[user_id] = ALREADY_APPROVED
+        else:
+            outcomes[user_id] = None  # keeps the outcomes in request order
+            pending.append((user_id, *found[user_id]))
+    return pending, outcomes
+
+
+def _notify(notifications):
+    from apps.notifications.bulk import create_notifications
+    create_notifications(notifications)
+
+
+def _invalidate(user_ids, category_ids):
+    from apps.services.recommendations import invalidate_candidate_pools
+    from .versions import invalidate_servicemen
+
+    invalidate_servicemen(user_ids, category_ids)
+    invalidate_candidate_pools(category_ids)
+
+
+def _leave_review_queue(pending):
+    from .review_queue import adjust_pending_count
+    # Previously rejected applications were no longer counted as awaiting review
+    adjust_pending_count(-sum(1 for row in pending if not row[4]))
+
+
+def approve_servicemen(user_ids, actor, category=None, notes=''):
+    """Approve the pending applications among user_ids, optionally assigning category"""
+    from apps.notifications.models import Notification
+
+    with transaction.atomic():
+        pending, outcomes = _pending_profiles(user_ids)
+        if not pending:
+            return outcomes
+
+        approved_at = timezone.now()
+        changes = {'is_approved': True, 'approved_by': actor, 'approved_at': approved_at, 'updated_at': approved_at}
+        if category is not None:
+            changes['category'] = category
+        ServicemanProfile.objects.filter(pk__in=[row[1] for row in pending], is_approved=False).update(**changes)
+
+        category_note = f"You have been assigned to category: {category.name}." if category else ""
+        _notify([
+            Notification(
+                user_id=user_id,
+                notification_type='SERVICE_ASSIGNED',  # Using existing type
+                title='Serviceman Application Approved',
+                message=f'Congratulations! Your serviceman application has been approved by {actor.username}. '
+                        f'You can now be assigned to service requests and start accepting jobs. '
+                        f'{category_note}',
+            )
+            for user_id, *_ in pending
+        ])
+
+        approved_ids = [row[0] for row in pending]
+        category_ids = {row[3] for row in pending} | ({category.id} if category else set())
+        _invalidate(approved_ids, category_ids)
+        _leave_review_queue(pending)
+        if category is not None:
+            from .search import refresh_search_documents
+            try:
+                refresh_search_documents(ServicemanProfile.objects.filter(user_id__in=approved_ids))
+            except Exception as e:
+                logger.error(f"Failed to refresh search documents after bulk approval: {e}")
+
+    outcomes.update((user_id, APPROVED) for user_id in approved_ids)
+    logger.info(
+        f"Admin {actor.username} approved {len(approved_ids)} servicemen {sorted(approved_ids)}. "
+        f"Category: {category.name if category else 'unchanged'}. Notes: {notes}"
+    )
+    return outcomes
+
+
+def reject_servicemen(user_ids, actor, rejection_reason):
+    """Reject the pending applications among user_ids"""
+    from apps.notifications.models import Notification
+
+    with transaction.atomic():
+        pending, outcomes = _pending_profiles(user_ids)
+        if not pending:
+            return outcomes
+
+        ServicemanProfile.objects.filter(pk__in=[row[1] for row in pending], is_approved=False).update(
+            rejection_reason=rejection_reason, updated_at=timezone.now()
+        )
+        _notify([
+            Notification(
+                user_id=user_id,
+                notification_type='SERVICE_ASSIGNED',
+                title='Serviceman Application Update',
+                message=f'We regret to inform you that your serviceman application has not been approved at this time. '
+                        f'Reason: {rejection_reason}. '
+                        f'If you have questions, please contact support.',
+            )
+            for user_id, *_ in pending
+        ])
+        rejected_ids = [row[0] for row in pending]
+        _invalidate(rejected_ids, {row[3] for row in pending})
+        _leave_review_queue(pending)
+
+    outcomes.update((user_id, REJECTED) for user_id in rejected_ids)
+    logger.info(f"Admin {actor.username} rejected {len(rejected_ids)} servicemen {sorted(rejected_ids)}. Reason: {rejection_reason}")
+    return outcomes
@@ -0,0 +1,83 @@
+"""
+Bulk (re)assignment of servicemen to a category.
+
+assign_category() moves profiles with one UPDATE ... WHERE id IN (...) per
+chunk instead of a profile.save() per serviceman, so none of the per-row
+ServicemanProfile pre_save/post_save signals run. Their side effects are
+emitted here once per chunk instead:
+
+- version counters of the servicemen and of the old/new category lists
+  (apps/users/versions.py),
+- the assignment recommender candidate pools of the old/new categories,
+- the search documents (they contain the category name),
+- one audit log line.
+
+Each chunk commits on its own, so a very large id list never holds row locks
+for the whole run; a failure leaves earlier chunks assigned.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ServicemanProfile, User
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+
+def chunked(ids, size=CHUNK_SIZE):
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def assign_category(user_ids, category, actor=None, chunk_size=CHUNK_SIZE):
+    """
+    Assign the servicemen with these user ids to category (None to unassign).
+
+    Returns the assigned servicemen as a list of (user_id, username,
+    first_name, last_name); ids that are not servicemen with a profile are
+    skipped.
+    """
+    assigned = []
+    for chunk in chunked(user_ids, chunk_size):
+        assigned.extend(_assign_chunk(chunk, category, actor))
+    return assigned
+
+
+def _assign_chunk(user_ids, category, actor):
+    from apps.services.recommendations import invalidate_candidate_pools
+    from .search import refresh_search_documents
+    from .versions import invalidate_servicemen
+
+    category_id = category.id if category else None
+    with transaction.atomic():
+        rows = list(
+            ServicemanProfile.objects.filter(
+                user_id__in=user_ids, user__user_type=User.SERVICEMAN
+            ).values_list('pk', 'category_id', 'user_id', 'user__username', 'user__first_name', 'user__last_name')
+        )
+        if not rows:
+            return []
+
+        profile_ids = [row[0] for row in rows]
+        ServicemanProfile.objects.filter(pk__in=profile_ids).update(
+            category_id=category_id, updated_at=timezone.now()
+        )
+
+        affected_categories = {category_id} | {row[1] for row in rows}
+        invalidate_servicemen([row[2] for row in rows], affected_categories)
+        invalidate_candidate_pools(affected_categories)
+        try:
+            refresh_search_documents(ServicemanProfile.objects.filter(pk__in=profile_ids))
+        except Exception as e:
+            # Search freshness must never block the assignment
+            logger.error(f"Failed to refresh search documents after bulk category assignment: {e}")
+
+    logger.info(
+        f"{actor.username if actor else 'System'} assigned {len(rows)} servicemen to category "
+        f"'{category.name if category else None}': user ids {sorted(row[2] for row in rows)}"
+    )
+    return [row[2:] for row in rows]
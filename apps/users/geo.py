@@ -0,0 +1,149 @@
+"""
+Geographic proximity for clients, service requests and servicemen.
+
+Coordinates are supplied by the apps (device location or a map pin) - there is
+no server-side geocoding of the free-text addresses, so no external service is
+involved. ServicemanProfile stores a base-32 geohash of its service location,
+indexed for prefix (LIKE 'abc%') scans; on PostgreSQL with varchar_pattern_ops.
+
+servicemen_within(lat, lng, radius_km) narrows candidates to the 3x3 block of
+geohash cells around the point whose cells are at least radius_km across, so
+the circle is always covered. That is nine index range scans plus a bounding
+box check; exact great-circle distances are then computed in Python for the
+few remaining rows. nearest_servicemen() answers k-nearest queries by widening
+the radius until k servicemen are found.
+"""
+import math
+
+from django.db.models import Q
+
+from .models import ServicemanProfile
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG = 111.320
+
+GEOHASH_PRECISION = 9  # ~4.8 m x 4.8 m cells
+MAX_PREFIX_PRECISION = 7
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+KNN_RADII_KM = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    lat, lng = float(lat), float(lng)
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def _cell_size_degrees(precision):
+    """(lat degrees, lng degrees) spanned by one geohash cell"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _covering_precision(lat, radius_km):
+    """Finest precision whose cells are at least radius_km tall and wide across the circle"""
+    # Cells narrow towards the poles: size them at the circle's highest latitude
+    widest_lat = min(abs(lat) + radius_km / KM_PER_DEGREE_LAT, 90.0)
+    cos_lat = max(math.cos(math.radians(widest_lat)), 0.01)
+    for precision in range(MAX_PREFIX_PRECISION, 0, -1):
+        lat_deg, lng_deg = _cell_size_degrees(precision)
+        if lat_deg * KM_PER_DEGREE_LAT >= radius_km and lng_deg * KM_PER_DEGREE_LNG * cos_lat >= radius_km:
+            return precision
+    return 0
+
+
+def covering_prefixes(lat, lng, radius_km):
+    """Geohash prefixes of the 3x3 cell block covering the circle (empty: no narrowing)"""
+    precision = _covering_precision(lat, radius_km)
+    if not precision:
+        return []
+    lat_deg, lng_deg = _cell_size_degrees(precision)
+    prefixes = set()
+    for dlat in (-lat_deg, 0, lat_deg):
+        for dlng in (-lng_deg, 0, lng_deg):
+            neighbour_lat = min(max(lat + dlat, -90.0), 90.0)
+            neighbour_lng = (lng + dlng + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(neighbour_lat, neighbour_lng, precision))
+    return sorted(prefixes)
+
+
+def _nearby(queryset, lat, lng, radius_km):
+    lat, lng = float(lat), float(lng)
+    queryset = queryset.exclude(geohash='')
+    prefixes = covering_prefixes(lat, lng, radius_km)
+    if prefixes:
+        match = Q()
+        for prefix in prefixes:
+            match |= Q(geohash__startswith=prefix)
+        queryset = queryset.filter(match)
+
+    # Bounding box (skipped for longitude where it would wrap around the poles/antimeridian)
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    queryset = queryset.filter(latitude__gte=lat - lat_delta, latitude__lte=lat + lat_delta)
+    widest_lat = abs(lat) + lat_delta
+    if widest_lat < 89:
+        lng_delta = radius_km / (KM_PER_DEGREE_LNG * math.cos(math.radians(widest_lat)))
+        if -180 <= lng - lng_delta and lng + lng_delta <= 180:
+            queryset = queryset.filter(longitude__gte=lng - lng_delta, longitude__lte=lng + lng_delta)
+
+    results = []
+    for profile in queryset:
+        profile.distance_km = round(haversine_km(lat, lng, profile.latitude, profile.longitude), 3)
+        if profile.distance_km <= radius_km:
+            results.append(profile)
+    results.sort(key=lambda profile: (profile.distance_km, profile.user_id))
+    return results
+
+
+def servicemen_within(lat, lng, radius_km, queryset=None):
+    """
+    Profiles of servicemen located within radius_km of (lat, lng), nearest
+    first, each with a distance_km attribute. queryset narrows the candidates
+    (category, approval, ...); defaults to approved servicemen.
+    """
+    if queryset is None:
+        queryset = ServicemanProfile.objects.filter(is_approved=True)
+    return _nearby(queryset, lat, lng, radius_km)
+
+
+def nearest_servicemen(lat, lng, k, queryset=None, max_radius_km=KNN_RADII_KM[-1]):
+    """The k servicemen nearest to (lat, lng) within max_radius_km, nearest first"""
+    results = []
+    for radius_km in KNN_RADII_KM:
+        radius_km = min(radius_km, max_radius_km)
+        results = servicemen_within(lat, lng, radius_km, queryset)
+        if len(results) >= k or radius_km >= max_radius_km:
+            break
+    return results[:k]
+
+
+def servicemen_near_request(service_request, radius_km, queryset=None):
+    """servicemen_within() around a service request's location ([] if it has none)"""
+    if service_request.latitude is None or service_request.longitude is None:
+        return []
+    return servicemen_within(service_request.latitude, service_request.longitude, radius_km, queryset)
@@ -0,0 +1,91 @@
+"""
+Management command to benchmark bulk category assignment.
+
+Seeds N synthetic servicemen inside a transaction that is rolled back at the
+end, then compares the legacy per-row profile.save() loop (timed on a sample
+and extrapolated, it is far too slow for the full set) with
+apps.users.category_assignment.assign_category on all N servicemen.
+
+Run with: python manage.py benchmark_bulk_assign_category [--count 10000] [--legacy-sample 500]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.services.models import Category
+from apps.users.category_assignment import CHUNK_SIZE, assign_category
+from apps.users.models import ServicemanProfile, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-row profile.save() category assignment against the bulk UPDATE path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Servicemen to seed and assign (default: 10000)')
+        parser.add_argument(
+            '--legacy-sample', type=int, default=500,
+            help='Servicemen assigned with the legacy loop; the result is extrapolated (default: 500)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help=f'Bulk chunk size (default: {CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user_ids = self._seed(options['count'])
+                self._run(user_ids, options['legacy_sample'], options['chunk_size'])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write(self.style.SUCCESS('✓ Benchmark data rolled back'))
+
+    def _seed(self, count):
+        self.stdout.write(self.style.WARNING(f'Seeding {count} servicemen...'))
+        category = Category.objects.create(name='Benchmark source', description='')
+        users = User.objects.bulk_create(
+            [
+                User(username=f'bench_assign_{i}', email=f'bench_assign_{i}@example.com', user_type=User.SERVICEMAN)
+                for i in range(count)
+            ],
+            batch_size=2000,
+        )
+        ServicemanProfile.objects.bulk_create(
+            [ServicemanProfile(user=user, category=category, is_approved=True) for user in users],
+            batch_size=2000,
+        )
+        return [user.id for user in users]
+
+    def _run(self, user_ids, legacy_sample, chunk_size):
+        legacy_target = Category.objects.create(name='Benchmark legacy target', description='')
+        bulk_target = Category.objects.create(name='Benchmark bulk target', description='')
+
+        sample = user_ids[:legacy_sample]
+        try:
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for profile in ServicemanProfile.objects.filter(user_id__in=sample).select_related('user'):
+                    profile.category = legacy_target
+                    profile.save()
+                legacy_ms = (time.perf_counter() - start) * 1000
+            per_row_ms = legacy_ms / max(len(sample), 1)
+            self.stdout.write(
+                f'legacy save() loop: {len(sample)} rows in {legacy_ms:.0f} ms, {len(queries)} queries '
+                f'-> ~{per_row_ms * len(user_ids) / 1000:.1f} s and ~{len(queries) * len(user_ids) // max(len(sample), 1)} '
+                f'queries for {len(user_ids)}'
+            )
+        except Exception as e:
+            # The legacy pre_save signal probes information_schema (PostgreSQL only)
+            self.stdout.write(self.style.WARNING(f'legacy save() loop failed on this database: {e}'))
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            assigned = assign_category(user_ids, bulk_target, chunk_size=chunk_size)
+            bulk_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(
+            f'bulk assign_category: {len(assigned)} rows in {bulk_ms:.0f} ms, {len(queries)} queries '
+            f'(chunks of {chunk_size})'
+        )
@@ -0,0 +1,142 @@
+"""
+Management command to benchmark JSON rendering/parsing of our heaviest responses.
+
+Builds synthetic payloads shaped like the biggest API responses (servicemen
+list, admin service request list with nested profiles, admin servicemen by
+category) and times DRF's stdlib JSONRenderer/JSONParser against
+config.fast_json. No database access.
+
+Run with: python manage.py benchmark_json_renderers [--rows 1000] [--repeat 20]
+"""
+import io
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config import fast_json
+
+SKILLS = ['Leak detection', 'Pipe fitting', 'Wiring', 'Tiling', 'Roofing', 'Welding', 'Painting']
+
+
+def _user(rng, i):
+    first, last = rng.choice(['John', 'Grace', 'Tunde', 'Aisha']), rng.choice(['Okafor', 'Bello', 'Eze', 'Musa'])
+    return {
+        'id': i, 'username': f'user_{i}', 'email': f'user_{i}@example.com', 'full_name': f'{first} {last}',
+        'first_name': first, 'last_name': last, 'user_type': 'SERVICEMAN', 'is_email_verified': True,
+        'phone_number': f'+23480{i:08d}',
+    }
+
+
+def _profile(rng, i, now):
+    # ServicemanProfileSerializer output: serializer fields are already strings
+    return {
+        'id': i, 'user': _user(rng, i), 'category': {'id': i % 12, 'name': f'Category {i % 12}'},
+        'skills': [{'id': n, 'name': name, 'category': 'TECHNICAL'} for n, name in enumerate(rng.sample(SKILLS, 3))],
+        'rating': f'{rng.uniform(1, 5):.2f}', 'rating_count': rng.randint(0, 300),
+        'total_jobs_completed': rng.randint(0, 500), 'bio': 'Experienced tradesman ' * 5,
+        'years_of_experience': rng.randint(1, 30), 'phone_number': f'+23480{i:08d}',
+        'is_available': rng.random() > 0.3, 'active_jobs_count': rng.randint(0, 4),
+        'availability_status': {'status': 'available', 'message': 'Available for new jobs', 'can_book': True},
+        'is_approved': True, 'approved_by': None, 'approved_at': (now - timedelta(days=i % 90)).isoformat(),
+        'rejection_reason': '', 'created_at': now.isoformat(), 'updated_at': now.isoformat(),
+    }
+
+
+def servicemen_list(rng, rows, now):
+    return [_profile(rng, i, now) for i in range(rows)]
+
+
+def admin_request_list(rng, rows, now):
+    return [
+        {
+            'id': i, 'client': _user(rng, 100000 + i), 'preferred_serviceman': None,
+            'serviceman': _profile(rng, i, now), 'backup_serviceman': _profile(rng, i + 1, now),
+            'category': {'id': 1, 'name': 'Plumbing', 'description': 'Pipes', 'icon_url': None, 'is_active': True,
+                         'created_at': now.isoformat(), 'updated_at': now.isoformat()},
+            'booking_date': (date.today() + timedelta(days=i % 30)).isoformat(), 'is_emergency': i % 7 == 0,
+            'auto_flagged_emergency': False, 'status': 'IN_PROGRESS', 'initial_booking_fee': '2000.00',
+            'serviceman_estimated_cost': '15000.00', 'admin_markup_percentage': '10.00', 'final_cost': '16500.00',
+            'client_address': '12 Allen Avenue, Ikeja', 'service_description': 'Kitchen sink is leaking badly',
+            'created_at': now.isoformat(), 'updated_at': now.isoformat(),
+            'inspection_completed_at': None, 'work_completed_at': None,
+        }
+        for i in range(rows)
+    ]
+
+
+def servicemen_by_category(rng, rows, now):
+    # Hand-built APIView payload: raw floats, Decimals, datetimes and UUIDs
+    per_category = max(rows // 10, 1)
+    return {
+        'generated_at': now,
+        'categories': [
+            {
+                'category': {'id': c, 'name': f'Category {c}', 'description': 'Trade category'},
+                'servicemen_count': per_category,
+                'servicemen': [
+                    {
+                        'id': c * per_category + i, 'username': f'user_{i}', 'full_name': f'Serviceman {i}',
+                        'email': f'user_{i}@example.com', 'is_available': True, 'is_approved': True,
+                        'rating': float(rng.uniform(1, 5)), 'total_jobs_completed': rng.randint(0, 500),
+                        'earnings': Decimal(rng.randint(0, 10 ** 7)) / 100,
+                        'last_job_at': now - timedelta(hours=i), 'reference': uuid.UUID(int=rng.getrandbits(128)),
+                    }
+                    for i in range(per_category)
+                ],
+            }
+            for c in range(10)
+        ],
+    }
+
+
+SHAPES = {
+    'servicemen_list': servicemen_list,
+    'admin_request_list': admin_request_list,
+    'servicemen_by_category': servicemen_by_category,
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the stdlib DRF JSON renderer/parser against config.fast_json on large payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per payload (default: 1000)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per measurement (default: 20)')
+
+    def handle(self, *args, **options):
+        if fast_json.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed: the fast classes fall back to stdlib json'))
+
+        rng = random.Random(42)
+        now = timezone.now()
+        for name, build in SHAPES.items():
+            data = build(rng, options['rows'], now)
+            stdlib_out, stdlib_ms = self._time(lambda: JSONRenderer().render(data), options['repeat'])
+            fast_out, fast_ms = self._time(lambda: fast_json.FastJSONRenderer().render(data), options['repeat'])
+            if json.loads(stdlib_out) != json.loads(fast_out):
+                self.stdout.write(self.style.ERROR(f'{name}: rendered output differs from the stdlib renderer'))
+
+            _, stdlib_parse_ms = self._time(lambda: JSONParser().parse(io.BytesIO(stdlib_out)), options['repeat'])
+            _, fast_parse_ms = self._time(lambda: fast_json.FastJSONParser().parse(io.BytesIO(stdlib_out)), options['repeat'])
+            self.stdout.write(
+                f'{name} ({len(stdlib_out) / 1024:.0f} KiB): '
+                f'render {stdlib_ms:.2f} -> {fast_ms:.2f} ms ({stdlib_ms / fast_ms:.1f}x) | '
+                f'parse {stdlib_parse_ms:.2f} -> {fast_parse_ms:.2f} ms ({stdlib_parse_ms / fast_parse_ms:.1f}x)'
+            )
+        self.stdout.write(self.style.SUCCESS('✓ JSON benchmark complete'))
+
+    def _time(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return result, min(timings)
@@ -0,0 +1,109 @@
+"""
+Management command to compare serviceman search strategies on a large dataset.
+
+Seeds N synthetic servicemen inside a transaction that is rolled back at the
+end, then times the legacy icontains search (four leading-wildcard LIKEs over
+the user join) against apps.users.search.search_servicemen.
+
+Run with: python manage.py benchmark_servicemen_search [--count 100000]
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.services.models import Category
+from apps.users.models import ServicemanProfile, User
+from apps.users.search import search_servicemen
+
+FIRST_NAMES = ['John', 'Mary', 'Ahmed', 'Chinedu', 'Grace', 'Tunde', 'Aisha', 'Peter', 'Ngozi', 'Emeka']
+LAST_NAMES = ['Okafor', 'Adeyemi', 'Bello', 'Eze', 'Johnson', 'Musa', 'Obi', 'Peters', 'Uche', 'Yusuf']
+TRADES = ['plumber', 'electrician', 'carpenter', 'painter', 'mechanic', 'welder', 'tiler', 'roofer']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark legacy icontains search against the indexed serviceman search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000, help='Servicemen to seed (default: 100000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (default: 5)')
+        parser.add_argument(
+            '--query',
+            action='append',
+            dest='queries',
+            help='Search string to time. May be repeated (default: a few typical and misspelled terms)'
+        )
+
+    def handle(self, *args, **options):
+        queries = options['queries'] or ['okafor', 'plumber', 'plumbr', 'john electrician']
+        try:
+            with transaction.atomic():
+                self._seed(options['count'])
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE users_servicemanprofile')
+                self._run(queries, options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write(self.style.SUCCESS('✓ Benchmark data rolled back'))
+
+    def _seed(self, count):
+        self.stdout.write(self.style.WARNING(f'Seeding {count} servicemen...'))
+        rng = random.Random(42)
+        category = Category.objects.create(name='Benchmark category', description='')
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f'bench_serviceman_{i}',
+                    email=f'bench_serviceman_{i}@example.com',
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    user_type=User.SERVICEMAN,
+                )
+                for i in range(count)
+            ],
+            batch_size=2000,
+        )
+        profiles = []
+        for user in users:
+            bio = f'Experienced {rng.choice(TRADES)} with {rng.randint(1, 20)} years on the job'
+            document = ' '.join([
+                user.username, user.first_name, user.last_name, user.email, bio, category.name,
+            ]).lower()
+            profiles.append(ServicemanProfile(
+                user=user, category=category, bio=bio, is_approved=True, search_document=document,
+            ))
+        ServicemanProfile.objects.bulk_create(profiles, batch_size=2000)
+
+    def _time(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            total = queryset.count()
+            list(queryset[:20])
+            timings.append((time.perf_counter() - start) * 1000)
+        return total, min(timings)
+
+    def _run(self, queries, repeat):
+        base = ServicemanProfile.objects.filter(is_approved=True).select_related('user', 'category')
+        for query in queries:
+            legacy = base.filter(
+                Q(user__username__icontains=query) |
+                Q(user__first_name__icontains=query) |
+                Q(user__last_name__icontains=query) |
+                Q(user__email__icontains=query)
+            ).order_by('-rating')
+            indexed = search_servicemen(base, query).order_by('-search_rank', '-rating')
+
+            legacy_total, legacy_ms = self._time(legacy, repeat)
+            indexed_total, indexed_ms = self._time(indexed, repeat)
+            self.stdout.write(
+                f'"{query}": legacy {legacy_ms:.1f} ms ({legacy_total} hits) | '
+                f'indexed {indexed_ms:.1f} ms ({indexed_total} hits)'
+            )
@@ -0,0 +1,31 @@
+"""
+Management command to (re)build the denormalized serviceman search documents.
+
+Run after deploying the search_document migration, and whenever documents may
+have drifted (e.g. after raw SQL imports that bypass signals).
+
+Run with: python manage.py rebuild_servicemen_search
+"""
+from django.core.management.base import BaseCommand
+from apps.users.models import ServicemanProfile
+from apps.users.search import refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search_document for all serviceman profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of profiles written per bulk update (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Rebuilding serviceman search documents...'))
+        updated = refresh_search_documents(
+            ServicemanProfile.objects.all(),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Updated search documents for {updated} serviceman profile(s)'))
@@ -0,0 +1,37 @@
+"""
+Management command to rebuild serviceman rating aggregates from the Rating table.
+
+Run with: python manage.py recompute_rating_aggregates [--serviceman-id ID ...]
+
+Servicemen without any Rating rows keep their current (legacy) average; see
+apps.ratings.utils.recompute_rating_aggregates.
+"""
+from django.core.management.base import BaseCommand
+from apps.ratings.utils import recompute_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute rating_sum, rating_count, histogram and average rating for servicemen'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--serviceman-id',
+            type=int,
+            action='append',
+            dest='serviceman_ids',
+            help='Only recompute this serviceman (user ID). May be repeated.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of profiles written per bulk update (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Recomputing rating aggregates...'))
+        updated = recompute_rating_aggregates(
+            serviceman_ids=options['serviceman_ids'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Recomputed rating aggregates for {updated} serviceman profile(s)'))
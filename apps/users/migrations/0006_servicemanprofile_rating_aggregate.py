@@ -0,0 +1,48 @@
+# Generated manually for incremental rating aggregates
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_servicemanprofile_skills'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, help_text='Sum of all star ratings received'),
+        ),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of ratings received'),
+        ),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated manually for serviceman full-text and trigram search
+
+from django.db import migrations, models
+
+
+SEARCH_INDEXES = [
+    (
+        'users_servi_search_fts_idx',
+        "CREATE INDEX IF NOT EXISTS users_servi_search_fts_idx ON users_servicemanprofile "
+        "USING gin (to_tsvector('simple', search_document))",
+    ),
+    (
+        'users_servi_search_trgm_idx',
+        "CREATE INDEX IF NOT EXISTS users_servi_search_trgm_idx ON users_servicemanprofile "
+        "USING gin (search_document gin_trgm_ops)",
+    ),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    """GIN indexes are PostgreSQL-only; other databases use the icontains fallback"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for _, sql in SEARCH_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_servicemanprofile_rating_aggregate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,40 @@
+# Generated manually for proximity search (client/serviceman locations and geohash index)
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def _latitude():
+    return models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)])
+
+
+def _longitude():
+    return models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_servicemanprofile_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(model_name='clientprofile', name='latitude', field=_latitude()),
+        migrations.AddField(model_name='clientprofile', name='longitude', field=_longitude()),
+        migrations.AddField(model_name='servicemanprofile', name='latitude', field=_latitude()),
+        migrations.AddField(model_name='servicemanprofile', name='longitude', field=_longitude()),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='service_radius_km',
+            field=models.PositiveSmallIntegerField(default=10),
+        ),
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='servicemanprofile',
+            index=models.Index(fields=['geohash'], name='users_sm_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
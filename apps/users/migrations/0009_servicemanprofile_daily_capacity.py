@@ -0,0 +1,18 @@
+# Generated manually for the serviceman capacity calendar
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_geo_locations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicemanprofile',
+            name='daily_capacity',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Jobs this serviceman can take per booking date'),
+        ),
+    ]
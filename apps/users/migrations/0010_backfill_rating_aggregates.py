@@ -0,0 +1,53 @@
+# Generated manually to backfill the incremental rating aggregates
+
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    """
+    Fill rating_sum, rating_count and the star histogram (added zeroed by 0006)
+    from the Rating table, so the first record_rating() after deploy folds the
+    new review into the serviceman's full history instead of starting from 0/0.
+    Profiles without ratings keep their current average.
+    """
+    Rating = apps.get_model('ratings', 'Rating')
+    ServicemanProfile = apps.get_model('users', 'ServicemanProfile')
+
+    histogram = {f'rating_{stars}_count': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)}
+    aggregates = {
+        row.pop('serviceman_id'): row
+        for row in Rating.objects.filter(serviceman__isnull=False).values('serviceman_id').annotate(
+            rating_sum=Sum('rating'), rating_count=Count('id'), **histogram
+        ).order_by()
+    }
+    if not aggregates:
+        return
+
+    fields = ['rating', 'rating_sum', 'rating_count', *histogram]
+    batch = []
+    for profile in ServicemanProfile.objects.filter(user_id__in=list(aggregates)).order_by('pk').iterator(chunk_size=500):
+        row = aggregates[profile.user_id]
+        for field in fields[1:]:
+            setattr(profile, field, row[field] or 0)
+        profile.rating = round(Decimal(profile.rating_sum) / profile.rating_count, 2)
+        batch.append(profile)
+        if len(batch) >= 500:
+            ServicemanProfile.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        ServicemanProfile.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_servicemanprofile_daily_capacity'),
+        ('ratings', '0003_rating_serviceman'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth.models import AbstractUser
 
 
@@ -47,6 +48,9 @@ class ClientProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='client_profile')
     phone_number = models.CharField(max_length=20, blank=True, default='')
     address = models.TextField(blank=True, default='')
+    # Default location for new service requests (see apps/users/geo.py)
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -55,6 +59,16 @@ class ServicemanProfile(models.Model):
     category = models.ForeignKey('services.Category', on_delete=models.SET_NULL, null=True, blank=True)
     skills = models.ManyToManyField(Skill, related_name='servicemen', blank=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
+
+    # Rating aggregate (maintained atomically by apps.ratings.utils.record_rating)
+    rating_sum = models.PositiveIntegerField(default=0, help_text="Sum of all star ratings received")
+    rating_count = models.PositiveIntegerField(default=0, help_text="Number of ratings received")
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
     total_jobs_completed = models.IntegerField(default=0)
     bio = models.TextField(blank=True)
     years_of_experience = models.IntegerField(null=True, blank=True)
@@ -84,13 +98,43 @@ class ServicemanProfile(models.Model):
         help_text="Reason for rejection (if applicable)"
     )
     
+    # Denormalized search text (names, bio, skills, category) - see apps/users/search.py
+    search_document = models.TextField(blank=True, default='', editable=False)
+    
+    # Service area centre and radius; geohash is derived from the coordinates (see apps/users/geo.py)
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    service_radius_km = models.PositiveSmallIntegerField(default=10)
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False)
+    
+    # Capacity calendar: jobs per day (see apps/services/capacity.py)
+    daily_capacity = models.PositiveSmallIntegerField(default=1, help_text="Jobs this serviceman can take per booking date")
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         indexes = [
             models.Index(fields=['is_approved', 'created_at']),
+            # Prefix (LIKE 'abc%') scans for proximity search
+            models.Index(fields=['geohash'], name='users_sm_geohash_idx', opclasses=['varchar_pattern_ops']),
         ]
     
     def __str__(self):
-        return f"{self.user.get_full_name() or self.user.username} - Serviceman Profile"
\ No newline at end of file
+        return f"{self.user.get_full_name() or self.user.username} - Serviceman Profile"
+
+    def save(self, *args, **kwargs):
+        # Keep the proximity index in step with the coordinates
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'latitude', 'longitude'}.intersection(update_fields):
+            from .geo import encode_geohash
+            has_location = self.latitude is not None and self.longitude is not None
+            self.geohash = encode_geohash(self.latitude, self.longitude) if has_location else ''
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+    @property
+    def rating_histogram(self):
+        """Star rating distribution, e.g. {1: 0, 2: 1, 3: 4, 4: 10, 5: 22}"""
+        return {stars: getattr(self, f'rating_{stars}_count') for stars in range(1, 6)}
\ No newline at end of file
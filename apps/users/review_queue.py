@@ -0,0 +1,106 @@
+"""
+Serviceman application review queue.
+
+Applications awaiting review (not approved, not rejected) are listed oldest
+first with keyset pagination on (created_at, id), which walks the existing
+(is_approved, created_at) index: every page costs the same however long the
+backlog is, unlike OFFSET or a full count().
+
+The total shown on the admin dashboard comes from a cached counter instead of
+a COUNT(*). It is incremented when a serviceman registers and decremented when
+an application is approved, rejected or deleted (signals.py, approval.py and
+the single approve/reject views), all on commit. Writes that bypass those
+paths are bounded by PENDING_COUNT_TIMEOUT, after which the counter is
+recounted from the database.
+"""
+import base64
+import json
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import ServicemanProfile
+
+logger = logging.getLogger(__name__)
+
+PENDING_COUNT_KEY = 'users:pending_servicemen_count'
+PENDING_COUNT_TIMEOUT = 60 * 60
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def awaiting_review():
+    return ServicemanProfile.objects.filter(is_approved=False, rejection_reason='')
+
+
+def pending_count():
+    """Number of applications awaiting review, from the cached counter"""
+    try:
+        count = cache.get(PENDING_COUNT_KEY)
+    except Exception as e:
+        logger.warning(f"Pending count cache unavailable, counting in the database: {e}")
+        return awaiting_review().count()
+    if count is None:
+        count = awaiting_review().count()
+        try:
+            # add(): don't overwrite a counter another process just (re)initialized
+            cache.add(PENDING_COUNT_KEY, count, PENDING_COUNT_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to cache pending count: {e}")
+    return max(count, 0)
+
+
+def adjust_pending_count(delta):
+    """Move the cached counter by delta once the current transaction commits"""
+    if not delta:
+        return
+
+    def _adjust():
+        try:
+            cache.incr(PENDING_COUNT_KEY, delta)
+        except ValueError:
+            # Not cached: the next read recounts
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to adjust pending count: {e}")
+
+    transaction.on_commit(_adjust)
+
+
+def encode_cursor(profile):
+    raw = json.dumps([profile.created_at.isoformat(), profile.pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(created_at, pk) from a cursor; raises ValueError for anything malformed"""
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if created_at is None or not isinstance(pk, int):
+        raise ValueError('Invalid cursor')
+    return created_at, pk
+
+
+def queue_page(cursor=None, limit=DEFAULT_PAGE_SIZE, category_id=None):
+    """One page of the queue after cursor: (profiles, next_cursor or None)"""
+    queryset = awaiting_review().select_related('user', 'category').only(
+        'id', 'bio', 'years_of_experience', 'phone_number', 'created_at', 'category_id', 'category__name',
+        'user__id', 'user__username', 'user__email', 'user__first_name', 'user__last_name',
+    )
+    if category_id:
+        queryset = queryset.filter(category_id=category_id)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+
+    # One extra row tells whether there is a next page without a count
+    profiles = list(queryset.order_by('created_at', 'pk')[:limit + 1])
+    if len(profiles) > limit:
+        return profiles[:limit], encode_cursor(profiles[limit - 1])
+    return profiles, None
@@ -0,0 +1,91 @@
+"""
+Serviceman search.
+
+Each ServicemanProfile carries a denormalized ``search_document`` (names,
+username, email, bio, skill names and category name) kept in sync by the
+signals in signals.py. On PostgreSQL the document is indexed twice (see
+migration 0007):
+
+- a GIN index on to_tsvector('simple', search_document) for ranked full-text
+  matching of whole words, and
+- a GIN pg_trgm index for typo-tolerant word similarity ("plumbr" -> "plumber").
+
+Other databases (SQLite in development/tests) fall back to case-insensitive
+substring matching of every search term against the same single column.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from .models import ServicemanProfile
+
+_TSVECTOR = "to_tsvector('simple', \"users_servicemanprofile\".\"search_document\")"
+_TSQUERY = "plainto_tsquery('simple', %s)"
+_WORD_SIMILARITY = "word_similarity(%s, \"users_servicemanprofile\".\"search_document\")"
+# Index-assisted fuzzy match; uses pg_trgm.word_similarity_threshold (default 0.6)
+_FUZZY_MATCH = "%s <%% \"users_servicemanprofile\".\"search_document\""
+
+
+def build_search_document(profile):
+    """Flatten the searchable attributes of a profile into one lower-cased string"""
+    user = profile.user
+    parts = [user.username, user.first_name, user.last_name, user.email, profile.bio]
+    if profile.category_id:
+        parts.append(profile.category.name)
+    parts.extend(skill.name for skill in profile.skills.all() if skill.is_active)
+    return ' '.join(part.strip() for part in parts if part).lower()
+
+
+def refresh_search_documents(queryset, batch_size=500):
+    """Recompute search_document for every profile in queryset, in batches"""
+    profiles = queryset.select_related('user', 'category').prefetch_related('skills').order_by('pk')
+    updated = 0
+    batch = []
+    for profile in profiles.iterator(chunk_size=batch_size):
+        document = build_search_document(profile)
+        if document != profile.search_document:
+            profile.search_document = document
+            batch.append(profile)
+        if len(batch) >= batch_size:
+            ServicemanProfile.objects.bulk_update(batch, ['search_document'])
+            updated += len(batch)
+            batch = []
+    if batch:
+        ServicemanProfile.objects.bulk_update(batch, ['search_document'])
+        updated += len(batch)
+    return updated
+
+
+def _normalize(query):
+    return re.sub(r'\s+', ' ', query or '').strip().lower()
+
+
+def search_servicemen(queryset, query):
+    """
+    Filter a ServicemanProfile queryset by a free-text query.
+
+    The result is annotated with ``search_rank`` (higher is better) so callers
+    can order by relevance. Returns the queryset unchanged for an empty query.
+    """
+    query = _normalize(query)
+    if not query:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        matches = RawSQL(
+            f"({_TSVECTOR} @@ {_TSQUERY} OR {_FUZZY_MATCH})",
+            (query, query),
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f"(ts_rank({_TSVECTOR}, {_TSQUERY}) + {_WORD_SIMILARITY})",
+            (query, query),
+            output_field=FloatField(),
+        )
+        return queryset.filter(matches).annotate(search_rank=rank)
+
+    for term in query.split(' '):
+        queryset = queryset.filter(search_document__contains=term)
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
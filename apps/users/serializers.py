@@ -78,7 +78,7 @@ class RegisterSerializer(serializers.ModelSerializer):
 class ClientProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClientProfile
-        fields = ['user', 'phone_number', 'address', 'created_at', 'updated_at']
+        fields = ['user', 'phone_number', 'address', 'latitude', 'longitude', 'created_at', 'updated_at']
 
 class SkillSerializer(serializers.ModelSerializer):
     """Serializer for Skill model"""
@@ -101,6 +101,31 @@ class SkillCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+def _active_skills(profile):
+    """Active skills, from the prefetch cache when the queryset prefetched them"""
+    if 'skills' in getattr(profile, '_prefetched_objects_cache', {}):
+        return [skill for skill in profile.skills.all() if skill.is_active]
+    return profile.skills.filter(is_active=True)
+
+
+def _active_jobs(user_id):
+    """IN_PROGRESS jobs of a serviceman (a user id or OuterRef), as primary or backup"""
+    from apps.services.models import ServiceRequest
+    from django.db.models import Q
+    return ServiceRequest.objects.filter(
+        Q(serviceman=user_id) | Q(backup_serviceman=user_id),
+        status='IN_PROGRESS',
+        is_deleted=False
+    )
+
+
+def _active_jobs_count(profile):
+    """Active job count, from the prepare_queryset() annotation when present"""
+    if hasattr(profile, 'active_jobs'):
+        return profile.active_jobs
+    return _active_jobs(profile.user_id).count()
+
+
 class ServicemanProfileSerializer(serializers.ModelSerializer):
     # ✅ CRITICAL FIX: Expand user object instead of just showing ID
     user = UserBasicSerializer(read_only=True)
@@ -122,16 +147,34 @@ class ServicemanProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = ServicemanProfile
         fields = [
-            'id', 'user', 'category', 'skills', 'skill_ids', 'rating', 
+            'id', 'user', 'category', 'skills', 'skill_ids', 'rating', 'rating_count',
             'total_jobs_completed', 'bio', 'years_of_experience', 
             'phone_number', 'is_available', 'active_jobs_count', 
             'availability_status', 'is_approved', 'approved_by', 'approved_at',
-            'rejection_reason', 'created_at', 'updated_at'
+            'rejection_reason', 'latitude', 'longitude', 'service_radius_km', 'daily_capacity', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'rating', 'total_jobs_completed', 'active_jobs_count', 
+        read_only_fields = ['id', 'user', 'rating', 'rating_count', 'total_jobs_completed', 'active_jobs_count', 
                           'availability_status', 'is_approved', 'approved_by', 'approved_at',
                           'rejection_reason', 'created_at', 'updated_at']
     
+    @classmethod
+    def prepare_queryset(cls, queryset):
+        """
+        Load what serializing many profiles needs up front: user (with the
+        client profile UserBasicSerializer reads) and category rows, active
+        skills in one prefetch and the active job count as a subquery
+        annotation, instead of four queries per profile.
+        """
+        from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Value
+        from django.db.models.functions import Coalesce
+
+        active_jobs = _active_jobs(OuterRef('user_id')).order_by().annotate(
+            group=Value(1)
+        ).values('group').annotate(count=Count('pk')).values('count')[:1]
+        return queryset.select_related('user', 'user__client_profile', 'category').prefetch_related(
+            Prefetch('skills', queryset=Skill.objects.filter(is_active=True))
+        ).annotate(active_jobs=Coalesce(Subquery(active_jobs, output_field=IntegerField()), Value(0)))
+    
     def get_category(self, obj) -> dict:
         """Get category details"""
         if obj.category:
@@ -149,8 +192,7 @@ class ServicemanProfileSerializer(serializers.ModelSerializer):
         """
         try:
             if hasattr(obj, 'skills'):
-                skills = obj.skills.filter(is_active=True)
-                return SkillSerializer(skills, many=True).data
+                return SkillSerializer(_active_skills(obj), many=True).data
             return []
         except Exception:
             # If the skills table doesn't exist yet, return empty list
@@ -161,15 +203,7 @@ class ServicemanProfileSerializer(serializers.ModelSerializer):
         Get count of serviceman's active jobs (IN_PROGRESS status).
         """
         try:
-            from apps.services.models import ServiceRequest
-            from django.db.models import Q
-            
-            active_jobs = ServiceRequest.objects.filter(
-                Q(serviceman=obj.user) | Q(backup_serviceman=obj.user),
-                status='IN_PROGRESS',
-                is_deleted=False
-            ).count()
-            return active_jobs
+            return _active_jobs_count(obj)
         except Exception:
             return 0
     
@@ -246,6 +280,28 @@ class ServicemanProfileSerializer(serializers.ModelSerializer):
         return instance
 
 
+class PendingServicemanQueueSerializer(serializers.ModelSerializer):
+    """
+    Flat, query-free row for the admin review queue (see review_queue.py).
+    Expects select_related('user', 'category').
+    """
+    user_id = serializers.IntegerField(source='user.id', read_only=True)
+    username = serializers.CharField(source='user.username', read_only=True)
+    email = serializers.EmailField(source='user.email', read_only=True)
+    full_name = serializers.SerializerMethodField()
+    category_name = serializers.CharField(source='category.name', read_only=True, default=None)
+    
+    class Meta:
+        model = ServicemanProfile
+        fields = [
+            'id', 'user_id', 'username', 'email', 'full_name', 'phone_number',
+            'category_id', 'category_name', 'years_of_experience', 'bio', 'created_at'
+        ]
+        read_only_fields = fields
+    
+    def get_full_name(self, obj) -> str:
+        return obj.user.get_full_name() or obj.user.username
+
 class AdminServicemanProfileSerializer(serializers.ModelSerializer):
     """
     Optimized serializer for admin endpoints with full user details.
@@ -270,13 +326,13 @@ class AdminServicemanProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = ServicemanProfile
         fields = [
-            'id', 'user', 'category', 'skills', 'skill_ids', 'rating', 
+            'id', 'user', 'category', 'skills', 'skill_ids', 'rating', 'rating_count',
             'total_jobs_completed', 'bio', 'years_of_experience', 
             'phone_number', 'is_available', 'active_jobs_count', 
             'availability_status', 'is_approved', 'approved_by', 'approved_at',
             'rejection_reason', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'rating', 'total_jobs_completed', 'active_jobs_count', 
+        read_only_fields = ['id', 'user', 'rating', 'rating_count', 'total_jobs_completed', 'active_jobs_count', 
                           'availability_status', 'is_approved', 'approved_by', 'approved_at',
                           'rejection_reason', 'created_at', 'updated_at']
     
@@ -297,8 +353,7 @@ class AdminServicemanProfileSerializer(serializers.ModelSerializer):
         """
         try:
             if hasattr(obj, 'skills'):
-                skills = obj.skills.filter(is_active=True)
-                return SkillSerializer(skills, many=True).data
+                return SkillSerializer(_active_skills(obj), many=True).data
             return []
         except Exception:
             # If the skills table doesn't exist yet, return empty list
@@ -309,15 +364,7 @@ class AdminServicemanProfileSerializer(serializers.ModelSerializer):
         Get count of serviceman's active jobs (IN_PROGRESS status).
         """
         try:
-            from apps.services.models import ServiceRequest
-            from django.db.models import Q
-            
-            active_jobs = ServiceRequest.objects.filter(
-                Q(serviceman=obj.user) | Q(backup_serviceman=obj.user),
-                status='IN_PROGRESS',
-                is_deleted=False
-            ).count()
-            return active_jobs
+            return _active_jobs_count(obj)
         except Exception:
             return 0
     
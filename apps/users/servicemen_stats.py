@@ -0,0 +1,128 @@
+"""
+Statistics block (total / available / busy) for AllServicemenListView.
+
+Counting the fully filtered, search-joined queryset twice on every page and
+every search keystroke doubled the work of the listing. Instead:
+
+- Unfiltered totals (approved servicemen, no filters) are one aggregate kept
+  in the versioned cache under the SERVICEMEN_STATS counter, which
+  invalidate_servicemen() bumps on every profile, availability, approval or
+  rating change (apps/users/versions.py).
+- Filtered totals are one aggregate cached for FILTERED_STATS_TIMEOUT seconds
+  under a digest of the filter tuple, so paging and repeated keystrokes reuse it.
+- On PostgreSQL, once users_servicemanprofile has more rows (pg_class.reltuples)
+  than settings.SERVICEMEN_STATS_ESTIMATE_THRESHOLD, filtered totals come from
+  the planner's row estimates instead of COUNT(*) and are flagged "estimated".
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+from config.versioned_cache import read_through
+
+from .models import ServicemanProfile
+from .versions import SERVICEMEN_STATS
+
+logger = logging.getLogger(__name__)
+
+FILTERED_STATS_KEY = 'servicemen_stats:filtered:{}'
+FILTERED_STATS_TIMEOUT = 30
+RELTUPLES_KEY = 'servicemen_stats:reltuples'
+RELTUPLES_TIMEOUT = 60 * 10
+
+
+def _statistics(total, available, estimated=False):
+    return {
+        'total_servicemen': total,
+        'available': available,
+        'busy': max(total - available, 0),
+        'estimated': estimated,
+    }
+
+
+def _count(queryset):
+    counts = queryset.order_by().aggregate(
+        total=Count('pk'),
+        available=Count('pk', filter=Q(is_available=True)),
+    )
+    return _statistics(counts['total'], counts['available'])
+
+
+def _table_rows():
+    """Planner's row count for the profile table (cached), None off PostgreSQL"""
+    if connection.vendor != 'postgresql':
+        return None
+    rows = cache.get(RELTUPLES_KEY)
+    if rows is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [ServicemanProfile._meta.db_table],
+            )
+            rows = cursor.fetchone()[0]
+        cache.set(RELTUPLES_KEY, rows, RELTUPLES_TIMEOUT)
+    return rows
+
+
+def _planner_rows(queryset):
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _estimate(queryset):
+    threshold = getattr(settings, 'SERVICEMEN_STATS_ESTIMATE_THRESHOLD', None)
+    if not threshold:
+        return None
+    rows = _table_rows()
+    if rows is None or rows < threshold:
+        return None
+    total = _planner_rows(queryset)
+    available = _planner_rows(queryset.filter(is_available=True))
+    return _statistics(total, min(available, total), estimated=True)
+
+
+def unfiltered_statistics():
+    """Totals over all approved servicemen"""
+    return read_through(
+        'servicemen_stats:approved', [SERVICEMEN_STATS],
+        lambda: _count(ServicemanProfile.objects.filter(is_approved=True)),
+    )
+
+
+def filtered_statistics(queryset, filters):
+    """
+    Totals for queryset, which is the listing filtered by `filters` (a tuple of
+    the normalized filter parameters, the cache key).
+    """
+    digest = hashlib.md5(repr(filters).encode(), usedforsecurity=False).hexdigest()
+    key = FILTERED_STATS_KEY.format(digest)
+    try:
+        statistics = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Servicemen statistics cache unavailable: {e}")
+        statistics = None
+    if statistics is not None:
+        return statistics
+
+    try:
+        statistics = _estimate(queryset)
+    except Exception as e:
+        logger.warning(f"Failed to estimate servicemen statistics, counting instead: {e}")
+        statistics = None
+    if statistics is None:
+        statistics = _count(queryset)
+    try:
+        cache.set(key, statistics, FILTERED_STATS_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to cache servicemen statistics: {e}")
+    return statistics
@@ -1,7 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.db import connection
-from .models import User, ClientProfile, ServicemanProfile
+from django.db import connection, transaction
+from .models import User, ClientProfile, ServicemanProfile, Skill
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,4 +36,166 @@ def create_user_profile(sender, instance, created, **kwargs):
         except Exception as e:
             # Log the error but don't raise it to prevent user creation from failing
             logger.error(f"Failed to create profile for user {instance.id}: {e}")
-            # Profile will be created later or manually
\ No newline at end of file
+            # Profile will be created later or manually
+
+# --- Serviceman search document maintenance (see apps/users/search.py) ---
+
+SEARCH_PROFILE_FIELDS = {'bio', 'category', 'category_id'}
+SEARCH_USER_FIELDS = {'username', 'first_name', 'last_name', 'email'}
+
+
+def _refresh_search(profiles):
+    from .search import refresh_search_documents
+    try:
+        refresh_search_documents(profiles)
+    except Exception as e:
+        # Search freshness must never block the write that triggered it
+        logger.error(f"Failed to refresh serviceman search documents: {e}")
+
+
+@receiver(post_save, sender=ServicemanProfile)
+def update_search_document(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_PROFILE_FIELDS.intersection(update_fields):
+        return
+    _refresh_search(ServicemanProfile.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=User)
+def update_search_document_for_user(sender, instance, created, update_fields=None, **kwargs):
+    if created or instance.user_type != User.SERVICEMAN:
+        return
+    if update_fields is not None and not SEARCH_USER_FIELDS.intersection(update_fields):
+        return
+    _refresh_search(ServicemanProfile.objects.filter(user=instance))
+
+
+@receiver(m2m_changed, sender=ServicemanProfile.skills.through)
+def update_search_document_for_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _refresh_search(ServicemanProfile.objects.filter(pk=instance.pk))
+    elif pk_set:
+        _refresh_search(ServicemanProfile.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Skill)
+def update_search_document_for_skill(sender, instance, created, **kwargs):
+    if not created:
+        _refresh_search(ServicemanProfile.objects.filter(skills=instance))
+
+
+@receiver(post_save, sender='services.Category')
+def update_search_document_for_category(sender, instance, created, **kwargs):
+    if not created:
+        _refresh_search(ServicemanProfile.objects.filter(category=instance))
+
+
+def _refresh_search_on_commit(profiles):
+    """Refresh once the delete has cleared the skill rows / nulled the category"""
+    profile_ids = list(profiles.values_list('pk', flat=True))
+    if profile_ids:
+        transaction.on_commit(lambda: _refresh_search(ServicemanProfile.objects.filter(pk__in=profile_ids)))
+
+
+@receiver(pre_delete, sender=Skill)
+def update_search_document_for_deleted_skill(sender, instance, **kwargs):
+    # The through rows go without an m2m_changed signal
+    _refresh_search_on_commit(ServicemanProfile.objects.filter(skills=instance))
+
+
+@receiver(pre_delete, sender='services.Category')
+def update_search_document_for_deleted_category(sender, instance, **kwargs):
+    # ServicemanProfile.category is SET_NULL, a queryset UPDATE without post_save
+    _refresh_search_on_commit(ServicemanProfile.objects.filter(category=instance))
+
+
+# --- Skill -> servicemen inverted index maintenance (see apps/users/skill_index.py) ---
+
+@receiver(m2m_changed, sender=ServicemanProfile.skills.through)
+def invalidate_skill_index(sender, instance, action, reverse, pk_set, **kwargs):
+    from .skill_index import invalidate_skills
+    if reverse:
+        # skill.servicemen.add/remove/clear(...) - only this skill's set changes
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_skills([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_skills(pk_set or [])
+    elif action == 'pre_clear':
+        # pk_set is not provided for clear(); capture the skills before they go
+        invalidate_skills(instance.skills.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_index_for_deleted_skill(sender, instance, **kwargs):
+    from .skill_index import invalidate_skills
+    invalidate_skills([instance.pk])
+
+
+# --- HTTP validators for public serviceman endpoints (see apps/users/versions.py) ---
+
+@receiver(post_save, sender=ServicemanProfile)
+@receiver(post_delete, sender=ServicemanProfile)
+def bump_serviceman_versions(sender, instance, **kwargs):
+    from .versions import invalidate_servicemen
+    invalidate_servicemen(
+        [instance.user_id],
+        [instance.category_id, getattr(instance, '_previous_category_id', None)],
+    )
+
+
+# User fields no public serviceman payload renders (login bookkeeping, credentials)
+UNRENDERED_USER_FIELDS = frozenset({'last_login', 'password'})
+
+
+@receiver(post_save, sender=User)
+def bump_serviceman_versions_for_user(sender, instance, created, update_fields=None, **kwargs):
+    from .versions import invalidate_servicemen
+    if update_fields and set(update_fields) <= UNRENDERED_USER_FIELDS:
+        # e.g. update_last_login() on every login: nothing public changed
+        return
+    if not created and instance.user_type == User.SERVICEMAN:
+        invalidate_servicemen([instance.pk])
+
+
+@receiver(m2m_changed, sender=ServicemanProfile.skills.through)
+def bump_serviceman_versions_for_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    from .versions import invalidate_servicemen
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_servicemen([instance.user_id], [])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        invalidate_servicemen(ServicemanProfile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True), [])
+    elif action == 'pre_clear':
+        # skill.servicemen.clear() - pk_set is not provided
+        invalidate_servicemen(instance.servicemen.values_list('user_id', flat=True), [])
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def bump_skill_catalog_version(sender, instance, **kwargs):
+    from .versions import SKILLS, invalidate_catalog
+    invalidate_catalog(SKILLS)
+
+
+@receiver(post_save, sender='services.Category')
+@receiver(post_delete, sender='services.Category')
+def bump_category_catalog_version(sender, instance, **kwargs):
+    from .versions import CATEGORIES, invalidate_catalog
+    invalidate_catalog(CATEGORIES)
+
+
+# --- Cached review queue total (see apps/users/review_queue.py) ---
+
+@receiver(post_save, sender=ServicemanProfile)
+def count_new_application(sender, instance, created, **kwargs):
+    from .review_queue import adjust_pending_count
+    if created and not instance.is_approved and not instance.rejection_reason:
+        adjust_pending_count(1)
+
+
+@receiver(post_delete, sender=ServicemanProfile)
+def uncount_deleted_application(sender, instance, **kwargs):
+    from .review_queue import adjust_pending_count
+    if not instance.is_approved and not instance.rejection_reason:
+        adjust_pending_count(-1)
@@ -0,0 +1,88 @@
+"""
+Inverted index from skill id to the ids of servicemen (users) who have it.
+
+Each skill's member set is cached under its own key, so "servicemen with all of
+skills X, Y" is two cache round trips (the skills' version counters, then
+get_many) plus an in-memory set intersection. Sets are filled lazily from the
+ServicemanProfile.skills through table on a miss. The m2m_changed / post_delete
+signals in signals.py bump a skill's version counter (config/http_cache.py) on
+commit whenever skills are added, removed or cleared - which covers
+ServicemanSkillsView, ServicemanProfileSerializer.update and registration.
+
+Keys include the version read *before* the database load, so a fill racing a
+skills change is written under a version no reader asks for afterwards and can
+never hide a newly added member. Callers still filter the matched ids against
+ServicemanProfile (approval, availability, category), so stale ids left behind
+by deleted users are harmless. If the cache is unreachable, lookups fall back to
+the database.
+"""
+import logging
+
+from django.core.cache import cache
+
+from config.http_cache import bump_versions, get_versions
+from .models import ServicemanProfile
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'skill_index:servicemen:{}:{}'
+VERSION_NAME = 'skill_index:{}'
+CACHE_TIMEOUT = 60 * 60 * 24  # superseded versions are never read again; TTL only reclaims them
+
+
+def _load_from_db(skill_ids):
+    index = {skill_id: set() for skill_id in skill_ids}
+    rows = ServicemanProfile.skills.through.objects.filter(
+        skill_id__in=skill_ids
+    ).values_list('skill_id', 'servicemanprofile__user_id')
+    for skill_id, user_id in rows:
+        index[skill_id].add(user_id)
+    return index
+
+
+def get_servicemen_by_skill(skill_ids):
+    """Return {skill_id: set(serviceman user ids)} for the given skills"""
+    skill_ids = sorted(set(skill_ids))
+    if not skill_ids:
+        return {}
+    versions = get_versions(*(VERSION_NAME.format(skill_id) for skill_id in skill_ids))
+    if versions is None:
+        return _load_from_db(skill_ids)
+    keys = {
+        CACHE_KEY.format(skill_id, version): skill_id
+        for skill_id, version in zip(skill_ids, versions.split('.'))
+    }
+    try:
+        cached = cache.get_many(keys.keys())
+    except Exception as e:
+        logger.warning(f"Skill index cache unavailable, using database: {e}")
+        return _load_from_db(skill_ids)
+
+    index = {keys[key]: members for key, members in cached.items()}
+    missing = {key: skill_id for key, skill_id in keys.items() if skill_id not in index}
+    if missing:
+        loaded = _load_from_db(list(missing.values()))
+        index.update(loaded)
+        try:
+            cache.set_many({key: loaded[skill_id] for key, skill_id in missing.items()}, CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to populate skill index cache: {e}")
+    return index
+
+
+def match_servicemen(skill_ids):
+    """Ids of servicemen who have every one of skill_ids (intersection, smallest set first)"""
+    members = sorted(get_servicemen_by_skill(skill_ids).values(), key=len)
+    if not members:
+        return set()
+    matched = set(members[0])
+    for other in members[1:]:
+        matched &= other
+        if not matched:
+            break
+    return matched
+
+
+def invalidate_skills(skill_ids):
+    """Move the skills to new versions once the surrounding transaction commits"""
+    bump_versions([VERSION_NAME.format(skill_id) for skill_id in set(skill_ids)])
@@ -1,6 +1,7 @@
 import pytest
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
 
 User = get_user_model()
 
@@ -62,4 +63,425 @@ def test_resend_verification_email_nonexistent_user(client):
     data = {"email": "nonexistent@example.com"}
     response = client.post(url, data)
     assert response.status_code == 200
-    assert "verification email has been sent" in response.data["detail"]
\ No newline at end of file
+    assert "verification email has been sent" in response.data["detail"]
+
+@pytest.mark.django_db
+def test_serviceman_search_document_tracks_profile_skills_and_category(django_capture_on_commit_callbacks):
+    from apps.services.models import Category
+    from apps.users.models import ServicemanProfile, Skill
+    from apps.users.search import search_servicemen
+
+    user = User.objects.create_user(
+        username="sparky",
+        email="sparky@example.com",
+        password="Testpass123!",
+        user_type="SERVICEMAN",
+        first_name="Ada",
+        last_name="Okafor",
+    )
+    category = Category.objects.create(name="Electrical", description="Wiring")
+    profile, _ = ServicemanProfile.objects.update_or_create(
+        user=user,
+        defaults={"category": category, "bio": "Rewiring and solar installs"},
+    )
+    profile.skills.add(Skill.objects.create(name="Inverter repair"))
+
+    profiles = ServicemanProfile.objects.all()
+    assert list(search_servicemen(profiles, "okafor solar")) == [profile]
+    assert list(search_servicemen(profiles, "INVERTER")) == [profile]
+    assert not search_servicemen(profiles, "plumbing").exists()
+
+    category.name = "Plumbing"
+    category.save()
+    assert list(search_servicemen(profiles, "plumbing")) == [profile]
+
+    # Deleted skills and categories drop out of the document once the delete commits
+    with django_capture_on_commit_callbacks(execute=True):
+        Skill.objects.get(name="Inverter repair").delete()
+        category.delete()
+    assert not search_servicemen(profiles, "inverter").exists()
+    assert not search_servicemen(profiles, "plumbing").exists()
+    assert list(search_servicemen(profiles, "okafor")) == [profile]
+
+
+@pytest.mark.django_db
+def test_serviceman_skill_match_intersects_skills(settings, django_assert_num_queries, django_capture_on_commit_callbacks):
+    from apps.users.models import ServicemanProfile, Skill
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    wiring = Skill.objects.create(name="Wiring")
+    solar = Skill.objects.create(name="Solar")
+    profiles = []
+    for index in range(3):
+        user = User.objects.create_user(
+            username=f"matcher{index}",
+            email=f"matcher{index}@example.com",
+            password="Testpass123!",
+            user_type="SERVICEMAN",
+        )
+        profile, _ = ServicemanProfile.objects.update_or_create(
+            user=user, defaults={"is_approved": True, "is_available": True}
+        )
+        profiles.append(profile)
+    profiles[0].skills.add(wiring, solar)
+    profiles[1].skills.add(wiring, solar)
+    profiles[2].skills.add(wiring)
+
+    client = APIClient()
+    url = reverse("users:servicemen-skill-match")
+    response = client.get(url, {"skills": f"{wiring.id},{solar.id}"})
+    assert response.status_code == 200
+    assert response.data["count"] == 2
+    assert {row["user"]["id"] for row in response.data["results"]} == {
+        profiles[0].user_id, profiles[1].user_id
+    }
+
+    # Removing a skill invalidates the cached member set
+    with django_capture_on_commit_callbacks(execute=True):
+        profiles[1].skills.remove(solar)
+    response = client.get(url, {"skills": f"{wiring.id},{solar.id}"})
+    assert [row["user"]["id"] for row in response.data["results"]] == [profiles[0].user_id]
+
+    # A fill that read the version before a change committed lands under a superseded key
+    from django.core.cache import cache
+    from config.http_cache import get_versions
+    from apps.users.skill_index import CACHE_KEY, VERSION_NAME, get_servicemen_by_skill
+    version = get_versions(VERSION_NAME.format(solar.id))
+    with django_capture_on_commit_callbacks(execute=True):
+        profiles[2].skills.add(solar)
+    cache.set(CACHE_KEY.format(solar.id, version), {profiles[0].user_id})
+    assert get_servicemen_by_skill([solar.id])[solar.id] == {profiles[0].user_id, profiles[2].user_id}
+
+    assert client.get(url, {"skills": "999"}).status_code == 400
+    assert client.get(url, {"skills": wiring.id, "category": "abc"}).status_code == 400
+
+    # One page is a fixed number of queries, not one active-jobs COUNT per serviceman
+    with django_assert_num_queries(4):
+        response = client.get(url, {"skills": wiring.id, "page_size": 2})
+    assert response.data["count"] == 3 and len(response.data["results"]) == 2
+
+
+def test_fast_json_renderer_matches_drf_output():
+    import uuid
+    from datetime import datetime, timedelta, timezone as dt_timezone
+    from decimal import Decimal
+    from io import BytesIO
+    from rest_framework.renderers import JSONRenderer
+    from config.fast_json import FastJSONParser, FastJSONRenderer
+
+    data = {
+        "price": Decimal("1500.50"),
+        "at": datetime(2025, 10, 5, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        "took": timedelta(minutes=5),
+        "ref": uuid.UUID(int=7),
+        "histogram": {5: 10, 4: 2},
+        "text": "naïve\u2028line",
+        "nested": [{"ok": True, "none": None}],
+    }
+    rendered = FastJSONRenderer().render(data)
+    assert rendered == JSONRenderer().render(data)
+    assert FastJSONParser().parse(BytesIO(rendered))["at"] == "2025-10-05T12:30:15.123456Z"
+
+
+@pytest.mark.django_db
+def test_conditional_get_for_public_catalog_and_profiles(settings, django_assert_num_queries, django_capture_on_commit_callbacks):
+    from apps.ratings.utils import record_rating
+    from apps.users.models import ServicemanProfile, Skill
+    from apps.users.versions import serviceman_profile_version
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    Skill.objects.create(name="Plastering")
+    client = APIClient()
+    url = reverse("users:skill-list")
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert "public" in response["Cache-Control"] and response.has_header("Last-Modified")
+    etag = response["ETag"]
+
+    # Validators come from the cached catalog payload: no database work at all
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Skill.objects.create(name="Glazing")
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and response["ETag"] != etag
+
+    # Admin bulk (de)activation is a queryset UPDATE, but must still change the catalog and its ETag
+    from django.contrib import admin
+    from apps.users.admin import SkillAdmin
+    etag = response["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        SkillAdmin(Skill, admin.site)._set_active(Skill.objects.filter(name="Glazing"), False)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and response["ETag"] != etag
+    assert "Glazing" not in {skill["name"] for skill in response.data}
+
+    # Unknown categories are rejected before any cache entry is built for them
+    from config.versioned_cache import local_cache
+    local_cache.clear()
+    with django_assert_num_queries(0):
+        response = client.get(url, {"category": "no-such-category"})
+    assert response.status_code == 400 and not response.has_header("ETag")
+    assert local_cache.get("skills:NO-SUCH-CATEGORY") is None
+    assert client.get(url, {"category": "technical"}).status_code == 200
+
+    serviceman = User.objects.create_user(username="etag_sm", email="etag@example.com", password="x", user_type="SERVICEMAN")
+    ServicemanProfile.objects.update_or_create(user=serviceman, defaults={"is_approved": True})
+    version = serviceman_profile_version(serviceman.id)
+    assert serviceman_profile_version(serviceman.id) == version
+    with django_capture_on_commit_callbacks(execute=True):
+        record_rating(serviceman.id, 5)
+    assert serviceman_profile_version(serviceman.id) != version
+
+    # Logging in only touches last_login, which no public payload renders
+    from django.contrib.auth.models import update_last_login
+    version = serviceman_profile_version(serviceman.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        update_last_login(None, serviceman)
+    assert serviceman_profile_version(serviceman.id) == version
+    with django_capture_on_commit_callbacks(execute=True):
+        serviceman.first_name = "Renamed"
+        serviceman.save(update_fields=["first_name"])
+    assert serviceman_profile_version(serviceman.id) != version
+
+
+@pytest.mark.django_db
+def test_admin_servicemen_by_category_is_two_queries(django_assert_num_queries):
+    from apps.services.models import Category
+    from apps.users.models import ServicemanProfile
+
+    admin = User.objects.create_user(username="grp_admin", email="ga@example.com", password="x", user_type="ADMIN")
+    categories = [Category.objects.create(name=f"Trade {n}", description="d") for n in range(5)]
+    for n in range(12):
+        serviceman = User.objects.create_user(username=f"grp_sm{n}", email=f"gsm{n}@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(
+            user=serviceman, defaults={"category": categories[n % 4] if n < 10 else None}
+        )
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    url = reverse("users:admin-servicemen-by-category")
+
+    # force_authenticate: no session/token lookups, so these are the view's own queries
+    with django_assert_num_queries(2):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert response.data["total_servicemen"] == 12 and response.data["total_categories"] == 5
+    counts = [(g["category"] and g["category"]["name"], g["servicemen_count"]) for g in response.data["categories"]]
+    assert counts == [("Trade 0", 3), ("Trade 1", 3), ("Trade 2", 2), ("Trade 3", 2), ("Trade 4", 0), (None, 2)]
+
+    response = client.get(url, {"per_category": 2, "page": 2})
+    first = response.data["categories"][0]
+    assert [s["username"] for s in first["servicemen"]] == ["grp_sm8"] and first["has_more"] is False
+    assert client.get(url, {"per_category": 0}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_admin_bulk_assign_category_uses_bulk_update(settings, django_assert_max_num_queries, django_capture_on_commit_callbacks):
+    from apps.services.models import Category
+    from apps.users.models import ServicemanProfile
+    from apps.users.versions import category_servicemen_version
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    admin = User.objects.create_user(username="bulk_admin", email="ba@example.com", password="x", user_type="ADMIN")
+    source = Category.objects.create(name="Source", description="d")
+    target = Category.objects.create(name="Target", description="d")
+    ids = []
+    for n in range(30):
+        serviceman = User.objects.create_user(username=f"bulk_sm{n}", email=f"bsm{n}@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(user=serviceman, defaults={"category": source})
+        ids.append(serviceman.id)
+    versions = category_servicemen_version(source.id), category_servicemen_version(target.id)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    # Independent of the number of servicemen (was several queries per serviceman)
+    with django_capture_on_commit_callbacks(execute=True), django_assert_max_num_queries(15):
+        response = client.post(
+            reverse("users:admin-bulk-assign-category"),
+            {"serviceman_ids": ids + [admin.id, 999999], "category_id": target.id},
+            format="json",
+        )
+    assert response.status_code == 200
+    assert response.data["total_updated"] == 30 and response.data["not_found"] == 2
+    assert ServicemanProfile.objects.filter(category=target).count() == 30
+    assert "target" in ServicemanProfile.objects.get(user_id=ids[0]).search_document
+    assert category_servicemen_version(source.id) != versions[0]
+    assert category_servicemen_version(target.id) != versions[1]
+
+
+@pytest.mark.django_db
+def test_admin_bulk_review_servicemen(django_assert_max_num_queries, django_capture_on_commit_callbacks, mailoutbox):
+    from apps.notifications.models import Notification
+    from apps.notifications.tasks import send_notification_emails
+    from apps.users.models import ServicemanProfile
+
+    admin = User.objects.create_user(username="review_admin", email="ra@example.com", password="x", user_type="ADMIN")
+    ids = []
+    for n in range(6):
+        serviceman = User.objects.create_user(username=f"review_sm{n}", email=f"rsm{n}@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(user=serviceman, defaults={"is_approved": n == 0})
+        ids.append(serviceman.id)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    url = reverse("users:admin-bulk-review-servicemen")
+
+    with django_capture_on_commit_callbacks(execute=True), django_assert_max_num_queries(10):
+        response = client.post(url, {"action": "approve", "serviceman_ids": ids[:4] + [999999]}, format="json")
+    assert response.status_code == 200 and response.data["total_updated"] == 3
+    results = {row["id"]: row["result"] for row in response.data["results"]}
+    assert results == {ids[0]: "already_approved", ids[1]: "approved", ids[2]: "approved", ids[3]: "approved", 999999: "not_found"}
+    assert ServicemanProfile.objects.filter(user_id__in=ids[1:4], is_approved=True, approved_by=admin).count() == 3
+
+    # The losing side of a race reads the rows after the winner commits (they are locked until then)
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(url, {"action": "approve", "serviceman_ids": ids[1:3]}, format="json")
+    assert response.data["total_updated"] == 0
+    if connection.features.has_select_for_update:
+        assert any("FOR UPDATE" in query["sql"] for query in queries.captured_queries)
+
+    response = client.post(url, {"action": "reject", "serviceman_ids": ids[3:]}, format="json")
+    assert response.status_code == 400
+    response = client.post(url, {"action": "reject", "serviceman_ids": ids[3:], "rejection_reason": "Incomplete documents"}, format="json")
+    assert [row["result"] for row in response.data["results"]] == ["already_approved", "rejected", "rejected"]
+    assert [row["id"] for row in response.data["results"]] == ids[3:]
+    assert ServicemanProfile.objects.get(user_id=ids[5]).rejection_reason == "Incomplete documents"
+
+    notifications = Notification.objects.filter(user_id__in=ids)
+    assert notifications.count() == 5
+    assert send_notification_emails(list(notifications.values_list("id", flat=True))) == 5
+    assert len(mailoutbox) == 5 and not notifications.filter(sent_to_email=False).exists()
+
+
+@pytest.mark.django_db
+def test_pending_servicemen_review_queue(settings, django_assert_num_queries, django_capture_on_commit_callbacks):
+    from apps.users.models import ServicemanProfile
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    admin = User.objects.create_user(username="queue_admin", email="qa@example.com", password="x", user_type="ADMIN")
+    pending = []
+    for n, state in enumerate(["pending"] * 5 + ["rejected", "approved"]):
+        serviceman = User.objects.create_user(username=f"queue_sm{n}", email=f"qsm{n}@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(user=serviceman, defaults={
+            "is_approved": state == "approved", "rejection_reason": "No ID" if state == "rejected" else "",
+        })
+        if state == "pending":
+            pending.append(serviceman.id)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    url = reverse("users:admin-pending-servicemen-queue")
+
+    seen, cursor = [], None
+    response = client.get(url, {"limit": 2})
+    assert response.data["total_pending"] == 5
+    while True:
+        with django_assert_num_queries(1):  # the page only; the total comes from the cache
+            response = client.get(url, {"limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen += [row["user_id"] for row in response.data["results"]]
+        cursor = response.data["next"]
+        if not cursor:
+            break
+    assert seen == pending
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse("users:admin-bulk-review-servicemen"), {"action": "approve", "serviceman_ids": pending[:2]}, format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        newcomer = User.objects.create_user(username="queue_new", email="qnew@example.com", password="x", user_type="SERVICEMAN")
+        ServicemanProfile.objects.update_or_create(user=newcomer, defaults={"is_approved": False})
+    with django_assert_num_queries(1):
+        response = client.get(url)
+    assert response.data["total_pending"] == 4
+    assert [row["user_id"] for row in response.data["results"]] == pending[2:] + [newcomer.id]
+    assert client.get(url, {"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_servicemen_statistics_are_cached(settings, django_assert_num_queries, django_capture_on_commit_callbacks):
+    from apps.users.models import ServicemanProfile
+    from apps.users.servicemen_stats import filtered_statistics, unfiltered_statistics
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    profiles = []
+    for n, (approved, available) in enumerate([(True, True), (True, True), (True, False), (False, True)]):
+        serviceman = User.objects.create_user(username=f"stats_sm{n}", email=f"ssm{n}@example.com", password="x", user_type="SERVICEMAN")
+        profile, _ = ServicemanProfile.objects.update_or_create(
+            user=serviceman, defaults={"is_approved": approved, "is_available": available, "rating": 2 + n}
+        )
+        profiles.append(profile)
+
+    expected = {"total_servicemen": 3, "available": 2, "busy": 1, "estimated": False}
+    assert unfiltered_statistics() == expected
+    with django_assert_num_queries(0):
+        assert unfiltered_statistics() == expected
+
+    filters = (None, None, None, 3.0, None)
+    queryset = ServicemanProfile.objects.filter(is_approved=True, rating__gte=3)
+    assert filtered_statistics(queryset, filters) == {"total_servicemen": 2, "available": 1, "busy": 1, "estimated": False}
+    with django_assert_num_queries(0):
+        assert filtered_statistics(queryset, filters)["total_servicemen"] == 2
+
+    # Availability changes bump the statistics version (invalidate_servicemen); UPDATE plus an explicit
+    # bump because profile.save() runs a PostgreSQL-only pre_save probe
+    with django_capture_on_commit_callbacks(execute=True):
+        ServicemanProfile.objects.filter(pk=profiles[0].pk).update(is_available=False)
+        from apps.users.versions import invalidate_servicemen
+        invalidate_servicemen([profiles[0].user_id])
+    assert unfiltered_statistics()["available"] == 1
+
+    # ?is_available=false is a filter even though its value is falsy
+    response = APIClient().get(reverse("users:servicemen-list"), {"is_available": "false"})
+    assert response.data["statistics"] == {"total_servicemen": 2, "available": 0, "busy": 2, "estimated": False}
+
+
+@pytest.mark.django_db
+def test_proximity_search_matches_brute_force(settings):
+    import random
+    from apps.services.models import Category
+    from apps.users.geo import encode_geohash, haversine_km, nearest_servicemen, servicemen_within
+    from apps.users.models import ServicemanProfile
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    category = Category.objects.create(name="Geo Plumbing", description="")
+    rng = random.Random(46)
+    lagos = (6.5244, 3.3792)
+    points = {}
+    for n in range(60):
+        serviceman = User.objects.create_user(username=f"geo_sm{n}", email=f"geo{n}@example.com", password="x", user_type="SERVICEMAN")
+        lat, lng = lagos[0] + rng.uniform(-0.6, 0.6), lagos[1] + rng.uniform(-0.6, 0.6)
+        profile, _ = ServicemanProfile.objects.update_or_create(
+            user=serviceman,
+            defaults={"category": category, "is_approved": True, "is_available": False, "latitude": lat, "longitude": lng},
+        )
+        assert profile.geohash == encode_geohash(lat, lng)
+        points[serviceman.id] = (lat, lng)
+
+    for radius_km in (2, 10, 30, 80):
+        expected = sorted(
+            (user_id for user_id, point in points.items() if haversine_km(*lagos, *point) <= radius_km),
+            key=lambda user_id: (round(haversine_km(*lagos, *points[user_id]), 3), user_id),
+        )
+        assert [profile.user_id for profile in servicemen_within(*lagos, radius_km)] == expected
+
+    nearest = nearest_servicemen(*lagos, 5)
+    assert [profile.user_id for profile in nearest] == sorted(
+        points, key=lambda user_id: (round(haversine_km(*lagos, *points[user_id]), 3), user_id)
+    )[:5]
+
+    url = reverse("category-servicemen", args=[category.id])
+    response = APIClient().get(url, {"lat": lagos[0], "lng": lagos[1], "radius_km": 50, "nearest": 3})
+    assert response.status_code == 200
+    assert [row["id"] for row in response.data["servicemen"]] == [profile.user_id for profile in nearest[:3]]
+    assert response.data["total_servicemen"] == 3
+    assert response.data["servicemen"][0]["distance_km"] == nearest[0].distance_km
+    assert APIClient().get(url, {"lat": 120, "lng": 3}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_servicemen_listings_query_budgets(platform, assert_query_budget):
+    assert_query_budget(platform.admin, reverse("users:admin-servicemen-by-category"), 3, platform)
+    assert_query_budget(platform.admin, reverse("users:admin-pending-servicemen-queue"), 3, platform)
+    assert_query_budget(None, reverse("users:servicemen-list"), 3, platform)
@@ -3,6 +3,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView, TokenRefreshView,
 )
 from . import views
+from apps.ratings.views import ServicemanRatingListView
 
 app_name = "users"
 
@@ -29,7 +30,9 @@ urlpatterns = [
     
     # Servicemen - List all or get specific
     path("servicemen/", views.AllServicemenListView.as_view(), name="servicemen-list"),
+    path("servicemen/match/", views.ServicemanSkillMatchView.as_view(), name="servicemen-skill-match"),
     path("servicemen/<int:user_id>/", views.PublicServicemanProfileView.as_view(), name="public-serviceman-profile"),
+    path("servicemen/<int:serviceman_id>/ratings/", ServicemanRatingListView.as_view(), name="serviceman-ratings"),
     
     # Skills Management
     path("skills/", views.SkillListView.as_view(), name="skill-list"),
@@ -47,8 +50,10 @@ urlpatterns = [
     
     # Serviceman Approval
     path("admin/pending-servicemen/", views.AdminPendingServicemenView.as_view(), name="admin-pending-servicemen"),
+    path("admin/pending-servicemen/queue/", views.AdminPendingServicemenQueueView.as_view(), name="admin-pending-servicemen-queue"),
     path("admin/approve-serviceman/", views.AdminApproveServicemanView.as_view(), name="admin-approve-serviceman"),
     path("admin/reject-serviceman/", views.AdminRejectServicemanView.as_view(), name="admin-reject-serviceman"),
+    path("admin/bulk-review-servicemen/", views.AdminBulkReviewServicemenView.as_view(), name="admin-bulk-review-servicemen"),
     
     # Development/Testing (Remove in production)
     path("create-test-servicemen/", views.CreateTestServicemenView.as_view(), name="create-test-servicemen"),
@@ -0,0 +1,69 @@
+"""
+Version counters behind the ETags and cached payloads of public endpoints.
+
+- serviceman:<user_id>          PublicServicemanProfileView
+- category_servicemen:<cat_id>  CategoryServicemenListView (ETag and cached payload)
+- catalog                       category/skill names embedded in profiles
+- catalog:categories            cached category list payload (config/versioned_cache.py)
+- catalog:skills                cached skill list payloads
+- servicemen_stats              unfiltered AllServicemenListView statistics (servicemen_stats.py)
+- assignment_pool:<cat_id>      assignment candidate pools (services/recommendations.py)
+
+Bumped (on commit) by the signals in users/signals.py and services/signals.py
+and by the state machine/rating code paths that write with queryset UPDATEs.
+See config/http_cache.py.
+"""
+from config.http_cache import get_versions
+from config.versioned_cache import bump
+
+CATALOG = 'catalog'
+CATEGORIES = 'catalog:categories'
+SKILLS = 'catalog:skills'
+SERVICEMEN_STATS = 'servicemen_stats'
+
+
+def serviceman_key(user_id):
+    return f'serviceman:{user_id}'
+
+
+def category_servicemen_key(category_id):
+    return f'category_servicemen:{category_id}'
+
+
+def serviceman_profile_version(user_id):
+    return get_versions(serviceman_key(user_id), CATALOG)
+
+
+def category_servicemen_version(category_id):
+    return get_versions(category_servicemen_key(category_id))
+
+
+def invalidate_servicemen(user_ids, category_ids=None):
+    """
+    Bump the profile versions of these servicemen, the category lists they
+    appear in and the servicemen statistics, and drop those categories'
+    assignment candidate pools. Pass category_ids when known to save a lookup.
+    """
+    from apps.services.recommendations import invalidate_candidate_pools
+    from .models import ServicemanProfile
+
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    if category_ids is None:
+        category_ids = ServicemanProfile.objects.filter(
+            user_id__in=user_ids
+        ).values_list('category_id', flat=True)
+    category_ids = list(category_ids)
+    # Queryset UPDATEs (ratings, bulk approval/assignment) skip the profile signals the pools listen to
+    invalidate_candidate_pools(category_ids)
+    bump(
+        [serviceman_key(user_id) for user_id in user_ids] +
+        [category_servicemen_key(category_id) for category_id in category_ids if category_id] +
+        [SERVICEMEN_STATS]
+    )
+
+
+def invalidate_catalog(*names):
+    """Bump the shared catalog version plus the given catalog payload versions"""
+    bump([CATALOG, *names])
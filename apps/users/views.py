@@ -1,4 +1,5 @@
 from rest_framework import generics, status, permissions
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
@@ -7,20 +8,68 @@ from django.urls import reverse
 from django.conf import settings
 from django.core.mail import send_mail
 from django.contrib.auth.tokens import default_token_generator
-from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter
 from .models import ClientProfile, ServicemanProfile, Skill
 from .serializers import (
     UserSerializer, RegisterSerializer,
     ClientProfileSerializer, ServicemanProfileSerializer,
-    AdminServicemanProfileSerializer,
+    AdminServicemanProfileSerializer, PendingServicemanQueueSerializer,
     SkillSerializer, SkillCreateSerializer, AdminCreateSerializer
 )
 from .tokens import email_verification_token
 from .utils import send_verification_email, send_password_reset_email, send_password_reset_success_email
 from .permissions import IsAdmin
+from .versions import SKILLS, serviceman_profile_version
+from config.http_cache import conditional_get
+from config.versioned_cache import read_through
 
 User = get_user_model()
 
+
+def _build_skill_catalog(category):
+    from django.db.models import Count, Max
+    # Any skill insert/update/delete changes the row count or the newest updated_at
+    stats = Skill.objects.aggregate(last_modified=Max('updated_at'), total=Count('id'))
+    queryset = Skill.objects.filter(is_active=True)
+    if category:
+        queryset = queryset.filter(category=category)
+    return {
+        "etag": f"skills:{stats['total']}:{stats['last_modified']}",
+        "last_modified": stats['last_modified'],
+        "data": SkillSerializer(queryset, many=True).data,
+    }
+
+
+SKILL_CATEGORIES = [value for value, _ in Skill.CATEGORY_CHOICES]
+
+
+def _skill_category(request):
+    """Normalized ?category= ('' for all skills), or None if it is not a Skill category"""
+    category = (request.query_params.get('category') or '').strip().upper()
+    return category if not category or category in SKILL_CATEGORIES else None
+
+
+def _skill_catalog(request):
+    """Active skills payload for this request's (valid) ?category=, from the versioned catalog cache"""
+    if not hasattr(request, '_skill_catalog'):
+        # Cache names only ever come from SKILL_CATEGORIES, so arbitrary input cannot fill the cache
+        category = _skill_category(request)
+        request._skill_catalog = read_through(
+            f"skills:{category or 'all'}", [SKILLS], lambda: _build_skill_catalog(category)
+        )
+    return request._skill_catalog
+
+
+def _skill_validators(request, *args, **kwargs):
+    if _skill_category(request) is None:
+        return None, None
+    catalog = _skill_catalog(request)
+    return catalog["etag"], catalog["last_modified"]
+
+
+def _serviceman_profile_validators(request, *args, **kwargs):
+    return serviceman_profile_version(kwargs['user_id']), None
+
 class RegisterView(generics.CreateAPIView):
     """
     Register a new user (Client or Serviceman).
@@ -410,8 +459,9 @@ class AllServicemenListView(generics.ListAPIView):
     - category: Filter by category ID
     - is_available: Filter by availability (true/false)
     - min_rating: Filter by minimum rating
-    - search: Search by name or username
-    - ordering: Sort by rating, total_jobs_completed, etc.
+    - search: Search name, username, email, bio, skills and category
+      (typo-tolerant and relevance-ranked on PostgreSQL)
+    - ordering: Sort by relevance (default when searching), rating, total_jobs_completed, etc.
     
     Tags: User Profiles
     """
@@ -419,48 +469,12 @@ class AllServicemenListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     
     def get_queryset(self):
-        from django.db.models import Q, Count, Case, When, IntegerField, Prefetch
-        from django.core.exceptions import FieldError
-        from django.db import connection
-        
-        # Check which fields exist in the database
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='users_servicemanprofile'
-            """)
-            existing_columns = [row[0] for row in cursor.fetchall()]
-        
-        # ✅ OPTIMIZATION: Use select_related() to fetch related user and category in a single query
-        queryset = ServicemanProfile.objects.select_related('user', 'category')
-        
-        # ✅ OPTIMIZATION: Use prefetch_related() for skills (ManyToMany)
-        try:
-            queryset = queryset.prefetch_related(
-                Prefetch('skills', queryset=Skill.objects.filter(is_active=True))
-            )
-        except Exception:
-            # Skills table doesn't exist yet, skip prefetch
-            pass
-        
-        # Defer fields that don't exist yet
-        fields_to_defer = []
-        potential_new_fields = ['is_approved', 'approved_by_id', 'approved_at', 'rejection_reason']
-        
-        for field in potential_new_fields:
-            if field not in existing_columns:
-                fields_to_defer.append(field.replace('_id', ''))  # approved_by_id -> approved_by
-        
-        if fields_to_defer:
-            queryset = queryset.defer(*fields_to_defer)
+        queryset = ServicemanProfile.objects.all()
         
         # By default, show only approved servicemen (unless admin wants to see all)
         show_all = self.request.query_params.get('show_all', 'false').lower() == 'true'
         is_admin = self.request.user.is_authenticated and self.request.user.user_type == 'ADMIN'
-        
-        # Try to filter by is_approved (only if field exists)
-        if not (show_all and is_admin) and 'is_approved' in existing_columns:
+        if not (show_all and is_admin):
             queryset = queryset.filter(is_approved=True)
         
         # Filter by category
@@ -470,31 +484,40 @@ class AllServicemenListView(generics.ListAPIView):
         
         # Filter by availability
         is_available = self.request.query_params.get('is_available', None)
+        is_available_bool = None
         if is_available is not None:
             is_available_bool = is_available.lower() == 'true'
             queryset = queryset.filter(is_available=is_available_bool)
         
         # Filter by minimum rating
         min_rating = self.request.query_params.get('min_rating', None)
-        if min_rating:
-            queryset = queryset.filter(rating__gte=float(min_rating))
+        min_rating = float(min_rating) if min_rating else None
+        if min_rating is not None:
+            queryset = queryset.filter(rating__gte=min_rating)
         
-        # Search by name or username
+        # ✅ OPTIMIZATION: Search the indexed search_document (name, bio, skills, category)
+        # instead of four leading-wildcard LIKEs across the user join
         search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(user__username__icontains=search) |
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search)
-            )
+        if search and search.strip():
+            from .search import search_servicemen
+            queryset = search_servicemen(queryset, search)
+        
+        # Normalized filters: the statistics cache key (ordering doesn't change the counts).
+        # None means "not filtered"; False (is_available=false) and 0 (min_rating=0) are filters.
+        self.stats_filters = (
+            True if show_all and is_admin else None, category or None, is_available_bool, min_rating,
+            ' '.join((search or '').lower().split()) or None,
+        )
         
-        # Ordering
-        ordering = self.request.query_params.get('ordering', '-rating')
+        # Ordering (search results default to relevance)
+        default_ordering = 'relevance' if search and search.strip() else '-rating'
+        ordering = self.request.query_params.get('ordering', default_ordering)
         valid_orderings = ['rating', '-rating', 'total_jobs_completed', 
                           '-total_jobs_completed', 'years_of_experience', 
                           '-years_of_experience', 'created_at', '-created_at']
-        if ordering in valid_orderings:
+        if ordering == 'relevance' and search and search.strip():
+            queryset = queryset.order_by('-search_rank', '-rating')
+        elif ordering in valid_orderings:
             queryset = queryset.order_by(ordering)
         else:
             # Default: Available first, then by rating
@@ -502,33 +525,34 @@ class AllServicemenListView(generics.ListAPIView):
         
         return queryset
     
+    def get_statistics(self, queryset):
+        # ✅ OPTIMIZATION: cached/maintained totals instead of two COUNTs over the
+        # filtered, search-joined queryset on every page and keystroke
+        from .servicemen_stats import filtered_statistics, unfiltered_statistics
+        
+        if all(value is None for value in self.stats_filters):
+            return unfiltered_statistics()
+        return filtered_statistics(queryset, self.stats_filters)
+    
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        statistics = self.get_statistics(queryset)
         
-        # Calculate statistics
-        total_count = queryset.count()
-        available_count = queryset.filter(is_available=True).count()
-        busy_count = total_count - available_count
+        # ✅ OPTIMIZATION: user, category, skills and active job counts load with the page,
+        # not per row; the statistics above count the plain filtered queryset
+        queryset = ServicemanProfileSerializer.prepare_queryset(queryset)
         
         # Paginate
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             response = self.get_paginated_response(serializer.data)
-            response.data['statistics'] = {
-                'total_servicemen': total_count,
-                'available': available_count,
-                'busy': busy_count,
-            }
+            response.data['statistics'] = statistics
             return response
         
         serializer = self.get_serializer(queryset, many=True)
         return Response({
-            'statistics': {
-                'total_servicemen': total_count,
-                'available': available_count,
-                'busy': busy_count,
-            },
+            'statistics': statistics,
             'results': serializer.data
         })
 
@@ -546,6 +570,11 @@ class PublicServicemanProfileView(generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
     lookup_field = 'user_id'
     
+    # ✅ OPTIMIZATION: 304 from a version counter lookup, CDN-cacheable for anonymous traffic
+    @conditional_get(_serviceman_profile_validators, public=True, max_age=60, s_maxage=300)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
         from django.core.exceptions import FieldError
         from django.db import connection
@@ -872,36 +901,28 @@ class SkillListView(generics.ListAPIView):
         ],
         responses={
             200: OpenApiResponse(description="List of active skills"),
+            400: OpenApiResponse(description="Unknown skill category"),
             503: OpenApiResponse(description="Database migration required")
         }
     )
+    @conditional_get(_skill_validators, public=True, max_age=300, s_maxage=3600)
     def get(self, request, *args, **kwargs):
-        from django.db import connection
         import logging
         
         logger = logging.getLogger(__name__)
         
-        # Check if Skills table exists
+        if _skill_category(request) is None:
+            return Response({
+                "detail": f"category must be one of: {', '.join(SKILL_CATEGORIES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # ✅ OPTIMIZATION: serialized list served from the in-process LRU / Redis catalog cache
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_name = 'users_skill'
-                    );
-                """)
-                table_exists = cursor.fetchone()[0]
-            
-            if not table_exists:
-                logger.warning("Skills table does not exist - returning empty list")
-                return Response([], status=200)
-                
+            return Response(_skill_catalog(request)["data"])
         except Exception as e:
-            logger.error(f"Error checking Skills table existence: {e}")
+            # e.g. Skills table doesn't exist yet (migration pending)
+            logger.error(f"Error loading skills catalog: {e}")
             return Response([], status=200)
-        
-        # Proceed with normal list
-        return super().get(request, *args, **kwargs)
     
     def get_queryset(self):
         try:
@@ -1149,6 +1170,85 @@ class ServicemanSkillsView(APIView):
         })
 
 
+class ServicemanMatchPagination(PageNumberPagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+
+
+class ServicemanSkillMatchView(generics.ListAPIView):
+    """
+    Find servicemen who have ALL of the requested skills (Public).
+    
+    Backed by the skill -> servicemen inverted index in skill_index.py, so
+    multi-skill intersection does not join ServicemanProfile.skills per skill.
+    
+    Query Parameters:
+    - skills: Comma-separated skill IDs (required), e.g. ?skills=3,7
+    - category: Filter by category ID
+    - include_unavailable: Also return busy servicemen (default: false)
+    - page, page_size: Pagination (default 20 per page, max 100)
+    
+    Only approved servicemen are returned, best rated first.
+    
+    Tags: User Profiles
+    """
+    serializer_class = ServicemanProfileSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = ServicemanMatchPagination
+    
+    def get_skill_ids(self):
+        raw = self.request.query_params.get('skills', '')
+        try:
+            return sorted({int(value) for value in raw.split(',') if value.strip()})
+        except ValueError:
+            return None
+    
+    def list(self, request, *args, **kwargs):
+        skill_ids = self.get_skill_ids()
+        if not skill_ids:
+            return Response({
+                "detail": "skills is required as a comma-separated list of skill IDs."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        category = request.query_params.get('category')
+        if category and not category.isdigit():
+            return Response({
+                "detail": "category must be a category ID."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        active_skill_ids = set(
+            Skill.objects.filter(id__in=skill_ids, is_active=True).values_list('id', flat=True)
+        )
+        unknown = [skill_id for skill_id in skill_ids if skill_id not in active_skill_ids]
+        if unknown:
+            return Response({
+                "detail": "Some skills do not exist or are inactive.",
+                "invalid_skill_ids": unknown
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return super().list(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        from .skill_index import match_servicemen
+        
+        serviceman_ids = match_servicemen(self.get_skill_ids())
+        # ✅ OPTIMIZATION: user, category, skills and active job counts load with the page, not per row
+        queryset = ServicemanProfileSerializer.prepare_queryset(ServicemanProfile.objects.filter(
+            user_id__in=serviceman_ids,
+            is_approved=True,
+        ))
+        
+        if self.request.query_params.get('include_unavailable', 'false').lower() != 'true':
+            queryset = queryset.filter(is_available=True)
+        
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category_id=category)
+        
+        return queryset.order_by('-rating', 'user_id')
+
+
 # ============================================================================
 # ADMIN MANAGEMENT VIEWS
 # ============================================================================
@@ -1293,6 +1393,13 @@ class AdminBulkAssignCategoryView(APIView):
                 "detail": "category_id is required"
             }, status=400)
         
+        if not isinstance(serviceman_ids, list) or not all(
+            isinstance(serviceman_id, int) and not isinstance(serviceman_id, bool) for serviceman_id in serviceman_ids
+        ):
+            return Response({
+                "detail": "serviceman_ids must be an array of integers"
+            }, status=400)
+        
         # Get category
         try:
             category = Category.objects.get(id=category_id)
@@ -1301,46 +1408,26 @@ class AdminBulkAssignCategoryView(APIView):
                 "detail": f"Category with ID {category_id} not found"
             }, status=404)
         
-        # Get servicemen
-        servicemen = User.objects.filter(
-            id__in=serviceman_ids,
-            user_type='SERVICEMAN'
-        )
+        # ✅ OPTIMIZATION: one UPDATE per chunk of ids instead of profile.save() per
+        # serviceman (each save ran the pre_save availability probe, an old-instance
+        # fetch and a COUNT); cache invalidation and audit logging happen per chunk
+        from .category_assignment import assign_category
+        assigned = assign_category(serviceman_ids, category, actor=request.user)
         
-        if servicemen.count() == 0:
+        if not assigned:
             return Response({
                 "detail": "No valid servicemen found with provided IDs"
             }, status=404)
         
-        # Update categories
-        updated_count = 0
-        updated_servicemen = []
-        
-        for serviceman in servicemen:
-            # Skip if user doesn't have serviceman_profile
-            if not hasattr(serviceman, 'serviceman_profile'):
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Serviceman user {serviceman.id} ({serviceman.username}) has no serviceman_profile")
-                continue
-            
-            profile = serviceman.serviceman_profile
-            profile.category = category
-            profile.save()
-            updated_count += 1
-            updated_servicemen.append({
-                "id": serviceman.id,
-                "username": serviceman.username,
-                "full_name": serviceman.get_full_name()
-            })
-        
-        # Log the change
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(
-            f"Admin {request.user.username} assigned {updated_count} servicemen "
-            f"to category '{category.name}'"
-        )
+        updated_count = len(assigned)
+        updated_servicemen = [
+            {
+                "id": user_id,
+                "username": username,
+                "full_name": f"{first_name} {last_name}".strip()
+            }
+            for user_id, username, first_name, last_name in assigned
+        ]
         
         return Response({
             "detail": f"Successfully assigned {updated_count} servicemen to category '{category.name}'",
@@ -1367,170 +1454,111 @@ class AdminGetServicemenByCategoryView(APIView):
     serializer_class = ServicemanProfileSerializer
     
     @extend_schema(
+        parameters=[
+            OpenApiParameter('per_category', int, description="Max servicemen returned per category (default: all)"),
+            OpenApiParameter('page', int, description="Page within each category when per_category is set (default: 1)"),
+        ],
         responses={
             200: OpenApiResponse(description="Servicemen grouped by category"),
+            400: OpenApiResponse(description="Invalid per_category/page"),
             403: OpenApiResponse(description="Only administrators can access this endpoint"),
             503: OpenApiResponse(description="Database error or migration required")
         }
     )
     def get(self, request):
+        from itertools import groupby
         from apps.services.models import Category
-        from django.db.models import Count
-        from django.db import connection
         import logging
         
         logger = logging.getLogger(__name__)
         
-        # Check if approval fields exist in database
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name='users_servicemanprofile'
-                    AND column_name IN ('is_approved', 'is_available', 'rating', 'total_jobs_completed')
-                """)
-                existing_columns = [row[0] for row in cursor.fetchall()]
-        except Exception as e:
-            logger.error(f"Error checking ServicemanProfile columns: {e}")
-            existing_columns = []
-        
-        has_approval_fields = 'is_approved' in existing_columns
-        has_availability_field = 'is_available' in existing_columns
-        has_rating_field = 'rating' in existing_columns
-        has_jobs_field = 'total_jobs_completed' in existing_columns
+            per_category = request.query_params.get('per_category')
+            per_category = int(per_category) if per_category else None
+            page = int(request.query_params.get('page', 1))
+            if (per_category is not None and per_category < 1) or page < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "per_category and page must be positive integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start = (page - 1) * per_category if per_category else 0
+        stop = start + per_category if per_category else None
         
-        # Get all categories with servicemen count
+        # ✅ OPTIMIZATION: two queries regardless of category count - the categories,
+        # then every serviceman profile in one pass ordered by category and grouped
+        # in Python (previously one query per category plus unassigned/count queries)
         try:
-            categories = Category.objects.annotate(
-                servicemen_count=Count('servicemanprofile')
-            ).order_by('name')
+            categories = list(Category.objects.order_by('name').values('id', 'name', 'description'))
+            profiles = ServicemanProfile.objects.filter(
+                user__user_type='SERVICEMAN'
+            ).select_related('user').only(
+                'category_id', 'is_available', 'is_approved', 'rating', 'total_jobs_completed',
+                'user__id', 'user__username', 'user__first_name', 'user__last_name', 'user__email',
+            ).order_by('category_id', 'user_id')
+            
+            grouped = {}
+            # iterator(): stream rows from the cursor instead of caching the queryset
+            for category_id, rows in groupby(profiles.iterator(chunk_size=2000), key=lambda p: p.category_id):
+                rows = list(rows)
+                grouped[category_id] = (len(rows), [self._serviceman_info(p) for p in rows[start:stop]])
         except Exception as e:
-            logger.error(f"Error getting categories: {e}")
+            logger.error(f"Error getting servicemen by category: {e}")
             return Response({
                 "error": "Database error",
                 "detail": "Unable to retrieve categories. Please try again later."
             }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         
         result = []
-        total_servicemen = 0
-        
         for category in categories:
-            # Get servicemen in this category
-            try:
-                servicemen = User.objects.filter(
-                    user_type='SERVICEMAN',
-                    serviceman_profile__category=category
-                ).select_related('serviceman_profile')
-                
-                servicemen_data = []
-                for s in servicemen:
-                    # Skip if user doesn't have serviceman_profile
-                    if not hasattr(s, 'serviceman_profile'):
-                        logger.warning(f"Serviceman user {s.id} ({s.username}) has no serviceman_profile")
-                        continue
-                    
-                    profile = s.serviceman_profile
-                    
-                    serviceman_info = {
-                        "id": s.id,
-                        "username": s.username,
-                        "full_name": s.get_full_name() or s.username,
-                        "email": s.email,
-                    }
-                    
-                    # Add fields only if they exist in database
-                    if has_availability_field:
-                        serviceman_info["is_available"] = getattr(profile, 'is_available', True)
-                    
-                    if has_approval_fields:
-                        serviceman_info["is_approved"] = getattr(profile, 'is_approved', True)
-                    
-                    if has_rating_field:
-                        serviceman_info["rating"] = float(getattr(profile, 'rating', 0.0))
-                    
-                    if has_jobs_field:
-                        serviceman_info["total_jobs_completed"] = getattr(profile, 'total_jobs_completed', 0)
-                    
-                    servicemen_data.append(serviceman_info)
-                
-                total_servicemen += len(servicemen_data)
-                
-                result.append({
-                    "category": {
-                        "id": category.id,
-                        "name": category.name,
-                        "description": category.description
-                    },
-                    "servicemen_count": len(servicemen_data),
-                    "servicemen": servicemen_data
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing category {category.name}: {e}")
-                continue
+            count, servicemen_data = grouped.get(category['id'], (0, []))
+            result.append(self._group(category, count, servicemen_data, stop))
         
-        # Get unassigned servicemen (no category)
-        try:
-            unassigned = User.objects.filter(
-                user_type='SERVICEMAN',
-                serviceman_profile__category__isnull=True
-            ).select_related('serviceman_profile')
-            
-            if unassigned.exists():
-                unassigned_data = []
-                for s in unassigned:
-                    # Skip if user doesn't have serviceman_profile
-                    if not hasattr(s, 'serviceman_profile'):
-                        logger.warning(f"Serviceman user {s.id} ({s.username}) has no serviceman_profile")
-                        continue
-                    
-                    profile = s.serviceman_profile
-                    
-                    serviceman_info = {
-                        "id": s.id,
-                        "username": s.username,
-                        "full_name": s.get_full_name() or s.username,
-                        "email": s.email,
-                    }
-                    
-                    # Add fields only if they exist in database
-                    if has_availability_field:
-                        serviceman_info["is_available"] = getattr(profile, 'is_available', True)
-                    
-                    if has_approval_fields:
-                        serviceman_info["is_approved"] = getattr(profile, 'is_approved', True)
-                    
-                    if has_rating_field:
-                        serviceman_info["rating"] = float(getattr(profile, 'rating', 0.0))
-                    
-                    if has_jobs_field:
-                        serviceman_info["total_jobs_completed"] = getattr(profile, 'total_jobs_completed', 0)
-                    
-                    unassigned_data.append(serviceman_info)
-                
-                result.append({
-                    "category": None,
-                    "servicemen_count": len(unassigned_data),
-                    "servicemen": unassigned_data,
-                    "note": "Unassigned servicemen - no category set"
-                })
-                total_servicemen += len(unassigned_data)
-                
-        except Exception as e:
-            logger.error(f"Error processing unassigned servicemen: {e}")
+        # Unassigned servicemen (no category)
+        if None in grouped:
+            count, servicemen_data = grouped[None]
+            group = self._group(None, count, servicemen_data, stop)
+            group["note"] = "Unassigned servicemen - no category set"
+            result.append(group)
         
         return Response({
-            "total_servicemen": total_servicemen,
-            "total_categories": categories.count(),
+            "total_servicemen": sum(count for count, _ in grouped.values()),
+            "total_categories": len(categories),
             "categories": result,
+            # Kept for older admin dashboards; the columns are always migrated now
             "database_status": {
-                "has_approval_fields": has_approval_fields,
-                "has_availability_field": has_availability_field,
-                "has_rating_field": has_rating_field,
-                "has_jobs_field": has_jobs_field
+                "has_approval_fields": True,
+                "has_availability_field": True,
+                "has_rating_field": True,
+                "has_jobs_field": True
             }
         })
+    
+    @staticmethod
+    def _serviceman_info(profile):
+        s = profile.user
+        return {
+            "id": s.id,
+            "username": s.username,
+            "full_name": s.get_full_name() or s.username,
+            "email": s.email,
+            "is_available": profile.is_available,
+            "is_approved": profile.is_approved,
+            "rating": float(profile.rating),
+            "total_jobs_completed": profile.total_jobs_completed,
+        }
+    
+    @staticmethod
+    def _group(category, count, servicemen_data, stop):
+        group = {
+            "category": category,
+            "servicemen_count": count,
+            "servicemen": servicemen_data,
+        }
+        if stop is not None:
+            group["has_more"] = count > stop
+        return group
 
 
 class AdminPendingServicemenView(generics.ListAPIView):
@@ -1640,6 +1668,60 @@ class AdminPendingServicemenView(generics.ListAPIView):
         })
 
 
+class AdminPendingServicemenQueueView(APIView):
+    """
+    Review queue of serviceman applications awaiting a decision (Admin only).
+    
+    Oldest application first, with keyset (cursor) pagination and a cached
+    total, so the admin dashboard costs the same however long the backlog
+    grows. Rejected applications are not part of the queue.
+    
+    Query Parameters:
+    - cursor: `next` value from the previous page
+    - limit: page size (default 50, max 200)
+    - category: Filter by category ID
+    
+    Tags: Admin
+    """
+    permission_classes = [IsAdmin]
+    
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('cursor', str, description="Opaque cursor from the previous page's `next`"),
+            OpenApiParameter('limit', int, description="Page size (default 50, max 200)"),
+            OpenApiParameter('category', int, description="Filter by category ID"),
+        ],
+        responses={
+            200: OpenApiResponse(description="One page of the review queue"),
+            400: OpenApiResponse(description="Invalid cursor, limit or category")
+        }
+    )
+    def get(self, request):
+        from . import review_queue
+        
+        try:
+            limit = int(request.query_params.get('limit', review_queue.DEFAULT_PAGE_SIZE))
+            category_id = request.query_params.get('category')
+            category_id = int(category_id) if category_id else None
+            if limit < 1:
+                raise ValueError
+            profiles, next_cursor = review_queue.queue_page(
+                cursor=request.query_params.get('cursor'),
+                limit=min(limit, review_queue.MAX_PAGE_SIZE),
+                category_id=category_id,
+            )
+        except ValueError:
+            return Response({
+                "detail": "Invalid cursor, limit or category"
+            }, status=400)
+        
+        return Response({
+            "total_pending": review_queue.pending_count(),
+            "next": next_cursor,
+            "results": PendingServicemanQueueSerializer(profiles, many=True).data
+        })
+
+
 class AdminApproveServicemanView(APIView):
     """
     Approve a serviceman application (Admin only).
@@ -1737,10 +1819,14 @@ class AdminApproveServicemanView(APIView):
                 }, status=404)
         
         # Approve serviceman
+        was_awaiting_review = not profile.rejection_reason
         profile.is_approved = True
         profile.approved_by = request.user
         profile.approved_at = timezone.now()
         profile.save()
+        if was_awaiting_review:
+            from .review_queue import adjust_pending_count
+            adjust_pending_count(-1)
         
         # Send approval notification
         try:
@@ -1868,8 +1954,12 @@ class AdminRejectServicemanView(APIView):
             }, status=400)
         
         # Reject application
+        was_awaiting_review = not profile.rejection_reason
         profile.rejection_reason = rejection_reason
         profile.save()
+        if was_awaiting_review:
+            from .review_queue import adjust_pending_count
+            adjust_pending_count(-1)
         
         # Send rejection notification
         try:
@@ -1907,6 +1997,102 @@ class AdminRejectServicemanView(APIView):
         }, status=200)
 
 
+class AdminBulkReviewServicemenView(APIView):
+    """
+    Approve or reject many serviceman applications at once (Admin only).
+    
+    The decision is applied with a single UPDATE, notifications are created
+    with one bulk insert and emailed by one batched background job.
+    
+    Body:
+    {
+        "action": "approve" | "reject",
+        "serviceman_ids": [1, 2, 3],
+        "category_id": int (optional, approve only - assign category during approval),
+        "notes": string (optional, approve only - internal notes),
+        "rejection_reason": string (required for reject)
+    }
+    
+    Every requested id is reported back as approved/rejected, already_approved
+    or not_found.
+    
+    Tags: Admin
+    """
+    permission_classes = [IsAdmin]
+    
+    @extend_schema(
+        request={'application/json': {
+            'type': 'object',
+            'properties': {
+                'action': {'type': 'string', 'enum': ['approve', 'reject']},
+                'serviceman_ids': {'type': 'array', 'items': {'type': 'integer'}},
+                'category_id': {'type': 'integer', 'nullable': True},
+                'notes': {'type': 'string'},
+                'rejection_reason': {'type': 'string'}
+            },
+            'required': ['action', 'serviceman_ids']
+        }},
+        responses={
+            200: OpenApiResponse(description="Per-serviceman results"),
+            400: OpenApiResponse(description="Invalid action, ids or missing rejection_reason"),
+            404: OpenApiResponse(description="Category not found")
+        }
+    )
+    def post(self, request):
+        from apps.services.models import Category
+        from .approval import MAX_BATCH_SIZE, approve_servicemen, reject_servicemen
+        
+        action = request.data.get('action')
+        serviceman_ids = request.data.get('serviceman_ids')
+        
+        if action not in ('approve', 'reject'):
+            return Response({
+                "detail": "action must be 'approve' or 'reject'"
+            }, status=400)
+        
+        if not serviceman_ids or not isinstance(serviceman_ids, list) or not all(
+            isinstance(serviceman_id, int) and not isinstance(serviceman_id, bool) for serviceman_id in serviceman_ids
+        ):
+            return Response({
+                "detail": "serviceman_ids must be a non-empty array of integers"
+            }, status=400)
+        
+        if len(serviceman_ids) > MAX_BATCH_SIZE:
+            return Response({
+                "detail": f"At most {MAX_BATCH_SIZE} servicemen can be reviewed per request"
+            }, status=400)
+        
+        if action == 'approve':
+            category = None
+            category_id = request.data.get('category_id')
+            if category_id:
+                try:
+                    category = Category.objects.get(id=category_id)
+                except Category.DoesNotExist:
+                    return Response({
+                        "detail": f"Category with ID {category_id} not found"
+                    }, status=404)
+            outcomes = approve_servicemen(
+                serviceman_ids, request.user, category=category, notes=request.data.get('notes', '')
+            )
+        else:
+            rejection_reason = request.data.get('rejection_reason', '')
+            if not rejection_reason:
+                return Response({
+                    "detail": "rejection_reason is required"
+                }, status=400)
+            outcomes = reject_servicemen(serviceman_ids, request.user, rejection_reason)
+        
+        results = [{"id": serviceman_id, "result": outcome} for serviceman_id, outcome in outcomes.items()]
+        done = 'approved' if action == 'approve' else 'rejected'
+        return Response({
+            "action": action,
+            "total_requested": len(results),
+            "total_updated": sum(1 for result in results if result["result"] == done),
+            "results": results
+        }, status=200)
+
+
 # ============================================================================
 # ADMIN CREATION VIEW
 # ============================================================================
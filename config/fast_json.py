@@ -0,0 +1,58 @@
+"""
+Fast JSON renderer/parser for DRF.
+
+Uses orjson when it is installed: it serializes dict/list trees, datetime,
+date, time and UUID natively in C, several times faster than DRF's stdlib
+json + JSONEncoder. Without orjson both classes behave exactly like DRF's
+JSONRenderer/JSONParser.
+
+Output matches DRF's renderer: compact, UTF-8, UTC datetimes ending in "Z",
+U+2028/U+2029 escaped. Anything orjson doesn't know (Decimal, timedelta, lazy
+translation strings, querysets, ...) goes through DRF's JSONEncoder.default.
+Requests for indented output (browsable API, ?indent) also use the stdlib path.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+_fallback_encoder = JSONEncoder()
+
+
+def _default(obj):
+    return _fallback_encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # Same as DRF: keep the output valid inside a JavaScript string
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
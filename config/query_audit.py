@@ -0,0 +1,92 @@
+"""
+SQL query auditing for development and tests.
+
+QueryAudit records every SQL statement run on the default connection while it
+is active and groups them by pattern: the SQL text with parameters already
+out of it, whitespace collapsed and IN (...) lists of any length folded into
+one. A pattern seen several times in one request is the fingerprint of an N+1
+(a serializer or loop issuing one query per row).
+
+DuplicateQueryMiddleware logs, per request, the patterns repeated at least
+QUERY_AUDIT_DUPLICATE_THRESHOLD times. It is for development only: it is
+enabled by QUERY_AUDIT=True together with DEBUG, and otherwise removes itself
+from the middleware chain at startup (MiddlewareNotUsed), costing nothing.
+
+The test suite uses QueryAudit directly to enforce per-endpoint query budgets
+(see conftest.py).
+"""
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DUPLICATE_THRESHOLD = 3
+
+_WHITESPACE = re.compile(r'\s+')
+_IN_LIST = re.compile(r'IN \((?:%s|\?)(?:, (?:%s|\?))*\)')
+
+
+def normalize_sql(sql):
+    """Pattern of a statement: same for every execution of the same query shape"""
+    return _IN_LIST.sub('IN (...)', _WHITESPACE.sub(' ', sql).strip())
+
+
+class QueryAudit:
+    """Context manager recording the SQL run on the default connection"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._wrapper.__exit__(*exc_info)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.statements)
+
+    def duplicates(self, threshold=2):
+        """[(pattern, count)] of patterns run at least threshold times, most repeated first"""
+        counts = Counter(normalize_sql(sql) for sql in self.statements)
+        return [(pattern, count) for pattern, count in counts.most_common() if count >= threshold]
+
+    def report(self, threshold=2):
+        lines = [f'{len(self)} queries']
+        lines += [f'  {count}x {pattern[:300]}' for pattern, count in self.duplicates(threshold)]
+        return '\n'.join(lines)
+
+
+class DuplicateQueryMiddleware:
+    """Log repeated SQL patterns per request (development only, see module docstring)"""
+
+    def __init__(self, get_response):
+        if not (settings.DEBUG and getattr(settings, 'QUERY_AUDIT', False)):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'QUERY_AUDIT_DUPLICATE_THRESHOLD', DEFAULT_DUPLICATE_THRESHOLD)
+
+    def __call__(self, request):
+        with QueryAudit() as audit:
+            response = self.get_response(request)
+        duplicates = audit.duplicates(self.threshold)
+        if duplicates:
+            logger.warning(
+                f"{request.method} {request.path}: {len(duplicates)} duplicated query pattern(s) "
+                f"in {len(audit)} queries\n" + '\n'.join(
+                    f"  {count}x {pattern[:300]}" for pattern, count in duplicates
+                )
+            )
+        response['X-Query-Count'] = str(len(audit))
+        return response
@@ -94,6 +94,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    # Development only: logs duplicated SQL patterns per request when QUERY_AUDIT and DEBUG are on
+    "config.query_audit.DuplicateQueryMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -114,6 +116,16 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # orjson-backed when installed, stdlib json otherwise (see config/fast_json.py)
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.fast_json.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.fast_json.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
@@ -218,6 +230,27 @@ else:
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
 
+# Periodic tasks (synced into django_celery_beat by the DatabaseScheduler)
+CELERY_BEAT_SCHEDULE = {
+    "check-overdue-service-requests": {
+        "task": "apps.notifications.tasks.check_overdue_inspections",
+        "schedule": 15 * 60,  # seconds
+    },
+}
+
+# Service request SLA deadlines in hours, (normal, emergency) per status.
+# Overrides apps.services.sla.DEFAULT_SLA_HOURS, e.g. {"PENDING_ESTIMATION": (24, 4)}
+SERVICE_REQUEST_SLA_HOURS = {}
+
+# Above this many serviceman profiles (PostgreSQL only), filtered servicemen list
+# statistics use planner estimates instead of COUNT(*). None disables estimates.
+SERVICEMEN_STATS_ESTIMATE_THRESHOLD = env.int("SERVICEMEN_STATS_ESTIMATE_THRESHOLD", default=None)
+
+# Development SQL audit (config/query_audit.py): log query patterns repeated at
+# least QUERY_AUDIT_DUPLICATE_THRESHOLD times in one request. Needs DEBUG.
+QUERY_AUDIT = env.bool("QUERY_AUDIT", default=False)
+QUERY_AUDIT_DUPLICATE_THRESHOLD = env.int("QUERY_AUDIT_DUPLICATE_THRESHOLD", default=3)
+
 # Sentry (optional)
 SENTRY_DSN = env("SENTRY_DSN", default="")
 if SENTRY_DSN:
@@ -0,0 +1,149 @@
+"""
+Two-tier read-through cache for rarely changing payloads (catalogs).
+
+read_through(name, version_names, build) returns the payload stored in the
+configured cache (Redis) under "payload:<name>:<versions>", building and
+storing it on a miss. The versions are the counters from config.http_cache;
+bumping one (bump()) makes every payload built from it unreachable, so nothing
+ever has to be deleted.
+
+In front of Redis sits a small per-process LRU. Its entries are trusted for
+LOCAL_TTL seconds without any network round trip; after that the version is
+re-read from Redis (one GET) and the entry either revalidated or rebuilt. A
+change is therefore visible in the writing process immediately and in other
+workers within LOCAL_TTL seconds. If the cache is unavailable, build() runs.
+
+Rebuilds are single-flight: after a bump, only the worker that wins a short
+Redis lock runs build(). The others serve the previous payload (kept under
+"payload:<name>:stale") or, when there is none, wait up to LOCK_WAIT seconds
+for the winner before building themselves.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from .http_cache import bump_versions, get_versions
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_KEY = 'payload:{}:{}'
+STALE_KEY = 'payload:{}:stale'
+LOCK_KEY = 'payload:{}:{}:lock'
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 2
+LOCK_POLL_INTERVAL = 0.05
+LOCAL_TTL = 5
+LOCAL_MAX_ENTRIES = 128
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded name -> (version, expires_at, value) map"""
+
+    def __init__(self, max_entries=LOCAL_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+            return entry
+
+    def set(self, name, version, value, ttl=LOCAL_TTL):
+        with self._lock:
+            self._entries[name] = (version, time.monotonic() + ttl, value)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalLRU()
+
+
+@receiver(setting_changed)
+def _clear_local_cache(setting, **kwargs):
+    if setting == 'CACHES':
+        local_cache.clear()
+
+
+def read_through(name, version_names, build, timeout=PAYLOAD_TIMEOUT):
+    """Payload `name` for the current versions of version_names, built with build() on a miss"""
+    entry = local_cache.get(name)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[2]
+
+    version = get_versions(*version_names)
+    if version is None:
+        return build()
+    if entry is not None and entry[0] == version:
+        local_cache.set(name, version, entry[2])
+        return entry[2]
+
+    key = PAYLOAD_KEY.format(name, version)
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Payload cache unavailable for {name}, using database: {e}")
+        return build()
+
+    if value is None:
+        value, fresh = _build_once(name, version, key, build, timeout)
+        if not fresh:
+            # Someone else is rebuilding: serve the previous payload, but don't
+            # pin it locally so the new one is picked up on the next request
+            return value
+    local_cache.set(name, version, value)
+    return value
+
+
+def _build_once(name, version, key, build, timeout):
+    """Single-flight rebuild of the payload stored under key; returns (value, fresh)"""
+    lock_key = LOCK_KEY.format(name, version)
+    try:
+        acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to take rebuild lock for {name}: {e}")
+        acquired = True
+
+    if not acquired:
+        try:
+            stale = cache.get(STALE_KEY.format(name))
+            if stale is not None:
+                return stale, False
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                value = cache.get(key)
+                if value is not None:
+                    return value, True
+        except Exception as e:
+            logger.warning(f"Payload cache unavailable while waiting for {name}: {e}")
+        logger.info(f"Timed out waiting for the rebuild of {name}, building it here")
+
+    value = build()
+    try:
+        cache.set_many({key: value, STALE_KEY.format(name): value}, timeout)
+        if acquired:
+            cache.delete(lock_key)
+    except Exception as e:
+        logger.warning(f"Failed to cache payload {name}: {e}")
+    return value, True
+
+
+def bump(names):
+    """Bump version counters on commit and drop this process's local entries"""
+    bump_versions(names)
+    transaction.on_commit(local_cache.clear)
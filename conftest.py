@@ -0,0 +1,177 @@
+"""
+Shared pytest fixtures.
+
+Besides the basic users, `platform` seeds realistic volumes with bulk inserts
+(hundreds of servicemen with skills, thousands of service requests and
+notifications) and `assert_query_budget` enforces a per-endpoint query budget:
+the endpoint must stay within budget, and must run the same number of queries
+after the data grows, so per-row (N+1) queries fail the test with a report of
+the repeated SQL patterns (config/query_audit.py).
+"""
+import datetime
+import itertools
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config.query_audit import QueryAudit
+
+
+@pytest.fixture
+def client_user(db):
+    from apps.users.models import User
+    return User.objects.create_user(username="client", email="c@x.com", password="x", user_type="CLIENT")
+
+
+@pytest.fixture
+def serviceman_user(db):
+    from apps.users.models import User
+    return User.objects.create_user(username="sm", email="s@x.com", password="x", user_type="SERVICEMAN")
+
+
+@pytest.fixture
+def category(db):
+    from apps.services.models import Category
+    return Category.objects.create(name="General", description="General repairs")
+
+
+class PlatformSeed:
+    """Bulk-seeded marketplace; grow() adds another batch of the same shape"""
+
+    STATUSES = [
+        'PENDING_ADMIN_ASSIGNMENT', 'PENDING_ESTIMATION', 'ESTIMATION_SUBMITTED', 'AWAITING_CLIENT_APPROVAL',
+        'PAYMENT_COMPLETED', 'IN_PROGRESS', 'COMPLETED', 'CLIENT_REVIEWED', 'CANCELLED',
+    ]
+
+    def __init__(self, categories=8, skills=40, clients=20):
+        from apps.services.models import Category
+        from apps.users.models import Skill, User
+
+        self._serial = itertools.count()
+        self.admin = User.objects.create_user(
+            username="seed_admin", email="seed_admin@example.com", password="x", user_type="ADMIN", is_staff=True
+        )
+        self.categories = Category.objects.bulk_create([
+            Category(name=f"Seed category {n}", description="Seeded") for n in range(categories)
+        ])
+        self.skills = Skill.objects.bulk_create([
+            Skill(name=f"Seed skill {n}", category=Skill.CATEGORY_CHOICES[n % len(Skill.CATEGORY_CHOICES)][0])
+            for n in range(skills)
+        ])
+        self.clients = self._users('CLIENT', clients)
+        self.servicemen = []
+
+    @property
+    def client(self):
+        return self.clients[0]
+
+    @property
+    def serviceman(self):
+        return self.servicemen[0]
+
+    def _users(self, user_type, count):
+        from apps.users.models import User
+        users = [
+            User(username=f"seed_{user_type.lower()}_{n}", email=f"seed_{user_type.lower()}_{n}@example.com",
+                 first_name="Seed", last_name=str(n), user_type=user_type)
+            for n in (next(self._serial) for _ in range(count))
+        ]
+        return User.objects.bulk_create(users, batch_size=500)
+
+    def grow(self, servicemen=200, requests=2000, notifications=2000):
+        from apps.notifications.models import Notification
+        from apps.services.models import ServiceRequest
+        from apps.users.models import ServicemanProfile
+
+        users = self._users('SERVICEMAN', servicemen)
+        profiles = ServicemanProfile.objects.bulk_create([
+            ServicemanProfile(
+                user=user, category=self.categories[n % len(self.categories)], is_approved=n % 10 != 0,
+                is_available=n % 3 != 0, rating=round(3 + (n % 20) / 10, 1), total_jobs_completed=n % 40,
+                bio="Seeded serviceman", years_of_experience=n % 15,
+            )
+            for n, user in enumerate(users)
+        ], batch_size=500)
+        through = ServicemanProfile.skills.through
+        through.objects.bulk_create([
+            through(servicemanprofile_id=profile.pk, skill_id=self.skills[(n + k) % len(self.skills)].pk)
+            for n, profile in enumerate(profiles) for k in range(3)
+        ], batch_size=1000)
+        self.servicemen += users
+
+        # The first client and serviceman get a share of every batch, so their listings grow too
+        now = timezone.now()
+        rows = []
+        for n in range(requests):
+            serviceman = self.servicemen[0] if n % 4 == 0 else self.servicemen[n % len(self.servicemen)]
+            status = self.STATUSES[n % len(self.STATUSES)]
+            assigned = status != 'PENDING_ADMIN_ASSIGNMENT'
+            rows.append(ServiceRequest(
+                client=self.clients[n % len(self.clients)] if n % 3 else self.client,
+                category=self.categories[n % len(self.categories)],
+                serviceman=serviceman if assigned else None,
+                backup_serviceman=self.servicemen[(n + 1) % len(self.servicemen)] if assigned and n % 2 else None,
+                booking_date=now.date() + datetime.timedelta(days=n % 30),
+                is_emergency=n % 7 == 0, status=status, status_entered_at=now,
+                initial_booking_fee=2000, client_address=f"{n} Seed Street", service_description="Seeded request",
+            ))
+        rows = ServiceRequest.objects.bulk_create(rows, batch_size=500)
+
+        recipients = [self.client, self.servicemen[0], self.admin]
+        Notification.objects.bulk_create([
+            Notification(
+                user=recipients[n % len(recipients)], notification_type='STATUS_UPDATE',
+                title=f"Seeded notification {n}", message="Seeded", is_read=n % 2 == 0,
+                service_request=rows[n % len(rows)] if rows else None,
+            )
+            for n in range(notifications)
+        ], batch_size=500)
+        return self
+
+
+@pytest.fixture
+def platform(db, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    from config.versioned_cache import local_cache
+    local_cache.clear()
+    return PlatformSeed().grow()
+
+
+@pytest.fixture
+def assert_query_budget():
+    """
+    assert_query_budget(user, url, budget, platform=None, params=None, grow=None)
+
+    GETs url as user (anonymous if None) and asserts it runs at most budget
+    queries. With platform, the data is grown (grow kwargs) and the endpoint
+    must run exactly as many queries again. Returns the last response.
+    """
+    from django.core.cache import cache
+    from config.versioned_cache import local_cache
+
+    def _check(user, url, budget, platform=None, params=None, grow=None):
+        api = APIClient()
+        if user is not None:
+            api.force_authenticate(user=user)
+
+        def _measure():
+            # Cold caches: the budget covers the full build, not a cache hit
+            cache.clear()
+            local_cache.clear()
+            with QueryAudit() as audit:
+                response = api.get(url, params or {})
+            assert response.status_code == 200, response.content[:500]
+            assert len(audit) <= budget, f"{url} exceeded its budget of {budget}: {audit.report()}"
+            return response, audit
+
+        response, first = _measure()
+        if platform is not None:
+            platform.grow(**(grow or {"servicemen": 50, "requests": 500, "notifications": 500}))
+            response, second = _measure()
+            assert len(second) == len(first), (
+                f"{url} query count grows with the data ({len(first)} -> {len(second)}): {second.report()}"
+            )
+        return response
+
+    return _check